@@ -29,6 +29,13 @@ export type Startup = {
   category?: string;
   survival_score?: number;
   saturation?: string;
+  // Near-duplicate competitors (scripts/competitor_clusters.py)
+  cluster_size?: number;
+  competitor_density?: number;
+  // Market metrics over all tags (scripts/tag_cooccurrence.py)
+  tag_density?: number;
+  tag_combo_density?: number;
+  tag_growth?: number;
   survival_breakdown?: {
     total: number;
     growth: number;
@@ -45,6 +52,12 @@ export type Startup = {
   logo?: string;
   image?: string;
   company_image?: string;
+  // Precomputed neighbours (process-data.py --similar K)
+  similar_ids?: string[];
+  similar_scores?: number[];
+  // Set on startups split into paragraph records (process-data.py --record-budget);
+  // the startups index is distinct on it
+  parent_id?: string;
 };
 
 // Re-export survival calculator types and functions
@@ -86,6 +99,10 @@ export type FailedStartup = {
   regulatory_pressure?: boolean;
   overhype?: boolean;
 
+  // Precomputed neighbours (process-data.py --similar K)
+  similar_ids?: string[];
+  similar_scores?: number[];
+
   // Legacy field (deprecated, use why_they_failed)
   failure_reason?: string;
 
@@ -109,6 +126,99 @@ export function getAlgoliaClient() {
   return client;
 }
 
+/**
+ * Startup attributes result lists retrieve: everything but the long text,
+ * which is searched and never shown in a list.
+ */
+const STARTUP_LIST_ATTRIBUTES = ['*', '-long_description', '-founders'];
+
+/**
+ * A hit can be one of a company's paragraph records (scripts/record_budget.py),
+ * which only carries the lean fields and the facets. Swap it for the company:
+ * the parents are fetched in one getObjects request, and the hit keeps its
+ * highlights. A split company's own record also has a parent_id (itself).
+ */
+async function companyHits(
+  algolia: NonNullable<ReturnType<typeof getAlgoliaClient>>,
+  hits: Startup[]
+): Promise<Startup[]> {
+  const isChild = (hit: Startup) => !!hit.parent_id && hit.parent_id !== hit.objectID;
+  const parentIds = [...new Set(hits.filter(isChild).map(hit => hit.parent_id as string))];
+  if (parentIds.length === 0) return hits;
+
+  const { results } = await algolia.getObjects<Startup>({
+    requests: parentIds.map(objectID => ({
+      indexName: 'startups',
+      objectID,
+      attributesToRetrieve: STARTUP_LIST_ATTRIBUTES,
+    })),
+  });
+  const parents = new Map(results.filter(Boolean).map(parent => [parent.objectID, parent]));
+  return hits.map(hit => {
+    if (!isChild(hit)) return hit;
+    const parent = parents.get(hit.parent_id as string);
+    return parent ? { ...hit, ...parent } : { ...hit, objectID: hit.parent_id as string };
+  });
+}
+
+type FacetCounts = Record<string, number>;
+
+/**
+ * Facet counts precomputed by the data pipeline (scripts/facet_cube.py) and
+ * served as the static public/facets.json, so filters need no search request.
+ */
+export type FacetSummary = {
+  startups: {
+    total: number;
+    facets: {
+      category: FacetCounts;
+      batch: FacetCounts;
+      batch_year: FacetCounts;
+      status: FacetCounts;
+      saturation: FacetCounts;
+    };
+  };
+  graveyard: {
+    total: number;
+    facets: {
+      sector: FacetCounts;
+      funding: FacetCounts;
+      failure_flags: FacetCounts;
+    };
+    failure_flags_by_sector: Record<string, FacetCounts>;
+    failure_flags_by_funding: Record<string, FacetCounts>;
+  };
+};
+
+let staticFacets: Promise<FacetSummary | null> | null = null;
+
+/**
+ * Load public/facets.json once per page (or server process); null when it is
+ * missing, in which case callers fall back to Algolia facet queries.
+ * Browsers fetch the served file, so a re-run of the pipeline shows up
+ * without a rebuild. A relative URL means nothing on the server (RSC, route
+ * handlers, SSR), so there the copy bundled at build time is used.
+ */
+export function getStaticFacets(): Promise<FacetSummary | null> {
+  if (!staticFacets) {
+    staticFacets =
+      typeof window === 'undefined'
+        ? import('@/public/facets.json')
+            .then(mod => mod.default as unknown as FacetSummary)
+            .catch(() => null)
+        : fetch(new URL('/facets.json', window.location.origin))
+            .then(res => (res.ok ? res.json() : null))
+            .catch(() => null);
+  }
+  return staticFacets;
+}
+
+function facetEntries(counts: FacetCounts): { value: string; count: number }[] {
+  return Object.entries(counts)
+    .map(([value, count]) => ({ value, count }))
+    .sort((a, b) => b.count - a.count);
+}
+
 /**
  * Search startups index with optional filters
  * v5 API: https://www.algolia.com/doc/libraries/sdk/methods/search/search
@@ -135,6 +245,7 @@ export async function searchStartups(
       hitsPerPage: options?.hitsPerPage || 20,
       filters: filterString || undefined,
       facetFilters: options?.facetFilters,
+      attributesToRetrieve: STARTUP_LIST_ATTRIBUTES,
       attributesToHighlight: ['name', 'description', 'category'],
       highlightPreTag: '<em>',
       highlightPostTag: '</em>',
@@ -144,7 +255,7 @@ export async function searchStartups(
       requests: [searchParams],
     });
 
-    return (results[0] as any)?.hits || [];
+    return await companyHits(algolia, (results[0] as any)?.hits || []);
   } catch (error) {
     console.error('Algolia search error:', error);
     return [];
@@ -200,6 +311,7 @@ export async function searchAll(query: string): Promise<(Startup | FailedStartup
           indexName: 'startups',
           query,
           hitsPerPage: 20,
+          attributesToRetrieve: STARTUP_LIST_ATTRIBUTES,
           attributesToHighlight: ['name', 'description', 'category'],
           highlightPreTag: '<em>',
           highlightPostTag: '</em>',
@@ -217,7 +329,7 @@ export async function searchAll(query: string): Promise<(Startup | FailedStartup
     });
 
     // Type assertions for hits from search responses
-    const startups = (results[0] as any)?.hits || [];
+    const startups = await companyHits(algolia, (results[0] as any)?.hits || []);
     const graveyard = (results[1] as any)?.hits || [];
 
     return [...startups, ...graveyard];
@@ -245,11 +357,12 @@ export async function getTopStartups(): Promise<Startup[]> {
           hitsPerPage: 100, // Get more to sort locally
           // Filter for startups with survival_score >= 40 (good survival rate)
           filters: 'survival_score >= 40',
+          attributesToRetrieve: STARTUP_LIST_ATTRIBUTES,
         },
       ],
     });
 
-    const hits = (results[0] as any)?.hits || [];
+    const hits = await companyHits(algolia, (results[0] as any)?.hits || []);
     // Sort by survival_score descending
     return hits
       .filter((h: Startup) => h.survival_score !== undefined)
@@ -298,6 +411,11 @@ export async function getTopGraveyardEntries(): Promise<FailedStartup[]> {
  * Returns array of category names with counts
  */
 export async function getCategories(): Promise<{ name: string; count: number }[]> {
+  const summary = await getStaticFacets();
+  if (summary) {
+    return facetEntries(summary.startups.facets.category).map(f => ({ name: f.value, count: f.count }));
+  }
+
   const algolia = getAlgoliaClient();
   if (!algolia) return [];
 
@@ -310,6 +428,8 @@ export async function getCategories(): Promise<{ name: string; count: number }[]
           query: '',
           hitsPerPage: 0,
           facets: ['category'],
+          // Count companies, not their paragraph records
+          facetingAfterDistinct: true,
         },
       ],
     });
@@ -340,11 +460,12 @@ export async function searchStartupsByCategory(category: string): Promise<Startu
           query: '',
           hitsPerPage: 50,
           filters: `category:"${category}"`,
+          attributesToRetrieve: STARTUP_LIST_ATTRIBUTES,
         },
       ],
     });
 
-    return (results[0] as any)?.hits || [];
+    return await companyHits(algolia, (results[0] as any)?.hits || []);
   } catch (error) {
     console.error('Algolia searchStartupsByCategory error:', error);
     return [];
@@ -382,6 +503,12 @@ export async function searchGraveyardByCategory(category: string): Promise<Faile
  * Get graveyard categories with counts
  */
 export async function getGraveyardCategories(): Promise<{ name: string; count: number }[]> {
+  const summary = await getStaticFacets();
+  if (summary) {
+    // Graveyard records use their sector as category
+    return facetEntries(summary.graveyard.facets.sector).map(f => ({ name: f.value, count: f.count }));
+  }
+
   const algolia = getAlgoliaClient();
   if (!algolia) return [];
 
@@ -408,10 +535,27 @@ export async function getGraveyardCategories(): Promise<{ name: string; count: n
   }
 }
 
+/**
+ * Non-empty batches, newest first; shared by the static and search paths so
+ * both return the same list
+ */
+function sortBatches(batches: { value: string; count: number }[]): { value: string; count: number }[] {
+  return batches.filter(f => f.value).sort((a, b) => {
+    const aYear = parseInt(a.value.replace(/\D/g, '')) || 0;
+    const bYear = parseInt(b.value.replace(/\D/g, '')) || 0;
+    return bYear - aYear;
+  });
+}
+
 /**
  * Get YC batch facets with counts
  */
 export async function getBatchFacets(): Promise<{ value: string; count: number }[]> {
+  const summary = await getStaticFacets();
+  if (summary) {
+    return sortBatches(facetEntries(summary.startups.facets.batch));
+  }
+
   const algolia = getAlgoliaClient();
   if (!algolia) return [];
 
@@ -424,19 +568,16 @@ export async function getBatchFacets(): Promise<{ value: string; count: number }
           query: '',
           hitsPerPage: 0,
           facets: ['batch'],
+          // Count companies, not their paragraph records
+          facetingAfterDistinct: true,
         },
       ],
     });
 
     const facets = (results[0] as any)?.facets?.batch || {};
-    return Object.entries(facets)
-      .map(([value, count]) => ({ value, count: count as number }))
-      .filter(f => f.value)
-      .sort((a, b) => {
-        const aYear = parseInt(a.value.replace(/\D/g, '')) || 0;
-        const bYear = parseInt(b.value.replace(/\D/g, '')) || 0;
-        return bYear - aYear;
-      });
+    return sortBatches(
+      Object.entries(facets).map(([value, count]) => ({ value, count: count as number }))
+    );
   } catch (error) {
     console.error('Algolia getBatchFacets error:', error);
     return [];
@@ -447,6 +588,11 @@ export async function getBatchFacets(): Promise<{ value: string; count: number }
  * Get status facets with counts
  */
 export async function getStatusFacets(): Promise<{ value: string; count: number }[]> {
+  const summary = await getStaticFacets();
+  if (summary) {
+    return facetEntries(summary.startups.facets.status);
+  }
+
   const algolia = getAlgoliaClient();
   if (!algolia) return [];
 
@@ -459,6 +605,8 @@ export async function getStatusFacets(): Promise<{ value: string; count: number
           query: '',
           hitsPerPage: 0,
           facets: ['status'],
+          // Count companies, not their paragraph records
+          facetingAfterDistinct: true,
         },
       ],
     });
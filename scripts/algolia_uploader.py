@@ -0,0 +1,336 @@
+"""
+Asyncio uploader for the startups and graveyard indices (process-data.py --upload).
+
+Records are cut into batch requests (same caps as the upload shards) and sent
+over a small pool of keep-alive HTTP/1.1 connections, with up to
+`concurrency` batches in flight. Each index is loaded into a temporary index
+that is moved over the live one once every batch is published, like
+replaceAllObjects in upload-to-algolia.js.
+
+Failed requests are retried with exponential backoff and jitter. A 429, or
+X-RateLimit-Remaining reaching 0, pauses every worker until the server's
+Retry-After / X-RateLimit-Reset time instead of letting them all hammer it.
+
+Stdlib only: the HTTP client speaks just enough HTTP/1.1 (Content-Length and
+chunked bodies, keep-alive) for the Algolia REST API and mock_algolia.py.
+"""
+
+import asyncio
+import json
+import random
+import ssl
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from compact_records import json_default
+from ndjson_shards import MAX_SHARD_BYTES, MAX_SHARD_RECORDS
+
+SETTINGS_PATH = Path(__file__).resolve().parent / "index-settings.json"
+
+DEFAULT_CONCURRENCY = 4
+MAX_ATTEMPTS = 6
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 10.0
+TASK_POLL_INTERVAL = 0.1
+REQUEST_TIMEOUT = 60.0
+
+# Statuses worth retrying; other 4xx mean the request itself is wrong
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class AlgoliaError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+
+
+def load_index_settings() -> Dict[str, Dict[str, Any]]:
+    """Index settings shared with upload-to-algolia.js."""
+    with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class HttpPool:
+    """At most `size` keep-alive connections to one origin, reused across requests."""
+
+    def __init__(self, base_url: str, size: int, headers: Dict[str, str]):
+        url = urlsplit(base_url)
+        self.host = url.hostname
+        self.tls = url.scheme == "https"
+        self.port = url.port or (443 if self.tls else 80)
+        self.headers = {"Host": url.netloc, "Connection": "keep-alive", **headers}
+        self._ssl = ssl.create_default_context() if self.tls else None
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(size)
+        self.connections_opened = 0
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self._ssl)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, Dict[str, str], bytes]:
+        async with self._slots:
+            reused = bool(self._idle)
+            conn = self._idle.pop() if reused else await self._open()
+            try:
+                status, headers, payload = await asyncio.wait_for(
+                    self._send(conn, method, path, body), REQUEST_TIMEOUT
+                )
+            except (ConnectionError, asyncio.IncompleteReadError) as error:
+                conn.close()
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; one fresh try
+                conn = await self._open()
+                try:
+                    status, headers, payload = await asyncio.wait_for(
+                        self._send(conn, method, path, body), REQUEST_TIMEOUT
+                    )
+                except BaseException:
+                    conn.close()
+                    raise error
+            except BaseException:
+                conn.close()
+                raise
+            if headers.get("connection", "").lower() == "close":
+                conn.close()
+            else:
+                self._idle.append(conn)
+            return status, headers, payload
+
+    async def _send(self, conn: _Connection, method: str, path: str, body: Optional[bytes]):
+        lines = [f"{method} {path} HTTP/1.1"]
+        lines += [f"{k}: {v}" for k, v in self.headers.items()]
+        if body is not None:
+            lines.append("Content-Type: application/json; charset=utf-8")
+            lines.append(f"Content-Length: {len(body)}")
+        conn.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+        headers: Dict[str, str] = {}
+        while True:
+            line = await conn.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await conn.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await conn.reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await conn.reader.readexactly(size))
+                await conn.reader.readexactly(2)
+            payload = b"".join(chunks)
+        else:
+            payload = await conn.reader.readexactly(int(headers.get("content-length", 0)))
+        return status, headers, payload
+
+    def close(self):
+        for conn in self._idle:
+            conn.close()
+        self._idle = []
+
+
+def batch_bodies(
+    records: Iterable[Dict[str, Any]],
+    max_records: int = MAX_SHARD_RECORDS,
+    max_bytes: int = MAX_SHARD_BYTES,
+) -> Iterable[Tuple[int, bytes]]:
+    """(record count, JSON body) for each batch request, capped like the upload shards."""
+    parts: List[bytes] = []
+    size = 0
+    for record in records:
+        part = b'{"action":"addObject","body":' + json.dumps(
+            record, ensure_ascii=False, separators=(",", ":"), default=json_default
+        ).encode("utf-8") + b"}"
+        if parts and (len(parts) >= max_records or size + len(part) > max_bytes):
+            yield len(parts), b'{"requests":[' + b",".join(parts) + b"]}"
+            parts, size = [], 0
+        parts.append(part)
+        size += len(part) + 1
+    if parts:
+        yield len(parts), b'{"requests":[' + b",".join(parts) + b"]}"
+
+
+class AlgoliaUploader:
+    """Replaces whole indices through the Algolia REST API."""
+
+    def __init__(
+        self,
+        app_id: str,
+        api_key: str,
+        base_url: Optional[str] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        self.base_url = base_url or f"https://{app_id}.algolia.net"
+        self.concurrency = max(1, concurrency)
+        self.headers = {
+            "X-Algolia-Application-Id": app_id,
+            "X-Algolia-API-Key": api_key,
+            "User-Agent": "startup-roast-uploader",
+        }
+        self.pool: Optional[HttpPool] = None
+        self.stats = {"records": 0, "requests": 0, "retries": 0, "rate_limited": 0}
+        self._paused_until = 0.0
+
+    async def _call(self, method: str, path: str, payload: Any = None, allow: Tuple[int, ...] = ()) -> Tuple[int, Dict[str, Any]]:
+        body = payload if isinstance(payload, (bytes, type(None))) else json.dumps(payload).encode("utf-8")
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            delay = self._paused_until - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.stats["requests"] += 1
+            try:
+                status, headers, data = await self.pool.request(method, path, body)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as error:
+                status, headers, data = None, {}, str(error).encode()
+
+            if status is not None and (status < 300 or status in allow):
+                self._note_rate_limit(headers)
+                return status, json.loads(data) if data else {}
+            if status is not None and status not in RETRY_STATUSES:
+                raise AlgoliaError(status, data.decode("utf-8", "replace"))
+            if attempt == MAX_ATTEMPTS:
+                raise AlgoliaError(status or 0, f"{method} {path} failed after {attempt} attempts: {data[:200]!r}")
+
+            self.stats["retries"] += 1
+            wait = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt - 1)) * (0.5 + random.random())
+            if status == 429:
+                self.stats["rate_limited"] += 1
+                wait = max(wait, float(headers.get("retry-after") or 0))
+                self._paused_until = max(self._paused_until, time.monotonic() + wait)
+            await asyncio.sleep(wait)
+
+    def _note_rate_limit(self, headers: Dict[str, str]):
+        # Pause everyone when the quota is used up, rather than waiting for 429s
+        if headers.get("x-ratelimit-remaining") == "0" and headers.get("x-ratelimit-reset"):
+            wait = float(headers["x-ratelimit-reset"]) - time.time()
+            if wait > 0:
+                self._paused_until = max(self._paused_until, time.monotonic() + min(wait, BACKOFF_CAP))
+
+    async def _wait_for_task(self, index_name: str, task_id: int):
+        path = f"/1/indexes/{quote(index_name)}/task/{task_id}"
+        while True:
+            _, task = await self._call("GET", path)
+            if task.get("status") == "published":
+                return
+            await asyncio.sleep(TASK_POLL_INTERVAL)
+
+    async def replace_index(self, index_name: str, records: Iterable[Dict[str, Any]], settings: Dict[str, Any]) -> int:
+        """
+        Load records into <index>_upload_tmp, then move it over index_name.
+        The temporary index is deleted first: a failed run leaves its records
+        there, and neither a scoped copy nor the move would drop them.
+        Synonyms, rules and settings are copied from the live index when it
+        exists (so dashboard edits survive), then settings are applied on
+        top, so every change to index-settings.json reaches the index.
+        """
+        tmp_name = f"{index_name}_upload_tmp"
+        index_path = f"/1/indexes/{quote(index_name)}"
+        tmp_path = f"/1/indexes/{quote(tmp_name)}"
+
+        _, task = await self._call("DELETE", tmp_path, allow=(404,))
+        if "taskID" in task:
+            await self._wait_for_task(tmp_name, task["taskID"])
+
+        status, _ = await self._call("GET", f"{index_path}/settings", allow=(404,))
+        if status != 404:
+            _, task = await self._call("POST", f"{index_path}/operation", {
+                "operation": "copy", "destination": tmp_name, "scope": ["settings", "synonyms", "rules"],
+            })
+            # The copy replaces the temporary index's settings, so it has to land first
+            await self._wait_for_task(index_name, task["taskID"])
+        _, task = await self._call("PUT", f"{tmp_path}/settings", settings)
+        last_task = task["taskID"]
+
+        # Bounded queue: batches are only built as fast as the workers send them
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        errors: List[BaseException] = []
+        count = 0
+
+        async def worker():
+            nonlocal last_task
+            while True:
+                body = await queue.get()
+                if body is None:
+                    return
+                if errors:
+                    # Keep draining so the producer never blocks on a full queue
+                    continue
+                try:
+                    _, response = await self._call("POST", f"{tmp_path}/batch", body)
+                    last_task = max(last_task, response["taskID"])
+                except Exception as error:
+                    errors.append(error)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        for n, body in batch_bodies(records):
+            if errors:
+                break
+            await queue.put(body)
+            count += n
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+        if errors:
+            # The live index is untouched; only the temporary one is incomplete
+            raise errors[0]
+
+        # Tasks on one index are applied in order, so the last one covers them all
+        await self._wait_for_task(tmp_name, last_task)
+        _, task = await self._call("POST", f"{tmp_path}/operation", {"operation": "move", "destination": index_name})
+        await self._wait_for_task(index_name, task["taskID"])
+        self.stats["records"] += count
+        return count
+
+    async def replace_indices(self, indices: Dict[str, Tuple[Iterable[Dict[str, Any]], Dict[str, Any]]]) -> Dict[str, int]:
+        self.pool = HttpPool(self.base_url, self.concurrency, self.headers)
+        try:
+            return {
+                name: await self.replace_index(name, records, settings)
+                for name, (records, settings) in indices.items()
+            }
+        finally:
+            self.stats["connections"] = self.pool.connections_opened
+            self.pool.close()
+
+
+def upload_indices(
+    indices: Dict[str, Iterable[Dict[str, Any]]],
+    app_id: str,
+    api_key: str,
+    base_url: Optional[str] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Dict[str, Any]:
+    """Replace each index with its records; returns per-index counts and request stats."""
+    settings = load_index_settings()
+    uploader = AlgoliaUploader(app_id, api_key, base_url, concurrency)
+    start = time.perf_counter()
+    counts = asyncio.run(uploader.replace_indices(
+        {name: (records, settings.get(name, {})) for name, records in indices.items()}
+    ))
+    seconds = time.perf_counter() - start
+    return {
+        "indices": counts,
+        "seconds": round(seconds, 3),
+        "records_per_sec": round(uploader.stats["records"] / seconds, 1) if seconds > 0 else None,
+        **uploader.stats,
+    }
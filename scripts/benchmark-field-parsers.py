@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for field_parsers.py against the previous eval()/re-per-call
+implementations, run over the raw cells of the real (or --data-dir) CSVs.
+
+For each parser it reports the per-row cost of the old version, of the new one
+with cold caches, and of a second pass over warm caches. It also checks that
+both versions return the same values.
+
+Usage:
+    python scripts/benchmark-field-parsers.py
+    python scripts/benchmark-field-parsers.py --data-dir data/bench/yc-100000-seed42
+"""
+
+import argparse
+import csv
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import field_parsers
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+# Previous implementations, kept here as the baseline
+def legacy_parse_tags(tags_str: str) -> List[str]:
+    if not tags_str or tags_str == "[]":
+        return []
+    tags_str = tags_str.strip("[]'")
+    tags = [t.strip().strip('"').strip("'") for t in tags_str.split(",")]
+    return [t for t in tags if t]
+
+
+def legacy_extract_year(year_str: str) -> int:
+    if not year_str:
+        return None
+    match = re.search(r"\d{4}", str(year_str))
+    return int(match.group()) if match else None
+
+
+def legacy_parse_founders(founders_str: str) -> List[Dict[str, str]]:
+    if not founders_str or founders_str == "[]":
+        return []
+    try:
+        founders = eval(founders_str) if isinstance(founders_str, str) else founders_str
+        if isinstance(founders, list):
+            return [{"name": f.get("name", ""), "title": f.get("title", "")} for f in founders]
+    except:
+        pass
+    return []
+
+
+def legacy_parse_funding(funding_str: str) -> int:
+    if not funding_str:
+        return 0
+    funding_str = str(funding_str).strip()
+    funding_str = re.sub(r'\(est\.\)', '', funding_str, flags=re.IGNORECASE)
+    funding_str = funding_str.strip().lower()
+    if funding_str in ['n/a', '', '-', '0', '$0']:
+        return 0
+    match = re.search(r'\$?([\d.]+)([kmb]?)', funding_str, re.IGNORECASE)
+    if not match:
+        return 0
+    amount = float(match.group(1))
+    unit = match.group(2).lower() if match.group(2) else ''
+    if unit == 'b':
+        return int(amount * 1_000_000_000)
+    elif unit == 'm':
+        return int(amount * 1_000_000)
+    elif unit == 'k':
+        return int(amount * 1_000)
+    return int(amount)
+
+
+def legacy_extract_years(years_str: str) -> Dict[str, int]:
+    if not years_str:
+        return {"start": None, "end": None, "duration": None}
+    years = re.findall(r'\d{4}', str(years_str))
+    if len(years) >= 2:
+        return {"start": int(years[0]), "end": int(years[-1]), "duration": int(years[-1]) - int(years[0])}
+    elif len(years) == 1:
+        return {"start": int(years[0]), "end": None, "duration": None}
+    return {"start": None, "end": None, "duration": None}
+
+
+def load_cells(data_dir: Path) -> Dict[str, List[str]]:
+    cells: Dict[str, List[str]] = {"tags": [], "year_founded": [], "founders": [], "funding": [], "years": []}
+    with open(data_dir / "yc.csv", "r", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            cells["tags"].append(row.get("tags", "[]"))
+            cells["year_founded"].append(row.get("year_founded"))
+            cells["founders"].append(row.get("founders", "[]"))
+    for path in sorted((data_dir / "Fails").glob("*.csv")):
+        with open(path, "r", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                cells["funding"].append(row.get("How Much They Raised") or "0")
+                cells["years"].append(row.get("Years of Operation") or row.get("Years") or "")
+    return cells
+
+
+def time_pass(fn: Callable[[Any], Any], values: List[str]) -> float:
+    start = time.perf_counter()
+    for value in values:
+        fn(value)
+    return time.perf_counter() - start
+
+
+def clear_caches():
+    for name in ("_parse_tags", "_extract_year", "_parse_founders", "_parse_funding", "_extract_years"):
+        getattr(field_parsers, name).cache_clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the field parsers.")
+    parser.add_argument("--data-dir", type=Path, default=ROOT_DIR / "data")
+    parser.add_argument("--repeat", type=int, default=5, help="best of N passes (default: 5)")
+    args = parser.parse_args()
+
+    cells = load_cells(args.data_dir)
+    benchmarks = [
+        ("parse_tags", "tags", legacy_parse_tags, field_parsers.parse_tags),
+        ("extract_year", "year_founded", legacy_extract_year, field_parsers.extract_year),
+        ("parse_founders", "founders", legacy_parse_founders, field_parsers.parse_founders),
+        ("parse_funding", "funding", legacy_parse_funding, field_parsers.parse_funding),
+        ("extract_years", "years", legacy_extract_years, field_parsers.extract_years),
+    ]
+
+    print(f"🧪 Field parser microbenchmarks ({args.data_dir}, best of {args.repeat})\n")
+    print(f"   {'parser':<16} {'rows':>8} {'distinct':>9} {'old µs/row':>11} {'cold µs/row':>12} {'warm µs/row':>12} {'speedup':>8}")
+    for name, column, old, new in benchmarks:
+        values = cells[column]
+        if not values:
+            continue
+        mismatches = sum(1 for v in values if old(v) != new(v))
+
+        old_time = min(time_pass(old, values) for _ in range(args.repeat))
+        cold_times = []
+        for _ in range(args.repeat):
+            clear_caches()
+            cold_times.append(time_pass(new, values))
+        cold_time = min(cold_times)
+        warm_time = min(time_pass(new, values) for _ in range(args.repeat))
+
+        per_row = lambda t: t / len(values) * 1e6
+        print(
+            f"   {name:<16} {len(values):>8} {len(set(values)):>9} {per_row(old_time):>11.2f} "
+            f"{per_row(cold_time):>12.2f} {per_row(warm_time):>12.2f} {old_time / cold_time:>7.1f}x"
+        )
+        if mismatches:
+            print(f"   ⚠️  {name}: {mismatches} rows differ from the old parser")
+
+
+if __name__ == "__main__":
+    main()
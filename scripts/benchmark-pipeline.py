@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark process-data.py stage by stage on synthetic inputs.
+
+For each size, seeded inputs are generated once under --work-dir (and reused
+on later runs), then a fresh worker process runs the pipeline stages in order
+and reports wall time, CPU time, throughput and peak RSS for each (see
+pipeline_metrics.py), along with the fallback counters. Results are written
+as JSON tagged with the git commit, so two runs can be diffed to spot
+regressions.
+
+The pipeline holds its records as plain dicts unless run with --compact
+(compact slotted objects, compact_records.py). --records compact benchmarks
+that form; --records both runs every size in each form and reports how much
+resident memory the records take in each.
+
+Usage:
+    python scripts/benchmark-pipeline.py                       # 10k, 100k, 1M rows
+    python scripts/benchmark-pipeline.py --sizes 10000 --jobs 4
+    python scripts/benchmark-pipeline.py --sizes 10000 --upload 8   # + mock Algolia upload
+    python scripts/benchmark-pipeline.py --sizes 100000 --records both  # compact vs dict records
+"""
+
+import argparse
+import csv
+import gc
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+ROOT_DIR = SCRIPTS_DIR.parent
+DEFAULT_WORK_DIR = ROOT_DIR / "data" / "bench"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RECORD_MODES = ("compact", "dict")
+
+
+def load_script(filename: str, module_name: str):
+    """Import a hyphenated script from scripts/ as a module."""
+    if str(SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(SCRIPTS_DIR))
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPTS_DIR / filename)
+    module = importlib.util.module_from_spec(spec)
+    # Registered before exec so process-pool workers can unpickle its functions
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(metrics, name: str, rows_in: int, fn: Callable[[], Any], rows_out: Callable[[Any], int] = len) -> Any:
+    """Run fn once as a metrics stage and echo its line; returns fn's result."""
+    with metrics.stage(name, rows_in) as stage:
+        result = fn()
+    stage.rows_out = rows_out(result)
+    row = stage.to_dict()
+    print(f"   {name:<24} {stage.wall_seconds:8.3f}s  {row['rows_per_sec'] or 0:>12,.0f} rows/s  peak {row['peak_rss_mb']:,.1f} MB")
+    return result
+
+
+def count_csv_rows(path: Path) -> int:
+    with open(path, encoding="utf-8", newline="") as f:
+        return sum(1 for _ in csv.reader(f)) - 1
+
+
+def run_stages(data_dir: Path, jobs: int, upload_concurrency: int = 0, records: str = "dict") -> Dict[str, Any]:
+    """Worker side: run each pipeline stage once against data_dir."""
+    pipeline = load_script("process-data.py", "process_data")
+    from pipeline_metrics import MB, current_rss_bytes
+
+    out_dir = Path(tempfile.mkdtemp(prefix="bench-out-"))
+    pipeline.configure_paths(data_dir, out_dir)
+    # Benchmarks measure parsing, not the snapshot cache
+    pipeline.USE_SNAPSHOTS = False
+    pipeline.COMPACT_RECORDS = records == "compact"
+    rss_start = current_rss_bytes()
+
+    yc_rows = count_csv_rows(data_dir / "yc.csv")
+    fail_rows = sum(count_csv_rows(path) for path in (data_dir / "Fails").glob("*.csv"))
+
+    metrics = pipeline.METRICS
+    metrics.reset()
+    startups = measure(metrics, "process_yc_data", yc_rows, lambda: pipeline.process_yc_data(jobs))
+    fails = measure(metrics, "process_fails_data", fail_rows, pipeline.process_fails_data)
+    clusters = measure(metrics, "find_competitor_clusters", len(startups),
+                       lambda: pipeline.find_competitor_clusters(startups))
+    startups = list(clusters.attach(startups))
+    startups = measure(metrics, "enhance_with_insights", len(startups), lambda: pipeline.enhance_with_insights(startups))
+
+    # What the parsed, scored records keep resident (parser caches included,
+    # which are the same in both record modes)
+    gc.collect()
+    metrics.info["records"] = records
+    metrics.info["records_rss_mb"] = round((current_rss_bytes() - rss_start) / MB, 1)
+    print(f"   {'records held (' + records + ')':<24} {metrics.info['records_rss_mb']:,.1f} MB")
+
+    def write_json():
+        for name, records in (("startups.json", startups), ("graveyard.json", fails)):
+            with open(out_dir / name, "w", encoding="utf-8") as f:
+                json.dump(records, f, indent=2, ensure_ascii=False, default=pipeline.json_default)
+        return len(startups) + len(fails)
+
+    measure(metrics, "write_json", len(startups) + len(fails), write_json, rows_out=lambda n: n)
+    metrics.stages[-1].extra["bytes_out"] = sum((out_dir / n).stat().st_size for n in ("startups.json", "graveyard.json"))
+
+    def write_ndjson():
+        return (pipeline.write_ndjson(startups, out_dir / "startups.ndjson")
+                + pipeline.write_ndjson(fails, out_dir / "graveyard.ndjson"))
+
+    measure(metrics, "write_ndjson", len(startups) + len(fails), write_ndjson, rows_out=lambda n: n)
+
+    if upload_concurrency:
+        from algolia_uploader import upload_indices
+        from mock_algolia import MockAlgoliaServer
+
+        base_url = MockAlgoliaServer().start_in_thread()
+
+        def upload():
+            return upload_indices(
+                {"startups": startups, "graveyard": fails}, "bench", "bench", base_url, upload_concurrency
+            )
+
+        result = measure(metrics, "upload_mock", len(startups) + len(fails), upload, rows_out=lambda r: r["records"])
+        metrics.stages[-1].extra.update({k: result[k] for k in ("requests", "retries", "connections")})
+
+    for path in out_dir.iterdir():
+        path.unlink()
+    out_dir.rmdir()
+    return metrics.to_dict()
+
+
+def ensure_dataset(work_dir: Path, rows: int, seed: int) -> Path:
+    """Generate (or reuse) the synthetic inputs for one size."""
+    data_dir = work_dir / f"yc-{rows}-seed{seed}"
+    stamp = data_dir / ".complete"
+    if not stamp.exists():
+        print(f"🧪 Generating {rows:,} synthetic startups in {data_dir}...")
+        generator = load_script("generate-synthetic-data.py", "generate_synthetic_data")
+        generator.generate(data_dir, rows, seed)
+        stamp.touch()
+    return data_dir
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the data processing pipeline.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated yc.csv row counts (default: 10000,100000,1000000)")
+    parser.add_argument("--jobs", type=int, default=1, help="process_yc_data worker processes")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--work-dir", type=Path, default=DEFAULT_WORK_DIR,
+                        help="where synthetic inputs are generated and cached")
+    parser.add_argument("--upload", type=int, default=0, metavar="N",
+                        help="also time an upload to a local mock Algolia with N requests in flight")
+    parser.add_argument("--records", choices=RECORD_MODES + ("both",), default="dict",
+                        help="in-memory record form; both runs each size twice and reports the memory saved")
+    parser.add_argument("--output", type=Path, help="results file (default: <work-dir>/results-<commit>.json)")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # One size in a fresh process, so RSS is not inflated by earlier sizes
+        print(json.dumps(run_stages(args.worker, args.jobs, args.upload, args.records)))
+        return
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "jobs": args.jobs,
+        "upload_concurrency": args.upload,
+        "records": args.records,
+        "seed": args.seed,
+        "runs": [],
+    }
+
+    modes = RECORD_MODES if args.records == "both" else (args.records,)
+    for rows in (int(s) for s in args.sizes.split(",")):
+        data_dir = ensure_dataset(args.work_dir, rows, args.seed)
+        by_mode = {}
+        for mode in modes:
+            print(f"\n⏱️  {rows:,} rows ({mode} records)")
+            proc = subprocess.run(
+                [sys.executable, __file__, "--worker", str(data_dir), "--jobs", str(args.jobs),
+                 "--upload", str(args.upload), "--records", mode],
+                stdout=subprocess.PIPE, text=True, check=True,
+            )
+            # Stage lines are echoed by the worker; the JSON payload is the last line
+            lines = proc.stdout.strip().splitlines()
+            print("\n".join(line for line in lines[:-1] if line.startswith("   ")))
+            by_mode[mode] = {"rows": rows, **json.loads(lines[-1])}
+            results["runs"].append(by_mode[mode])
+        if len(by_mode) == 2:
+            compact, plain = by_mode["compact"], by_mode["dict"]
+            saved = {key: plain[key] - compact[key] for key in ("records_rss_mb", "peak_rss_mb")}
+            compact["memory_saved_mb"] = {key: round(value, 1) for key, value in saved.items()}
+            print(
+                f"   compact records hold {compact['records_rss_mb']:,.1f} MB vs {plain['records_rss_mb']:,.1f} MB as dicts "
+                f"({saved['records_rss_mb'] / max(plain['records_rss_mb'], 0.1):.0%} less); "
+                f"peak RSS {compact['peak_rss_mb']:,.1f} vs {plain['peak_rss_mb']:,.1f} MB"
+            )
+
+    output = args.output or args.work_dir / f"results-{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Compact in-memory records for the pipeline.
+
+A parsed startup is a dict of 18 keys. Later stages add up to 8 more,
+including a nested survival_breakdown dict. A graveyard entry has about 30
+keys, 14 of them boolean failure flags. At scaled-up inputs the per-dict
+overhead dominates RSS: a hash table per record, plus a fresh str for every
+repeated value. Records held in memory are therefore slotted objects built
+by record_class():
+
+- one slot per field; a field no stage has set yet is an empty slot
+- failure flags packed into one int bitmask
+- repeated short strings (batch, status, category, location, sector, tags)
+  interned, so all records share one copy
+- survival_breakdown kept as one shared tuple per distinct breakdown
+- founders kept as (name, title) tuples
+
+Records are still mutable mappings, so every stage that reads or sets fields
+works on them unchanged. Their keys iterate in the order the equivalent dict
+would have: fixed fields first, then added fields in the order they were
+set. json_default turns a record into that dict for json.dump(s), so the
+output is byte-for-byte the same.
+
+tags, founders and survival_breakdown read back as a fresh list or dict, so
+changing one in place is lost: set the field again instead. The pipeline uses
+these records only with --compact, since every field access costs more than
+a dict lookup.
+"""
+
+import sys
+from collections.abc import MutableMapping
+from itertools import islice
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, Sequence, Tuple
+
+# Key orders of added fields, shared by every record that set them in the same order
+_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+# One tuple per distinct survival_breakdown
+_BREAKDOWNS: Dict[Tuple[Tuple[str, Any], ...], Tuple[Tuple[str, Any], ...]] = {}
+
+
+def _order(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    return _ORDERS.setdefault(keys, keys)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+def _pack_tags(tags: Any) -> Any:
+    if type(tags) is not list or not all(type(t) is str for t in tags):
+        return tags
+    return tuple(map(sys.intern, tags))
+
+
+def _unpack_tags(tags: Any) -> Any:
+    return list(tags) if type(tags) is tuple else tags
+
+
+def _pack_founders(founders: Any) -> Any:
+    if type(founders) is not list or not all(type(f) is dict and tuple(f) == ("name", "title") for f in founders):
+        return founders
+    return tuple((f["name"], _intern(f["title"])) for f in founders)
+
+
+def _unpack_founders(founders: Any) -> Any:
+    if type(founders) is not tuple:
+        return founders
+    return [{"name": name, "title": title} for name, title in founders]
+
+
+def _pack_breakdown(breakdown: Any) -> Any:
+    if type(breakdown) is not dict:
+        return breakdown
+    items = tuple(breakdown.items())
+    return _BREAKDOWNS.setdefault(items, items)
+
+
+def _unpack_breakdown(breakdown: Any) -> Any:
+    # A fresh dict per read, as ScoreColumns.apply gives each record its own
+    return dict(breakdown) if type(breakdown) is tuple else breakdown
+
+
+# field -> (pack, unpack) for fields stored in another shape than their JSON value
+CODECS: Dict[str, Tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {
+    "tags": (_pack_tags, _unpack_tags),
+    "founders": (_pack_founders, _unpack_founders),
+    "survival_breakdown": (_pack_breakdown, _unpack_breakdown),
+}
+
+
+class CompactRecord(MutableMapping):
+    """
+    Base of the classes record_class() builds. Keys outside FIELDS and
+    ADDED_FIELDS still work; they go to a per-record dict.
+    """
+
+    __slots__ = ("_added", "_more")
+
+    FIELDS: Tuple[str, ...] = ()
+    ADDED_FIELDS: Tuple[str, ...] = ()
+    FLAGS: Tuple[str, ...] = ()
+    _FIELD_SET: frozenset = frozenset()
+    _SLOTS: frozenset = frozenset()
+    # Slots read back as stored
+    _PLAIN: frozenset = frozenset()
+    _FLAG_BITS: Dict[str, int] = {}
+    _PACK: Dict[str, Callable[[Any], Any]] = {}
+    _UNPACK: Dict[str, Callable[[Any], Any]] = {}
+    # Fixed fields that have slots, in order, and a getter returning all of them
+    _FIXED_SLOTS: Tuple[str, ...] = ()
+    _GET_FIXED: Callable[[Any], Tuple[Any, ...]] = staticmethod(lambda record: ())
+    _FIXED_UNPACK: Tuple[Tuple[str, Callable[[Any], Any]], ...] = ()
+    # (index in FIELDS, bit) per flag, ascending
+    _FLAG_POSITIONS: Tuple[Tuple[int, int], ...] = ()
+    # Slots set as given
+    _SET_PLAIN: frozenset = frozenset()
+
+    def __init__(self, record: Dict[str, Any]):
+        """Copy a dict whose keys start with FIELDS, in that order."""
+        fields = self.FIELDS
+        if tuple(islice(record, len(fields))) != fields:
+            raise ValueError(f"{type(self).__name__} needs the keys {fields}, got {tuple(record)}")
+        self._added = ()
+        self._more = None
+        if self.FLAGS:
+            self._flags = 0
+        flag_bits, packs = self._FLAG_BITS, self._PACK
+        values = iter(record.values())
+        for key, value in zip(fields, values):
+            if key in flag_bits:
+                self[key] = value
+            else:
+                pack = packs.get(key)
+                setattr(self, key, value if pack is None else pack(value))
+        # Whatever follows the fixed fields, in order
+        for key, value in islice(record.items(), len(fields), None):
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._PLAIN:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        bit = self._FLAG_BITS.get(key)
+        if bit is not None:
+            return bool(self._flags >> bit & 1)
+        if key in self._SLOTS:
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._more is not None and key in self._more:
+            value = self._more[key]
+        else:
+            raise KeyError(key)
+        unpack = self._UNPACK.get(key)
+        return value if unpack is None else unpack(value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._SET_PLAIN:
+            if key not in self._FIELD_SET and not hasattr(self, key):
+                self._added = _order(self._added + (key,))
+            setattr(self, key, value)
+            return
+        bit = self._FLAG_BITS.get(key)
+        if bit is not None:
+            if type(value) is not bool:
+                raise TypeError(f"flag {key!r} must be a bool, got {value!r}")
+            self._flags = self._flags | (1 << bit) if value else self._flags & ~(1 << bit)
+            return
+        pack = self._PACK.get(key)
+        if pack is not None:
+            value = pack(value)
+        if key in self._SLOTS:
+            if key not in self._FIELD_SET and not hasattr(self, key):
+                self._added = _order(self._added + (key,))
+            setattr(self, key, value)
+            return
+        if self._more is None:
+            self._more = {}
+        if key not in self._more:
+            self._added = _order(self._added + (key,))
+        self._more[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._FIELD_SET:
+            raise TypeError(f"{key!r} is a fixed field of {type(self).__name__}")
+        if key in self._SLOTS and hasattr(self, key):
+            delattr(self, key)
+        elif self._more is not None and key in self._more:
+            del self._more[key]
+        else:
+            raise KeyError(key)
+        self._added = _order(tuple(k for k in self._added if k != key))
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.FIELDS
+        yield from self._added
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + len(self._added)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._FIELD_SET or key in self._added
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The record as the plain dict it stands for, keys in the same order."""
+        # Slots in one call, flags spliced in at their positions, then the
+        # fields stored in another shape are unpacked in place
+        values = self._GET_FIXED(self)
+        if self.FLAGS:
+            values = list(values)
+            mask = self._flags
+            for position, bit in self._FLAG_POSITIONS:
+                values.insert(position, bool(mask >> bit & 1))
+        record = dict(zip(self.FIELDS, values))
+        for key, unpack in self._FIXED_UNPACK:
+            record[key] = unpack(record[key])
+        for key in self._added:
+            record[key] = self[key]
+        return record
+
+
+def record_class(
+    name: str,
+    fields: Sequence[str],
+    added_fields: Sequence[str] = (),
+    flags: Sequence[str] = (),
+    interned: Iterable[str] = (),
+) -> type:
+    """
+    A CompactRecord subclass for records whose keys start with fields, in
+    that order. added_fields get slots too. Fields in flags are bools kept in
+    one bitmask, and the string values of interned fields are interned.
+    """
+    fields, added_fields, flags = tuple(fields), tuple(added_fields), tuple(flags)
+    unknown = set(flags) - set(fields)
+    if unknown:
+        raise ValueError(f"flags {sorted(unknown)} are not fields of {name}")
+    slots = tuple(f for f in fields + added_fields if f not in flags)
+    fixed_slots = tuple(f for f in fields if f not in flags)
+    pack = {f: _intern for f in interned}
+    pack.update({f: codec[0] for f, codec in CODECS.items() if f in slots})
+    unpack = {f: codec[1] for f, codec in CODECS.items() if f in slots}
+    get_fixed = attrgetter(*fixed_slots) if len(fixed_slots) > 1 else lambda record: tuple(
+        getattr(record, f) for f in fixed_slots
+    )
+    return type(name, (CompactRecord,), {
+        "__slots__": slots + (("_flags",) if flags else ()),
+        "FIELDS": fields,
+        "ADDED_FIELDS": added_fields,
+        "FLAGS": flags,
+        "_FIELD_SET": frozenset(fields),
+        "_SLOTS": frozenset(slots),
+        "_PLAIN": frozenset(slots) - set(unpack),
+        "_FLAG_BITS": {f: bit for bit, f in enumerate(flags)},
+        "_PACK": pack,
+        "_UNPACK": unpack,
+        "_FIXED_SLOTS": fixed_slots,
+        "_GET_FIXED": staticmethod(get_fixed),
+        "_FIXED_UNPACK": tuple((f, unpack[f]) for f in fixed_slots if f in unpack),
+        "_FLAG_POSITIONS": tuple((fields.index(f), bit) for bit, f in sorted(enumerate(flags), key=lambda b: fields.index(b[1]))),
+        "_SET_PLAIN": frozenset(slots) - set(pack),
+    })
+
+
+def json_default(obj: Any) -> Any:
+    """json.dump(s) default= hook: compact records serialize as their dict."""
+    if isinstance(obj, CompactRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
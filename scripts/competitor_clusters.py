@@ -0,0 +1,203 @@
+"""
+Competitor clusters: startups whose descriptions say nearly the same thing.
+
+Each description becomes a set of word-bigram shingles (stop words dropped,
+so "AI agents for the supply chain" and "AI agents for supply chain
+workflows" share most of theirs). Sets are MinHash-signed, and LSH banding
+puts signatures that agree on a whole band into the same bucket, so only
+records sharing a bucket are ever compared. Candidate pairs are confirmed with
+their exact Jaccard similarity, and confirmed pairs are merged with
+union-find. Buckets too large to mean anything are skipped, as
+entity_resolution.py does with its blocks.
+
+Nothing per record is kept as Python objects: each band is hashed to one
+64-bit key in a packed array, and each shingle to a 64-bit id, so the pass
+holds a few hundred bytes per record. Buckets are found band by band by sorting
+that band's keys.
+
+Each startup gets:
+    cluster_size         records in its cluster, itself included (1 = no
+                         near-duplicate competitor)
+    competitor_density   other cluster members per 1,000 startups in the
+                         corpus, comparable across corpus sizes
+
+Like FacetCube, the pass signs one record per objectID: when an objectID
+repeats, the first copy is signed (a copy is not its own competitor), and
+paragraph records split off an oversized startup (record_budget.py) are left
+out. attach gives every copy its objectID's cluster and a paragraph record
+its parent's.
+"""
+
+import hashlib
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from local_search import tokenize
+from record_budget import PARENT_FIELD, is_child
+
+SHINGLE_SIZE = 2
+NUM_PERMUTATIONS = 48
+# 16 bands of 3 rows: a pair with Jaccard 0.5 shares a bucket with
+# probability 0.88 (0.98 at 0.6), one with Jaccard 0.1 with 0.016
+BAND_ROWS = 3
+JACCARD_THRESHOLD = 0.5
+# Buckets larger than this hold a generic phrase, not one product
+MAX_BUCKET_SIZE = 100
+# Band key of a record without shingles (never bucketed)
+EMPTY_KEY = 0
+
+CACHE_SIZE = 1 << 16
+
+# Band values are folded into one 64-bit key with this multiplier
+BAND_HASH_MULTIPLIER = 0x100000001B3
+HASH_MASK = (1 << 64) - 1
+
+DESCRIPTION_FIELDS = ("description",)
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or our that the "
+    "their this to we with you your".split()
+)
+
+
+def shingles(text: str) -> Tuple[str, ...]:
+    """Distinct word n-grams of text (the lone word of a one-word text)."""
+    words = [w for w in tokenize(text) if w not in STOP_WORDS]
+    if len(words) < SHINGLE_SIZE:
+        return tuple(words)
+    return tuple({" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)})
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def minhash_values(shingle: str) -> array:
+    """NUM_PERMUTATIONS independent 32-bit hashes of a shingle, from one XOF call (don't mutate)."""
+    return array("I", hashlib.shake_128(shingle.encode("utf-8")).digest(4 * NUM_PERMUTATIONS))
+
+
+class CompetitorClusters:
+    """Cluster sizes per signed record, by position among them."""
+
+    def __init__(self, object_ids: List[str], cluster_sizes: array):
+        self.object_ids = object_ids
+        self.cluster_sizes = cluster_sizes
+        self.positions = {object_id: i for i, object_id in enumerate(object_ids)}
+
+    def __len__(self) -> int:
+        return len(self.object_ids)
+
+    def competitor_density(self, i: int) -> float:
+        return round(1000 * (self.cluster_sizes[i] - 1) / max(1, len(self)), 3)
+
+    def attach(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Add the cluster_size / competitor_density of each record's objectID (its parent's, for a paragraph record)."""
+        for record in records:
+            object_id = record[PARENT_FIELD] if is_child(record) else record.get("objectID")
+            i = self.positions.get(str(object_id))
+            if i is None:
+                raise ValueError(f"record {record.get('objectID')!r} was not clustered")
+            record["cluster_size"] = self.cluster_sizes[i]
+            record["competitor_density"] = self.competitor_density(i)
+            yield record
+
+
+def shingle_id(shingle: str) -> int:
+    """64-bit id of a shingle (its first two MinHash values)."""
+    values = minhash_values(shingle)
+    return (values[0] << 32) | values[1]
+
+
+def band_keys(signature: Sequence[int], num_bands: int) -> Iterator[int]:
+    """One 64-bit key per band of a signature; equal bands give equal keys."""
+    for band in range(num_bands):
+        key = band
+        for value in signature[band * BAND_ROWS:(band + 1) * BAND_ROWS]:
+            key = (key * BAND_HASH_MULTIPLIER + value) & HASH_MASK
+        yield key
+
+
+def _buckets(keys: array, num_bands: int, n: int) -> Iterator[List[int]]:
+    """Records (ascending) sharing a band key, band by band; records without shingles are left out."""
+    for band in range(num_bands):
+        column = keys[band::num_bands]
+        order = sorted((i for i in range(n) if column[i] != EMPTY_KEY), key=column.__getitem__)
+        start = 0
+        for end in range(1, len(order) + 1):
+            if end == len(order) or column[order[end]] != column[order[start]]:
+                if end - start > 1:
+                    yield sorted(order[start:end])
+                start = end
+
+
+def _find(parent: array, x: int) -> int:
+    while parent[x] != x:
+        parent[x] = parent[parent[x]]
+        x = parent[x]
+    return x
+
+
+def find_competitor_clusters(
+    records: Iterable[Dict[str, Any]],
+    fields: Sequence[str] = DESCRIPTION_FIELDS,
+    stats: Optional[Dict[str, Any]] = None,
+) -> CompetitorClusters:
+    """Sign every record (one pass, one per objectID), band the signatures and cluster confirmed near-duplicates."""
+    object_ids: List[str] = []
+    seen = set()
+    set_offsets = array("q", [0])
+    set_items = array("Q")
+    num_bands = NUM_PERMUTATIONS // BAND_ROWS
+    # keys[i * num_bands + band]
+    keys = array("Q")
+    empty = [EMPTY_KEY] * num_bands
+
+    for i, record in enumerate(records):
+        object_id = str(record.get("objectID", i))
+        if object_id in seen or is_child(record):
+            continue
+        seen.add(object_id)
+        object_ids.append(object_id)
+        text = " ".join(str(record.get(field) or "") for field in fields)
+        words = shingles(text)
+        set_items.extend(map(shingle_id, words))
+        set_offsets.append(len(set_items))
+        if not words:
+            keys.extend(empty)
+            continue
+        signature = tuple(map(min, zip(*map(minhash_values, words))))
+        # A real band key of 0 only loses that band, as for a record without text
+        keys.extend(band_keys(signature, num_bands))
+
+    n = len(object_ids)
+    parent = array("i", range(n))
+    comparisons = confirmed = 0
+    for bucket in _buckets(keys, num_bands, n):
+        if len(bucket) > MAX_BUCKET_SIZE:
+            continue
+        members = [set(set_items[set_offsets[i]:set_offsets[i + 1]]) for i in bucket]
+        # A pair sharing several buckets is met once per bucket; cheaper than
+        # remembering every pair. Pairs already in one cluster are not compared.
+        for x, a_set in enumerate(members):
+            a_len = len(a_set)
+            for y in range(x + 1, len(members)):
+                a, b = _find(parent, bucket[x]), _find(parent, bucket[y])
+                if a == b:
+                    continue
+                b_set = members[y]
+                shared = len(a_set & b_set)
+                comparisons += 1
+                if shared / (a_len + len(b_set) - shared) >= JACCARD_THRESHOLD:
+                    parent[a] = b
+                    confirmed += 1
+
+    roots = array("i", (_find(parent, i) for i in range(n)))
+    sizes = array("i", [0]) * n
+    for root in roots:
+        sizes[root] += 1
+    if stats is not None:
+        stats.update({
+            "comparisons": comparisons,
+            "confirmed": confirmed,
+            "clusters": sum(1 for i in range(n) if roots[i] == i and sizes[i] > 1),
+        })
+    return CompetitorClusters(object_ids, array("i", (sizes[root] for root in roots)))
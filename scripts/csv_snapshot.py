@@ -0,0 +1,423 @@
+"""
+Columnar on-disk snapshots of parsed CSV records.
+
+The first parse of a source CSV stores its cleaned records column by column:
+every string goes into one deduplicated string table, every column is a flat
+stdlib array, and lists (tags, founders) are flattened with an offsets
+column. Later runs memory-map the file and rebuild the records straight from
+the arrays, skipping csv parsing and the field cleaners.
+
+The writer spills every column, and the string table's bytes, to temporary
+files as rows arrive, so recording a snapshot during a streaming run costs
+a few buffers rather than a copy of the corpus. Only short strings (batch,
+status, tags, ...) are deduplicated, through a bounded index that is
+cleared when full: the values that repeat come back into it at once, and
+long text, which is nearly always unique, is written straight through.
+
+A snapshot is only used while it still matches its source, checked by size
+and mtime first and by SHA-256 when only the mtime moved (fresh checkout,
+touch). It is also tied to a parser version so code changes invalidate it.
+
+File layout (shared with the local search index, see SectionFile):
+    MAGIC | u64 header length | JSON header | aligned column sections
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b"RSTSNAP2"
+ALIGN = 8
+
+# Nullable ints are stored with this sentinel standing in for None
+INT_NONE = -(2 ** 63)
+# ...and this one for a value an int64 can't hold (or a sentinel's own
+# value), whose JSON text goes to the column's ".wide" string column instead
+INT_WIDE = INT_NONE + 1
+INT_MAX = 2 ** 63 - 1
+
+# Strings longer than this are not deduplicated
+DEDUP_MAX_CHARS = 64
+# Distinct short strings remembered for deduplication at once
+DEDUP_MAX_ENTRIES = 1 << 14
+# Column values buffered before they are spilled to disk
+SPILL_ITEMS = 1 << 16
+
+# Column types:
+#   "str"                 -> string table index
+#   "int"                 -> int64, None allowed; values outside
+#                            (INT_WIDE, INT_MAX] as JSON text in ".wide",
+#                            one string table index per such row, in order
+#   "bool"                -> int8
+#   "str_list"            -> offsets + string table indexes
+#   ("dict_list", keys)   -> offsets + one string column per key
+ColumnType = Any
+Schema = Sequence[Tuple[str, ColumnType]]
+
+
+def file_fingerprint(path: Path, with_hash: bool = True) -> Dict[str, Any]:
+    """Size, mtime and (optionally) content hash of a source file."""
+    stat = path.stat()
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fingerprint["sha256"] = file_sha256(path)
+    return fingerprint
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_matches(path: Path, stored: Dict[str, Any]) -> bool:
+    """Cheap stat comparison, falling back to the content hash when only mtime differs."""
+    current = file_fingerprint(path, with_hash=False)
+    if current["size"] != stored.get("size"):
+        return False
+    if current["mtime_ns"] == stored.get("mtime_ns"):
+        return True
+    return file_sha256(path) == stored.get("sha256")
+
+
+def write_section_file(path: Path, magic: bytes, header: Dict[str, Any], sections: Sequence[Tuple[str, Any, str]]):
+    """
+    Write named binary sections (name, data, array typecode) after a JSON
+    header, each aligned so it can be cast in place once memory-mapped.
+    data is bytes, or the Path of a file holding them.
+    Written atomically, so a crashed run never leaves a half file behind.
+    """
+    sizes = [data.stat().st_size if isinstance(data, Path) else len(data) for _, data, _ in sections]
+    layout = {}
+    offset = 0
+    for (name, _, typecode), size in zip(sections, sizes):
+        layout[name] = [offset, size, typecode]
+        offset += size + (-size % ALIGN)
+
+    header_bytes = json.dumps({**header, "byteorder": sys.byteorder, "sections": layout}).encode("utf-8")
+    header_bytes += b" " * (-(len(magic) + 8 + len(header_bytes)) % ALIGN)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(magic)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for (_, data, _), size in zip(sections, sizes):
+            if isinstance(data, Path):
+                with open(data, "rb") as src:
+                    shutil.copyfileobj(src, f)
+            else:
+                f.write(data)
+            f.write(b"\0" * (-size % ALIGN))
+    os.replace(tmp_path, path)
+
+
+class SectionFile:
+    """Memory-mapped file written by write_section_file; sections are zero-copy memoryviews."""
+
+    def __init__(self, path: Path, magic: bytes):
+        self.file = open(path, "rb")
+        self._map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = None
+        self.sections: Dict[str, memoryview] = {}
+        if self._map[:len(magic)] != magic:
+            self.close()
+            raise ValueError(f"{path} is not a {magic.decode()} file")
+        (header_len,) = struct.unpack_from("<Q", self._map, len(magic))
+        base = len(magic) + 8
+        self.header = json.loads(self._map[base:base + header_len])
+        data_start = base + header_len
+        self._view = memoryview(self._map)
+        for name, (offset, length, typecode) in self.header["sections"].items():
+            start = data_start + offset
+            self.sections[name] = self._view[start:start + length].cast(typecode)
+
+    def close(self):
+        for section in self.sections.values():
+            section.release()
+        self.sections = {}
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        self._map.close()
+        self.file.close()
+
+
+class _SpilledColumn:
+    """An append-only array whose values are flushed to a file every SPILL_ITEMS."""
+
+    def __init__(self, path: Path, typecode: str, initial: Sequence[int] = ()):
+        self.path = path
+        self.typecode = typecode
+        self.buffer = array(typecode, initial)
+        self.flushed = 0
+        self.file = open(path, "wb")
+
+    def __len__(self) -> int:
+        return self.flushed + len(self.buffer)
+
+    def append(self, value: int):
+        self.buffer.append(value)
+        if len(self.buffer) >= SPILL_ITEMS:
+            self.flush()
+
+    def extend(self, values):
+        self.buffer.extend(values)
+        if len(self.buffer) >= SPILL_ITEMS:
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer.tobytes())
+        self.flushed += len(self.buffer)
+        self.buffer = array(self.typecode)
+
+    def close(self) -> Path:
+        self.flush()
+        self.file.close()
+        return self.path
+
+
+class _StringTable:
+    """String bytes go straight to a file; only short strings are deduplicated."""
+
+    def __init__(self, spill_dir: Path):
+        self.index: Dict[str, int] = {}
+        self.blob_path = spill_dir / "strings"
+        self.blob = open(self.blob_path, "wb")
+        self.total = 0
+        self.offsets = _SpilledColumn(spill_dir / "strings.offsets", "q", [0])
+
+    def _append(self, value: str) -> int:
+        data = value.encode("utf-8")
+        self.blob.write(data)
+        self.total += len(data)
+        self.offsets.append(self.total)
+        return len(self.offsets) - 2
+
+    def add(self, value: str) -> int:
+        if len(value) > DEDUP_MAX_CHARS:
+            return self._append(value)
+        i = self.index.get(value)
+        if i is None:
+            if len(self.index) >= DEDUP_MAX_ENTRIES:
+                self.index.clear()
+            i = self.index[value] = self._append(value)
+        return i
+
+    def close(self) -> Tuple[Path, Path]:
+        self.blob.close()
+        return self.blob_path, self.offsets.close()
+
+
+class SnapshotWriter:
+    """
+    Spills records column by column to files in a temporary directory and
+    joins them into the snapshot on save(). discard() drops an unsaved one.
+    """
+
+    def __init__(self, schema: Schema, spill_dir: Optional[Path] = None):
+        self.schema = list(schema)
+        for name, kind in self.schema:
+            if kind not in ("str", "int", "bool", "str_list") and not (isinstance(kind, tuple) and kind[0] == "dict_list"):
+                raise ValueError(f"unknown column type for {name}: {kind!r}")
+        if spill_dir is not None:
+            spill_dir.mkdir(parents=True, exist_ok=True)
+        self.dir = Path(tempfile.mkdtemp(prefix="snapshot-", dir=spill_dir))
+        self.strings = _StringTable(self.dir)
+        self.rows = _SpilledColumn(self.dir / "rows", "q")
+        self.columns: Dict[str, _SpilledColumn] = {}
+        for name, kind in self.schema:
+            if kind == "str":
+                self.columns[name] = self._column(name, "q")
+            elif kind == "int":
+                self.columns[name] = self._column(name, "q")
+                self.columns[name + ".wide"] = self._column(name + ".wide", "q")
+            elif kind == "bool":
+                self.columns[name] = self._column(name, "b")
+            elif kind == "str_list":
+                self.columns[name + ".offsets"] = self._column(name + ".offsets", "q", [0])
+                self.columns[name] = self._column(name, "q")
+            else:
+                self.columns[name + ".offsets"] = self._column(name + ".offsets", "q", [0])
+                for key in kind[1]:
+                    self.columns[f"{name}.{key}"] = self._column(f"{name}.{key}", "q")
+
+    def _column(self, name: str, typecode: str, initial: Sequence[int] = ()) -> _SpilledColumn:
+        return _SpilledColumn(self.dir / f"column.{name}", typecode, initial)
+
+    def append(self, row: int, record: Dict[str, Any]):
+        self.rows.append(row)
+        add = self.strings.add
+        for name, kind in self.schema:
+            value = record[name]
+            if kind == "str":
+                self.columns[name].append(add(value))
+            elif kind == "int":
+                if value is None:
+                    self.columns[name].append(INT_NONE)
+                elif type(value) is int and INT_WIDE < value <= INT_MAX:
+                    self.columns[name].append(value)
+                else:
+                    self.columns[name].append(INT_WIDE)
+                    self.columns[name + ".wide"].append(add(json.dumps(value)))
+            elif kind == "bool":
+                self.columns[name].append(1 if value else 0)
+            elif kind == "str_list":
+                column = self.columns[name]
+                column.extend(add(v) for v in value)
+                self.columns[name + ".offsets"].append(len(column))
+            else:
+                keys = kind[1]
+                for item in value:
+                    for key in keys:
+                        self.columns[f"{name}.{key}"].append(add(item[key]))
+                self.columns[name + ".offsets"].append(len(self.columns[f"{name}.{keys[0]}"]))
+
+    def save(self, path: Path, fingerprint: Dict[str, Any], version: str):
+        try:
+            blob, string_offsets = self.strings.close()
+            num_rows = len(self.rows)
+            sections = [("strings", blob, "B"), ("strings.offsets", string_offsets, "q"),
+                        ("rows", self.rows.close(), "q")]
+            sections += [(name, column.close(), column.typecode) for name, column in self.columns.items()]
+            write_section_file(path, MAGIC, {
+                "version": version,
+                "fingerprint": fingerprint,
+                "schema": [[name, list(kind) if isinstance(kind, tuple) else kind] for name, kind in self.schema],
+                "num_rows": num_rows,
+            }, sections)
+        finally:
+            self.discard()
+
+    def discard(self):
+        """Close and delete the spill files."""
+        for column in [self.strings.offsets, self.rows, *self.columns.values()]:
+            column.file.close()
+        self.strings.blob.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+class Snapshot(SectionFile):
+    """Memory-mapped snapshot; columns are zero-copy memoryviews over the file."""
+
+    def __init__(self, path: Path):
+        super().__init__(path, MAGIC)
+        self.schema = [(name, tuple(kind) if isinstance(kind, list) else kind)
+                       for name, kind in self.header["schema"]]
+        self._strings: List[Optional[str]] = [None] * (len(self.sections["strings.offsets"]) - 1)
+
+    def __len__(self) -> int:
+        return self.header["num_rows"]
+
+    def string(self, i: int) -> str:
+        s = self._strings[i]
+        if s is None:
+            offsets = self.sections["strings.offsets"]
+            s = bytes(self.sections["strings"][offsets[i]:offsets[i + 1]]).decode("utf-8")
+            # Long text is read once per pass; keeping it would hold the corpus
+            if len(s) <= DEDUP_MAX_CHARS:
+                self._strings[i] = s
+        return s
+
+    def iter_column(self, name: str) -> Iterator[str]:
+        """Decoded values of one "str" column, without building full records."""
+        string = self.string
+        return (string(i) for i in self.sections[name])
+
+    def iter_records(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield (source row index, record) in the order they were written."""
+        string = self.string
+        sections = self.sections
+        # Next unread entry of each int column's ".wide" column
+        wide = {name: 0 for name, kind in self.schema if kind == "int"}
+        for r, row in enumerate(sections["rows"]):
+            record = {}
+            for name, kind in self.schema:
+                if kind == "str":
+                    record[name] = string(sections[name][r])
+                elif kind == "int":
+                    value = sections[name][r]
+                    if value == INT_NONE:
+                        value = None
+                    elif value == INT_WIDE:
+                        value = json.loads(string(sections[name + ".wide"][wide[name]]))
+                        wide[name] += 1
+                    record[name] = value
+                elif kind == "bool":
+                    record[name] = bool(sections[name][r])
+                elif kind == "str_list":
+                    offsets = sections[name + ".offsets"]
+                    column = sections[name]
+                    record[name] = [string(column[j]) for j in range(offsets[r], offsets[r + 1])]
+                else:
+                    keys = kind[1]
+                    offsets = sections[name + ".offsets"]
+                    columns = [sections[f"{name}.{key}"] for key in keys]
+                    record[name] = [
+                        {key: string(column[j]) for key, column in zip(keys, columns)}
+                        for j in range(offsets[r], offsets[r + 1])
+                    ]
+            yield row, record
+
+
+def load_snapshot(path: Path, source: Path, version: str) -> Optional[Snapshot]:
+    """Open the snapshot for source if it exists and is still current, else None."""
+    if not path.exists() or not source.exists():
+        return None
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError, KeyError):
+        return None
+    header = snapshot.header
+    if (
+        header.get("version") != version
+        or header.get("byteorder") != sys.byteorder
+        or not fingerprint_matches(source, header.get("fingerprint", {}))
+    ):
+        snapshot.close()
+        return None
+    return snapshot
+
+
+def cached_records(
+    source: Path,
+    snapshot_path: Path,
+    schema: Schema,
+    version: str,
+    parse,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Yield (row, record) for source, from its snapshot when current, otherwise
+    from parse() while recording a new snapshot. The snapshot is only saved
+    once parse() has been fully consumed; the spill files of one abandoned
+    halfway are removed.
+    """
+    snapshot = load_snapshot(snapshot_path, source, version)
+    if snapshot is not None:
+        try:
+            yield from snapshot.iter_records()
+        finally:
+            snapshot.close()
+        return
+
+    fingerprint = file_fingerprint(source)
+    writer = SnapshotWriter(schema, snapshot_path.parent)
+    try:
+        for row, record in parse():
+            writer.append(row, record)
+            yield row, record
+    except BaseException:
+        writer.discard()
+        raise
+    writer.save(snapshot_path, fingerprint, version)
@@ -0,0 +1,104 @@
+"""
+Polling watcher for the pipeline's input CSVs (process-data.py --watch).
+
+Every interval the watcher stats the files it is given: yc.csv and
+everything in Fails/. It keeps their (mtime, size) and reports the paths
+that were added, modified or removed. inotify is not in the stdlib, and a
+few stat calls per poll cost next to nothing, so polling is used on every
+platform.
+
+A refresh often writes several files, or writes one in pieces. Once
+something changes, the watcher keeps polling until the files have been
+quiet for debounce seconds, then reports the whole burst as one ChangeSet.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# (st_mtime_ns, st_size)
+FileState = Tuple[int, int]
+
+DEFAULT_INTERVAL = 0.1
+DEFAULT_DEBOUNCE = 0.25
+
+
+def file_state(path: Path) -> Optional[FileState]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def scan(paths: Iterable[Path]) -> Dict[Path, FileState]:
+    states = {}
+    for path in paths:
+        state = file_state(path)
+        if state is not None:
+            states[path] = state
+    return states
+
+
+class ChangeSet:
+    """One debounced burst of changes."""
+
+    def __init__(self, changed: List[Path], last_write: float, detected: float):
+        self.changed = changed
+        # Newest mtime among the changed files (time.time() when only removals)
+        self.last_write = last_write
+        # When the first poll saw the burst
+        self.detected = detected
+
+    def __repr__(self) -> str:
+        return f"ChangeSet({[p.name for p in self.changed]})"
+
+
+class DataWatcher:
+    """Polls the paths list_paths() returns; call wait() for each change set."""
+
+    def __init__(
+        self,
+        list_paths: Callable[[], Iterable[Path]],
+        interval: float = DEFAULT_INTERVAL,
+        debounce: float = DEFAULT_DEBOUNCE,
+    ):
+        self.list_paths = list_paths
+        self.interval = interval
+        self.debounce = debounce
+        self.states = scan(list_paths())
+
+    def _diff(self, states: Dict[Path, FileState]) -> List[Path]:
+        return sorted(p for p in set(self.states) | set(states) if self.states.get(p) != states.get(p))
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[ChangeSet]:
+        """
+        Block until a burst of changes has settled and return it, or None
+        after timeout seconds without a change.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            states = scan(self.list_paths())
+            if self._diff(states):
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(self.interval)
+
+        detected = time.time()
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < self.debounce:
+            time.sleep(self.interval)
+            latest = scan(self.list_paths())
+            if latest != states:
+                states = latest
+                quiet_since = time.monotonic()
+
+        changed = self._diff(states)
+        self.states = states
+        if not changed:
+            # The files went back to how they were (e.g. a temp write undone)
+            return self.wait(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        mtimes = [states[p][0] / 1e9 for p in changed if p in states]
+        return ChangeSet(changed, max(mtimes) if mtimes else detected, detected)
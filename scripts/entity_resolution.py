@@ -0,0 +1,177 @@
+"""
+Company-name entity resolution for the graveyard pipeline.
+
+Names are reduced to a normalized key (case and accents folded, punctuation
+and web domains dropped, trailing "Inc"/"Labs"/... removed), so
+"Homejoy, Inc." and "HomeJoy" land in the same hash bucket. Letters of any
+script are kept, so non-Latin names get keys of their own. Only rows with
+the same, non-empty key are merged.
+
+Keys that differ slightly are usually different companies (Juicero / Juicer,
+Stripe / Stripes), so they are never merged. A fuzzy pass, restricted to
+small blocks of keys sharing a prefix or suffix, reports them as near misses
+for a human to check. The blocks keep the pass linear in the number of rows
+instead of comparing every pair.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Trailing tokens that don't distinguish one company from another
+NAME_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation",
+    "co", "company", "labs", "lab", "technologies", "hq", "gmbh", "plc",
+}
+
+DOMAIN_RE = re.compile(r"\.(com|io|ai|co|net|org|app|me|ly|tv)\b")
+# Anything but letters and digits, in any script
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+# Fuzzy matching: keys shorter than this only ever match exactly
+FUZZY_MIN_LENGTH = 6
+FUZZY_MIN_RATIO = 0.92
+BLOCK_KEY_LENGTH = 4
+# Blocks larger than this are too generic to say anything about identity
+MAX_BLOCK_SIZE = 50
+
+# Max difference in founding year for a YC startup and a graveyard entry
+# with the same name to count as one company
+FOUNDING_YEAR_TOLERANCE = 2
+
+
+def normalize_name(name: str) -> str:
+    """Hash key for a company name ("The Homejoy, Inc." -> "homejoy")."""
+    text = unicodedata.normalize("NFKD", name)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    text = DOMAIN_RE.sub(" ", text)
+    tokens = [t for t in NON_WORD_RE.split(text) if t]
+    if tokens and tokens[0] == "the" and len(tokens) > 1:
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in NAME_SUFFIXES:
+        tokens.pop()
+    return "".join(tokens)
+
+
+def blocking_keys(key: str) -> Tuple[str, str]:
+    """Prefix and suffix blocks: a one-character typo leaves at least one intact."""
+    return "^" + key[:BLOCK_KEY_LENGTH], key[-BLOCK_KEY_LENGTH:] + "$"
+
+
+class EntityIndex:
+    """
+    Normalized-name index mapping each company to the first record that
+    claimed it. resolve() answers "is this a company we already have?" in
+    O(1); near_miss() finds a similar existing key in O(block size).
+    """
+
+    def __init__(self, fuzzy: bool = True):
+        # Whether near_miss() looks for similar keys at all
+        self.fuzzy = fuzzy
+        self.entities: Dict[str, Any] = {}
+        self.blocks: Dict[str, List[str]] = {}
+        self.merges: List[Dict[str, Any]] = []
+        self.near_misses: List[Dict[str, Any]] = []
+
+    def _fuzzy_lookup(self, key: str) -> Optional[str]:
+        if len(key) < FUZZY_MIN_LENGTH:
+            return None
+        for block in blocking_keys(key):
+            candidates = self.blocks.get(block, ())
+            if len(candidates) > MAX_BLOCK_SIZE:
+                continue
+            for candidate in candidates:
+                if abs(len(candidate) - len(key)) > 2:
+                    continue
+                if SequenceMatcher(None, key, candidate).ratio() >= FUZZY_MIN_RATIO:
+                    return candidate
+        return None
+
+    def resolve(self, name: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return (matched key, "exact"), or (None, None) for a new entity."""
+        key = normalize_name(name)
+        if key and key in self.entities:
+            return key, "exact"
+        return None, None
+
+    def near_miss(self, name: str) -> Optional[str]:
+        """The key of an existing entity whose name is nearly, but not exactly, name's."""
+        key = normalize_name(name)
+        if not key or not self.fuzzy or key in self.entities:
+            return None
+        return self._fuzzy_lookup(key)
+
+    def add(self, name: str, entity: Any):
+        """Register a new entity. Names that normalize to nothing are not indexed."""
+        key = normalize_name(name)
+        if not key:
+            return
+        self.entities[key] = entity
+        if len(key) >= FUZZY_MIN_LENGTH:
+            for block in blocking_keys(key):
+                self.blocks.setdefault(block, []).append(key)
+
+    def record_merge(self, name: str, source: str, key: str, how: str):
+        """Note that the row at source was folded into the entity under key."""
+        self.merges.append({
+            "name": name,
+            "source": source,
+            "merged_into": self.entities[key],
+            "match": how,
+        })
+
+    def record_near_miss(self, name: str, source: str, key: str):
+        """Note that the row at source was kept although its name is close to the entity under key."""
+        self.near_misses.append({
+            "name": name,
+            "source": source,
+            "similar_to": self.entities[key],
+            "similar_key": key,
+        })
+
+    def get(self, name: str) -> Any:
+        """Exact normalized-name lookup."""
+        key = normalize_name(name)
+        return self.entities.get(key) if key else None
+
+
+def same_company(startup: Dict[str, Any], fail: Dict[str, Any]) -> bool:
+    """
+    Name collisions are common ("Pocket", "Pulse"), so a shared name only links
+    records whose timelines agree: founded within a couple of years of each
+    other, and the YC company not founded after the graveyard one closed.
+    Without a founding year there is no timeline to compare, so the name only
+    links a YC company that is itself no longer active.
+    """
+    founded = startup.get("year_founded")
+    if not founded:
+        return startup.get("status") == "Inactive"
+    fail_founded = fail.get("year_founded")
+    if fail_founded and abs(founded - fail_founded) > FOUNDING_YEAR_TOLERANCE:
+        return False
+    closed = fail.get("year_closed")
+    return not (closed and founded > closed)
+
+
+def link_graveyard_to_startups(
+    fails: List[Dict[str, Any]], startups: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    Flag YC startups that also appear in the graveyard. Yields the startups
+    (so it can sit in a streaming pipeline); matched startups get
+    graveyard_id and matched graveyard entries get yc_object_id.
+    Only exact normalized names with compatible timelines are linked; a fuzzy
+    match between a live YC company and a dead one is too likely to be a
+    different company.
+    """
+    index = EntityIndex(fuzzy=False)
+    for fail in fails:
+        index.add(fail["name"], fail)
+
+    for startup in startups:
+        fail = index.get(startup.get("name", ""))
+        if fail is not None and same_company(startup, fail):
+            startup["graveyard_id"] = fail["objectID"]
+            fail.setdefault("yc_object_id", startup["objectID"])
+        yield startup
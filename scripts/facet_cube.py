@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Facet cube: the counts behind the app's filters and the pipeline's stats.
+
+Every record is reduced to one cell key as it streams past, and the cube
+counts records per cell:
+    startups    category x batch x status x saturation
+    graveyard   sector x funding bucket x failure-flag bitmask
+Batch codes roll up to batch years, and the bitmask rolls up to per-flag
+histograms, so each facet count is a sum over cells. The cube is the single
+source for all of them, and it stays a few thousand cells whatever the corpus
+size.
+
+The cube is written to facets.json: the cells plus the ready-made facet
+counts the app shows, so filters can be drawn without a search request. Next
+to it, facet_keys.json remembers each objectID's cell. That lets the cube
+apply a delta (added / updated / deleted records, as written by
+process-data.py) without a full recount: an updated or deleted record's old
+cell is decremented, and its new cell is incremented.
+
+Like Algolia, the cube holds one record per objectID. When an objectID
+repeats, the first copy is counted, as DeltaTracker does. Paragraph records
+split off an oversized startup (record_budget.py) are not counted: they
+share their company's parent_id, and only the company itself is a record.
+
+Usage:
+    python scripts/facet_cube.py                      # apply data/processed/delta to facets.json (and public/)
+    python scripts/facet_cube.py --output-dir DIR     # same, for another output directory
+"""
+
+import argparse
+import json
+import shutil
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from field_parsers import batch_calendar_year
+from record_budget import is_child
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_OUTPUT_DIR = ROOT_DIR / "data" / "processed"
+# The app serves this copy of the default facets.json
+PUBLIC_FACETS_PATH = ROOT_DIR / "public" / "facets.json"
+
+FORMAT_VERSION = 1
+
+INDICES = ("startups", "graveyard")
+STARTUP_DIMENSIONS = ("category", "batch", "status", "saturation")
+GRAVEYARD_DIMENSIONS = ("sector", "funding")
+
+# (lower bound in dollars, label); raised_amount 0 means the amount is unknown
+FUNDING_BUCKETS = [
+    (0, "Undisclosed"),
+    (1, "Under $1M"),
+    (1_000_000, "$1M-$10M"),
+    (10_000_000, "$10M-$50M"),
+    (50_000_000, "$50M-$100M"),
+    (100_000_000, "$100M-$1B"),
+    (1_000_000_000, "$1B+"),
+]
+_FUNDING_BOUNDS = [bound for bound, _ in FUNDING_BUCKETS]
+
+Cell = Tuple[Any, ...]
+
+
+def funding_bucket(raised_amount: int) -> str:
+    return FUNDING_BUCKETS[max(0, bisect_right(_FUNDING_BOUNDS, raised_amount or 0) - 1)][1]
+
+
+def batch_year(batch: str) -> str:
+    """Calendar year of a batch code (W22 -> "2022"), or "" when there is none."""
+    year = batch_calendar_year(batch)
+    return str(year) if year else ""
+
+
+def _by_count(counts: Dict[str, int]) -> Dict[str, int]:
+    """Counts ordered by descending count, then value, for stable output."""
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+class FacetCube:
+    """Record counts per cell for both indices, plus the cell of every counted objectID."""
+
+    def __init__(self, flags: Sequence[str]):
+        # Graveyard boolean fields; bit i of a cell's mask is flags[i]
+        self.flags = tuple(flags)
+        self.cells: Dict[str, Dict[Cell, int]] = {name: {} for name in INDICES}
+        self.keys: Dict[str, Dict[str, Cell]] = {name: {} for name in INDICES}
+
+    def cell(self, index_name: str, record: Dict[str, Any]) -> Cell:
+        if index_name == "startups":
+            return tuple(record.get(dim) or "" for dim in STARTUP_DIMENSIONS)
+        mask = 0
+        for bit, flag in enumerate(self.flags):
+            if record.get(flag):
+                mask |= 1 << bit
+        return record.get("sector") or "", funding_bucket(record.get("raised_amount", 0)), mask
+
+    def add(self, index_name: str, record: Dict[str, Any]):
+        keys = self.keys[index_name]
+        object_id = record["objectID"]
+        if object_id in keys or is_child(record):
+            return
+        cell = keys[object_id] = self.cell(index_name, record)
+        cells = self.cells[index_name]
+        cells[cell] = cells.get(cell, 0) + 1
+
+    def remove(self, index_name: str, object_id: str):
+        cell = self.keys[index_name].pop(object_id, None)
+        if cell is None:
+            return
+        cells = self.cells[index_name]
+        cells[cell] -= 1
+        if not cells[cell]:
+            del cells[cell]
+
+    def count(self, index_name: str, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Pass records through while adding them to the cube."""
+        for record in records:
+            self.add(index_name, record)
+            yield record
+
+    def apply_delta(
+        self,
+        index_name: str,
+        added: Iterable[Dict[str, Any]],
+        updated: Iterable[Dict[str, Any]],
+        deleted: Iterable[str],
+    ):
+        """Bring the cube up to date with one index's delta, touching only the changed records."""
+        for object_id in deleted:
+            self.remove(index_name, object_id)
+        for record in updated:
+            self.remove(index_name, record["objectID"])
+            self.add(index_name, record)
+        for record in added:
+            # An "added" record the cube already holds was counted by an earlier delta
+            self.remove(index_name, record["objectID"])
+            self.add(index_name, record)
+
+    def total(self, index_name: str) -> int:
+        return len(self.keys[index_name])
+
+    def facet_counts(self, index_name: str, dimension: str) -> Dict[str, int]:
+        """Records per non-empty value of one dimension (or batch_year), most common first."""
+        if dimension == "batch_year":
+            position, key = STARTUP_DIMENSIONS.index("batch"), batch_year
+        else:
+            dims = STARTUP_DIMENSIONS if index_name == "startups" else GRAVEYARD_DIMENSIONS
+            position, key = dims.index(dimension), None
+        counts: Dict[str, int] = {}
+        for cell, n in self.cells[index_name].items():
+            value = cell[position] if key is None else key(cell[position])
+            if value:
+                counts[value] = counts.get(value, 0) + n
+        return _by_count(counts)
+
+    def flag_counts(self, by: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Graveyard records with each failure flag set, overall (under "") or
+        per value of by ("sector" or "funding").
+        """
+        position = GRAVEYARD_DIMENSIONS.index(by) if by else None
+        histograms: Dict[str, List[int]] = {}
+        for cell, n in self.cells["graveyard"].items():
+            counts = histograms.setdefault(cell[position] if by else "", [0] * len(self.flags))
+            mask = cell[2]
+            while mask:
+                bit = (mask & -mask).bit_length() - 1
+                counts[bit] += n
+                mask &= mask - 1
+        return {
+            value: _by_count({flag: c for flag, c in zip(self.flags, counts) if c})
+            for value, counts in sorted(histograms.items())
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The facets.json payload: facet counts for the app, then the raw cells."""
+        funding = self.facet_counts("graveyard", "funding")
+        return {
+            "version": FORMAT_VERSION,
+            "startups": {
+                "total": self.total("startups"),
+                "facets": {
+                    "category": self.facet_counts("startups", "category"),
+                    "batch": self.facet_counts("startups", "batch"),
+                    "batch_year": self.facet_counts("startups", "batch_year"),
+                    "status": self.facet_counts("startups", "status"),
+                    "saturation": self.facet_counts("startups", "saturation"),
+                },
+                "dimensions": list(STARTUP_DIMENSIONS),
+                "cells": [[*cell, n] for cell, n in sorted(self.cells["startups"].items())],
+            },
+            "graveyard": {
+                "total": self.total("graveyard"),
+                "facets": {
+                    "sector": self.facet_counts("graveyard", "sector"),
+                    "funding": {label: funding[label] for _, label in FUNDING_BUCKETS if label in funding},
+                    "failure_flags": self.flag_counts().get("", {}),
+                },
+                "failure_flags_by_sector": self.flag_counts("sector"),
+                "failure_flags_by_funding": self.flag_counts("funding"),
+                "dimensions": [*GRAVEYARD_DIMENSIONS, "flags"],
+                "flags": list(self.flags),
+                "funding_buckets": [label for _, label in FUNDING_BUCKETS],
+                "cells": [[*cell, n] for cell, n in sorted(self.cells["graveyard"].items())],
+            },
+        }
+
+    def write(self, path: Path, keys_path: Path) -> int:
+        """Write facets.json (compact) and the objectID -> cell sidecar. Returns facets.json's size."""
+        payload = json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        with open(keys_path, "w", encoding="utf-8") as f:
+            json.dump({"flags": self.flags, **self.keys}, f, ensure_ascii=False, separators=(",", ":"))
+        return len(payload.encode("utf-8"))
+
+    @classmethod
+    def load(cls, keys_path: Path) -> "FacetCube":
+        """Rebuild a cube from its sidecar; the cells are recounted from the stored keys."""
+        with open(keys_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        cube = cls(data["flags"])
+        for index_name in INDICES:
+            keys = cube.keys[index_name]
+            cells = cube.cells[index_name]
+            for object_id, cell in data[index_name].items():
+                cell = keys[object_id] = tuple(cell)
+                cells[cell] = cells.get(cell, 0) + 1
+        return cube
+
+
+def read_delta(delta_dir: Path, index_name: str) -> Tuple[List[Dict], List[Dict], List[str]]:
+    """(added, updated, deleted) from <index>.added.json, .updated.json and .deleted.json."""
+    parts = []
+    for kind in ("added", "updated", "deleted"):
+        path = delta_dir / f"{index_name}.{kind}.json"
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                parts.append(json.load(f))
+        else:
+            parts.append([])
+    return parts[0], parts[1], parts[2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply the last delta to the facet cube without a full recount.")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help="directory holding facets.json, facet_keys.json and delta/ (default: data/processed)")
+    args = parser.parse_args()
+
+    keys_path = args.output_dir / "facet_keys.json"
+    if not keys_path.exists():
+        raise SystemExit(f"❌ {keys_path} not found; run process-data.py once to build the cube")
+    cube = FacetCube.load(keys_path)
+    for index_name in INDICES:
+        added, updated, deleted = read_delta(args.output_dir / "delta", index_name)
+        cube.apply_delta(index_name, added, updated, deleted)
+        print(f"🧊 {index_name}: +{len(added)} ~{len(updated)} -{len(deleted)} -> {cube.total(index_name)} records")
+    size = cube.write(args.output_dir / "facets.json", keys_path)
+    print(f"✅ Wrote {args.output_dir / 'facets.json'} ({size / 1024:.1f} KB)")
+    if args.output_dir.resolve() == DEFAULT_OUTPUT_DIR:
+        shutil.copyfile(args.output_dir / "facets.json", PUBLIC_FACETS_PATH)
+
+
+if __name__ == "__main__":
+    main()
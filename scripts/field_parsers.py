@@ -0,0 +1,278 @@
+"""
+Field parsers for the raw CSV cells.
+
+All regexes are compiled once at import. Tags, years and funding strings
+repeat heavily across rows, so their parsers memoize on the raw cell value
+and hand back a fresh copy of the cached result. The founders column is a
+Python repr of a list of dicts; it is read with a small literal parser
+instead of eval(), so a hostile export can't run code.
+
+Every time a parser falls back to a default it bumps FALLBACKS, including
+on cache hits, so the counts match what an uncached run would report.
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fallback counters, shared with the pipeline's metrics
+FALLBACKS: Counter = Counter()
+
+CACHE_SIZE = 1 << 16
+
+YEAR_RE = re.compile(r"\d{4}")
+EST_RE = re.compile(r"\(est\.\)", re.IGNORECASE)
+FUNDING_RE = re.compile(r"\$?([\d.]+)([kmb]?)", re.IGNORECASE)
+# "W22" -> 22: the two-digit year a batch code ends with
+BATCH_YEAR_RE = re.compile(r"(\d{2})$")
+
+FUNDING_MISSING = {"n/a", "", "-"}
+FUNDING_ZERO = {"0", "$0"}
+FUNDING_UNITS = {"b": 1_000_000_000, "m": 1_000_000, "k": 1_000, "": 1}
+
+NO_YEARS = (None, None, None)
+
+
+def clean_text(text: str) -> str:
+    """Clean and normalize text content."""
+    if not text or text == "[]":
+        return ""
+    text = str(text).strip()
+    # Remove extra quotes from stringified arrays
+    if text.startswith("'") and text.endswith("'"):
+        text = text[1:-1]
+    elif text.startswith('"') and text.endswith('"'):
+        text = text[1:-1]
+    return text
+
+
+def batch_calendar_year(batch: str) -> Optional[int]:
+    """Calendar year of a batch code (W22 -> 2022), or None when there is none."""
+    match = BATCH_YEAR_RE.search((batch or "").strip())
+    return 2000 + int(match.group(1)) if match else None
+
+
+def safe_int(value: Any, default=0) -> int:
+    """Safely convert to int."""
+    if not value:
+        FALLBACKS["safe_int.empty"] += 1
+        return default
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        FALLBACKS["safe_int.invalid"] += 1
+        return default
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_tags(tags_str: str) -> Tuple[str, ...]:
+    # Remove brackets and quotes, split by comma
+    tags_str = tags_str.strip("[]'")
+    tags = [t.strip().strip('"').strip("'") for t in tags_str.split(",")]
+    return tuple(filter(None, tags))
+
+
+def parse_tags(tags_str: str) -> List[str]:
+    """Parse tag string from YC data."""
+    if not tags_str or tags_str == "[]":
+        return []
+    return list(_parse_tags(tags_str))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _extract_year(year_str: str) -> Optional[int]:
+    match = YEAR_RE.search(year_str)
+    return int(match.group()) if match else None
+
+
+def extract_year(year_str: str) -> int:
+    """Extract year from various formats."""
+    if not year_str:
+        FALLBACKS["extract_year.empty"] += 1
+        return None
+    year = _extract_year(str(year_str))
+    if year is None:
+        FALLBACKS["extract_year.no_year"] += 1
+    return year
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_funding(funding_str: str) -> Tuple[int, Optional[str]]:
+    """(amount, fallback counter name or None)."""
+    # Handle formats like "$655M", "$1.5B", "$30M (est.)", "N/A"
+    funding_str = EST_RE.sub("", funding_str.strip()).strip().lower()
+
+    if funding_str in FUNDING_MISSING:
+        return 0, "parse_funding.missing"
+    if funding_str in FUNDING_ZERO:
+        return 0, None
+
+    match = FUNDING_RE.search(funding_str)
+    if not match:
+        return 0, "parse_funding.unparsed"
+
+    # Convert to actual dollar amount
+    return int(float(match.group(1)) * FUNDING_UNITS[match.group(2).lower()]), None
+
+
+def parse_funding(funding_str: str) -> int:
+    """Parse funding string to integer (in USD)."""
+    if not funding_str:
+        FALLBACKS["parse_funding.missing"] += 1
+        return 0
+    amount, fallback = _parse_funding(str(funding_str))
+    if fallback:
+        FALLBACKS[fallback] += 1
+    return amount
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _extract_years(years_str: str) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+    years = YEAR_RE.findall(years_str)
+    if len(years) >= 2:
+        start, end = int(years[0]), int(years[-1])
+        return start, end, end - start
+    if len(years) == 1:
+        return int(years[0]), None, None
+    return NO_YEARS
+
+
+def extract_years(years_str: str) -> Dict[str, int]:
+    """Extract start and end year from 'Years of Operation' field."""
+    if not years_str:
+        FALLBACKS["extract_years.empty"] += 1
+        return {"start": None, "end": None, "duration": None}
+
+    start, end, duration = _extract_years(str(years_str))
+    if start is None:
+        FALLBACKS["extract_years.no_year"] += 1
+    elif end is None:
+        FALLBACKS["extract_years.single_year"] += 1
+    return {"start": start, "end": end, "duration": duration}
+
+
+# --- Python literal parsing (founders column) -------------------------------
+
+# One token per match: a string literal, a number, a name, punctuation, or
+# any other single character (which the parser then rejects)
+_TOKEN_RE = re.compile(r"""
+    \s*(
+        [rRbBuU]?(?:'[^'\\\n]*(?:\\.[^'\\\n]*)*'|"[^"\\\n]*(?:\\.[^"\\\n]*)*")
+      | [-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?
+      | True | False | None
+      | \S
+    )
+""", re.VERBOSE | re.DOTALL)
+
+_NAMES = {"True": True, "False": False, "None": None}
+_CLOSERS = {"[": "]", "(": ")", "{": "}"}
+_QUOTES = "'\""
+_STRING_PREFIXES = "rRbBuU"
+_NUMBER_START = "0123456789-+."
+
+
+def _decode_string(token: str) -> str:
+    prefix = ""
+    if token[0] in _STRING_PREFIXES:
+        prefix, token = token[0].lower(), token[1:]
+        if prefix == "b":
+            raise ValueError("bytes literals are not supported")
+    body = token[1:-1]
+    if prefix == "r" or "\\" not in body:
+        return body
+    # Python's own escape decoder; non-Latin-1 text passes through as \\u escapes
+    return body.encode("latin-1", "backslashreplace").decode("unicode_escape")
+
+
+class _Tokens:
+    __slots__ = ("items", "pos")
+
+    def __init__(self, text: str):
+        self.items = _TOKEN_RE.findall(text)
+        self.pos = 0
+
+    def next(self) -> str:
+        if self.pos >= len(self.items):
+            raise ValueError("unexpected end of literal")
+        token = self.items[self.pos]
+        self.pos += 1
+        return token
+
+
+def _read_value(tokens: _Tokens, token: str) -> Any:
+    first = token[0]
+    if first in _QUOTES or (first in _STRING_PREFIXES and len(token) > 1 and token[1] in _QUOTES):
+        value = _decode_string(token)
+        # Adjacent literals concatenate
+        items = tokens.items
+        while tokens.pos < len(items) and items[tokens.pos][0] in _QUOTES:
+            value += _decode_string(items[tokens.pos])
+            tokens.pos += 1
+        return value
+    if token in _CLOSERS:
+        return _read_container(tokens, token)
+    if token in _NAMES:
+        return _NAMES[token]
+    if first in _NUMBER_START and len(token) > 1 or first.isdigit():
+        if "." in token or "e" in token or "E" in token:
+            return float(token)
+        return int(token)
+    raise ValueError(f"unexpected {token!r}")
+
+
+def _read_container(tokens: _Tokens, opener: str) -> Any:
+    closer = _CLOSERS[opener]
+    is_dict = opener == "{"
+    items: Any = {} if is_dict else []
+    token = tokens.next()
+    while token != closer:
+        value = _read_value(tokens, token)
+        if is_dict:
+            if tokens.next() != ":":
+                raise ValueError("expected ':' in dict")
+            items[value] = _read_value(tokens, tokens.next())
+        else:
+            items.append(value)
+        token = tokens.next()
+        if token == ",":
+            token = tokens.next()
+        elif token != closer:
+            raise ValueError(f"expected ',' or {closer!r}")
+    return tuple(items) if opener == "(" else items
+
+
+def literal_eval(text: str) -> Any:
+    """
+    Read a Python literal made of lists, tuples, dicts, strings, numbers,
+    True/False/None. Raises ValueError on anything else.
+    """
+    tokens = _Tokens(text)
+    result = _read_value(tokens, tokens.next())
+    if tokens.pos != len(tokens.items):
+        raise ValueError("trailing data after literal")
+    return result
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_founders(founders_str: str) -> Optional[Tuple[Tuple[Any, Any], ...]]:
+    try:
+        founders = literal_eval(founders_str)
+    except (ValueError, TypeError, RecursionError):
+        return None
+    if not isinstance(founders, list) or not all(isinstance(f, dict) for f in founders):
+        return None
+    return tuple((f.get("name", ""), f.get("title", "")) for f in founders)
+
+
+def parse_founders(founders_str: str) -> List[Dict[str, str]]:
+    """Parse founders JSON string."""
+    if not founders_str or founders_str == "[]":
+        return []
+    if not isinstance(founders_str, str):
+        founders_str = repr(founders_str)
+    founders = _parse_founders(founders_str)
+    if founders is None:
+        FALLBACKS["parse_founders.invalid"] += 1
+        return []
+    return [{"name": name, "title": title} for name, title in founders]
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Generate seeded synthetic inputs shaped like data/yc.csv and data/Fails/*.csv
+so process-data.py can be benchmarked far beyond the real dataset size.
+
+Rows reproduce the awkward parts of the real exports: multi-line quoted
+long_description, Python-repr tag and founder lists (with bios containing
+newlines and quotes), duplicate company_ids, empty numeric cells and funding
+strings like "$1.5B (est.)".
+
+Usage:
+    python scripts/generate-synthetic-data.py --rows 100000 --out data/bench/100k
+"""
+
+import argparse
+import csv
+import random
+from pathlib import Path
+
+YC_COLUMNS = [
+    "company_id", "company_name", "company_image", "url", "short_description",
+    "long_description", "batch", "status", "tags", "company_location",
+    "year_founded", "team_size", "website", "company_linkedin", "company_x",
+    "founders", "open_jobs", "is_hiring", "number_of_open_jobs", "primary_partner",
+]
+
+FAIL_COLUMNS = [
+    "Name", "Sector", "Years of Operation", "What They Did", "How Much They Raised",
+    "Why They Failed", "Takeaway", "Giants", "No Budget", "Competition",
+    "Poor Market Fit", "Acquisition Stagnation", "Platform Dependency",
+    "Monetization Failure", "Niche Limits", "Execution Flaws", "Trend Shifts",
+    "Toxicity/Trust Issues", "Regulatory Pressure", "Overhype",
+]
+
+FAIL_FILES = [
+    ("Startup Failure (Health Care).csv", "Health Care"),
+    ("Startup Failure (Retail Trade).csv", "Retail Trade"),
+    ("Startup Failure (Finance and Insurance).csv", "Finance and Insurance"),
+    ("Startup Failure (Manufactures).csv", "Manufacturing"),
+    ("Startup Failures (Information Sector).csv", "Information"),
+    ("Startup Failure (Food and services).csv", "Accommodation and Food Services"),
+]
+
+TAGS = [
+    "Artificial Intelligence", "Generative AI", "B2B", "SaaS", "Fintech",
+    "Developer Tools", "Machine Learning", "Healthcare", "Marketplace", "AIOps",
+    "Consumer", "E-commerce", "Climate Tech", "Biotech", "Infrastructure",
+    "Payments", "Security", "Robotics", "Education", "Analytics", "Crypto",
+    "Web3", "Logistics", "Real Estate", "Legal", "HR Tech", "Insurance",
+    "Social Media", "Food Delivery", "Transportation", "Gaming", "Hardware",
+]
+BATCHES = ["W21", "S21", "W22", "S22", "W23", "S23", "W24", "S24", "F24",
+           "W25", "S25", "X25", "F25", "W26", "W12", "S15", "W18"]
+STATUSES = ["Active"] * 90 + ["Inactive"] * 6 + ["Acquired"] * 4
+LOCATIONS = ["San Francisco", "New York", "London", "Bengaluru", "Berlin",
+             "Toronto", "Paris", "Austin", "Lagos", "Singapore", ""]
+PARTNERS = ["Jared Friedman", "Dalton Caldwell", "Harj Taggar", "Diana Hu", "Gustaf Alstromer"]
+TITLES = ["Founder", "Co-Founder & CEO", "CTO", "Co-founder", "CEO"]
+SYLLABLES = ["zym", "bly", "qua", "tro", "nex", "vio", "lum", "ora", "pix",
+             "dex", "ly", "fy", "io", "ra", "ko", "mi", "sen", "tal", "wa"]
+WORDS = ("platform agents automate workflows for teams building data models "
+         "customers revenue compliance payments infrastructure fleet clinics "
+         "developers security insurance logistics retail energy hiring").split()
+FUNDING = ["$655M", "$1.5B (est.)", "$30M (est.)", "$2M", "$0.5M", "$500K",
+           "N/A", "-", "$0", "$12M", "$120M", "$3.2B", "undisclosed"]
+REASONS = ["Lost to {giant} and high costs", "Ran out of cash after pivot",
+           "Couldn't scale; lost to {giant}", "Regulatory pressure, \"no path\" to profit",
+           "Low adoption; funding fell through"]
+GIANTS = ["Google", "Amazon", "DoorDash", "PayPal", "Tesla", "Uber", "Meta"]
+
+
+def company_name(rng: random.Random) -> str:
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).capitalize()
+    if rng.random() < 0.1:
+        name += rng.choice([" AI", " Labs", " Inc.", ".com", " Health"])
+    return name
+
+
+def sentence(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize()
+
+
+def long_description(rng: random.Random, name: str) -> str:
+    paragraphs = []
+    for _ in range(rng.randint(1, 4)):
+        text = f"{name} {sentence(rng, rng.randint(12, 40))}."
+        if rng.random() < 0.3:
+            text += f' Customers call it "the {rng.choice(WORDS)} layer", which, honestly, fits.'
+        paragraphs.append(text)
+    return "\n\n".join(paragraphs) if rng.random() < 0.9 else ""
+
+
+def founders(rng: random.Random, name: str) -> str:
+    people = []
+    for _ in range(rng.randint(0, 3)):
+        first = company_name(rng).split()[0]
+        bio = f"{first} is building {name}.\n\nPreviously at {rng.choice(GIANTS)}; it's company #{rng.randint(1, 4)} for them."
+        people.append({
+            "id": rng.randint(100000, 4000000),
+            "name": f"{first} {company_name(rng).split()[0]}",
+            "title": rng.choice(TITLES),
+            "bio": bio,
+            "linkedin": f"https://www.linkedin.com/in/{first.lower()}/",
+            "x": "" if rng.random() < 0.6 else f"https://x.com/{first.lower()}",
+        })
+    return repr(people)
+
+
+def yc_row(rng: random.Random, i: int) -> list:
+    name = company_name(rng)
+    slug = name.lower().replace(" ", "-").replace(".", "")
+    jobs = rng.choice([0, 0, 0, 0, 1, 2, 3, 5, 12])
+    # ~1% duplicate company_ids, as in the real export
+    company_id = 40000 + (i - 1 if i and rng.random() < 0.01 else i)
+    return [
+        company_id,
+        name,
+        f"https://bookface-images.s3.amazonaws.com/small_logos/{rng.getrandbits(64):016x}.png",
+        f"https://www.ycombinator.com/companies/{slug}",
+        sentence(rng, rng.randint(4, 10)),
+        long_description(rng, name),
+        rng.choice(BATCHES),
+        rng.choice(STATUSES),
+        repr(rng.sample(TAGS, rng.randint(0, 5))),
+        rng.choice(LOCATIONS),
+        rng.choice(["", "2019", "2021", "2022", "2023", "2024", "2025"]),
+        rng.choice(["", "1", "2", "2", "3", "4", "6", "8", "12", "25", "150"]),
+        f"https://{slug}.com",
+        "",
+        "",
+        founders(rng, name),
+        "[]",
+        "True" if jobs else "False",
+        "" if rng.random() < 0.05 else str(jobs),
+        rng.choice(PARTNERS),
+    ]
+
+
+def fail_row(rng: random.Random, sector: str) -> list:
+    start = rng.randint(1996, 2018)
+    end = start + rng.randint(1, 10)
+    years = f"{start}-{end}" if rng.random() < 0.5 else f"{end - start} ({start}-{end})"
+    flags = [str(int(rng.random() < p)) for p in (0.5, 0.3, 0.7, 0.25, 0.05, 0.1, 0.15, 0.1, 0.15, 0.05, 0.03, 0.05, 0.05)]
+    return [
+        company_name(rng),
+        sector,
+        years,
+        sentence(rng, rng.randint(3, 7)),
+        rng.choice(FUNDING),
+        rng.choice(REASONS).format(giant=rng.choice(GIANTS)),
+        sentence(rng, rng.randint(3, 6)),
+    ] + flags
+
+
+def generate(out_dir: Path, rows: int, seed: int = 42, fail_ratio: float = 0.04):
+    """Write yc.csv with rows rows and ~rows * fail_ratio graveyard rows over the six Fails files."""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / "yc.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(YC_COLUMNS)
+        for i in range(rows):
+            writer.writerow(yc_row(rng, i))
+
+    fails_dir = out_dir / "Fails"
+    fails_dir.mkdir(exist_ok=True)
+    per_file = max(1, int(rows * fail_ratio) // len(FAIL_FILES))
+    for filename, sector in FAIL_FILES:
+        with open(fails_dir / filename, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(FAIL_COLUMNS)
+            for _ in range(per_file):
+                writer.writerow(fail_row(rng, sector))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Startup Roast source CSVs.")
+    parser.add_argument("--rows", type=int, default=10_000, help="yc.csv data rows (default: 10000)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, required=True, help="output data directory")
+    args = parser.parse_args()
+
+    print(f"🧪 Generating {args.rows} synthetic startups in {args.out}...")
+    generate(args.out, args.rows, args.seed)
+    print("✅ Done")
+
+
+if __name__ == "__main__":
+    main()
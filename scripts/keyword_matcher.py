@@ -0,0 +1,98 @@
+"""
+Keyword tables matched against free-text categories.
+
+CATEGORY_TRENDS is applied with "first key (in table order) that is a
+case-insensitive substring of the category wins". Scanning every key for
+every record costs O(records x keys); KeywordMatcher compiles the keys into
+an Aho-Corasick automaton once, scans each distinct category once, and
+memoizes the answer, so growing the table has no per-record cost. The memo
+is an LRU of memo_size texts, so a long-running caller (scoring_engine.py
+--serve) fed endless new texts stays bounded.
+"""
+
+from functools import lru_cache
+from typing import Dict, Generic, List, Optional, TypeVar
+
+V = TypeVar("V")
+
+_NO_MATCH = -1
+# Distinct texts whose first match is remembered
+DEFAULT_MEMO_SIZE = 1 << 16
+
+
+class KeywordMatcher(Generic[V]):
+    """Compiled lookup over an ordered {keyword: value} table."""
+
+    def __init__(self, table: Dict[str, V], memo_size: int = DEFAULT_MEMO_SIZE):
+        self.table = table
+        self._keys = list(table)
+        self._values = list(table.values())
+        self._build()
+        self._first = lru_cache(maxsize=memo_size)(self._scan)
+
+    def _build(self):
+        # Trie over lowercased keys; best[node] = lowest key order index that
+        # ends at node or at any suffix of it (via failure links).
+        goto: List[Dict[str, int]] = [{}]
+        best: List[int] = [_NO_MATCH]
+
+        for order, key in enumerate(self._keys):
+            node = 0
+            for ch in key.lower():
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    best.append(_NO_MATCH)
+                node = nxt
+            if best[node] == _NO_MATCH:
+                best[node] = order
+
+        # Breadth-first, so a node's failure target is final before its children
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            if best[fail[node]] != _NO_MATCH and (best[node] == _NO_MATCH or best[fail[node]] < best[node]):
+                best[node] = best[fail[node]]
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                target = goto[f].get(ch, 0)
+                fail[child] = target if target != child else 0
+                queue.append(child)
+
+        self._goto = goto
+        self._fail = fail
+        self._best = best
+
+    def _scan(self, text: str) -> int:
+        """Order index of the first table key occurring in text, or -1."""
+        goto, fail, best = self._goto, self._fail, self._best
+        found = best[0]  # an empty key matches everything
+        node = 0
+        for ch in text.lower():
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            hit = best[node]
+            if hit != _NO_MATCH and (found == _NO_MATCH or hit < found):
+                found = hit
+                if found == 0:
+                    break
+        return found
+
+    def first_match(self, text: str, default: Optional[V] = None) -> Optional[V]:
+        """Value of the first key (in table order) contained in text, case-insensitively."""
+        order = self._first(text)
+        if order == _NO_MATCH:
+            return self.table.get(text, default)
+        return self._values[order]
+
+    def exact(self, text: str, default: Optional[V] = None) -> Optional[V]:
+        """Plain table lookup (used for CATEGORY_MULTIPLIERS)."""
+        return self.table.get(text, default)
@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Offline BM25 search over the processed indices, a local stand-in for Algolia.
+
+The build step turns startups / graveyard records into one memory-mappable
+file per index (data/processed/<index>.idx, same section layout as the CSV
+snapshots). Searchable attributes, facets and the custom ranking attribute
+come from index-settings.json, so the local index behaves like the real
+one: earlier searchableAttributes weigh more, facets filter, and equal
+scores are ordered by customRanking (survival_score / raised_amount).
+
+Query evaluation is exact top-k, but rarely reads whole posting lists:
+    - each term's postings are stored by descending BM25 impact, and a
+      per-document forward index gives random access to a doc's impacts,
+      so the threshold algorithm can stop once no unseen document can still
+      reach the current top k;
+    - selective facet filters are evaluated from the facet's own doc list
+      instead of from the postings;
+    - empty queries walk a precomputed customRanking order.
+
+Usage:
+    python scripts/local_search.py "ai agents for clinics" --filter category=Healthcare
+    python scripts/local_search.py --index graveyard "food delivery" -k 5
+    python scripts/local_search.py --bench
+"""
+
+import argparse
+import heapq
+import json
+import math
+import re
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from csv_snapshot import SectionFile, write_section_file
+
+MAGIC = b"RSTIDX01"
+INDEX_VERSION = "1"
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+SETTINGS_PATH = Path(__file__).resolve().parent / "index-settings.json"
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Postings read per term before the stopping rule is checked again
+BLOCK_SIZE = 64
+
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+CUSTOM_RANKING_RE = re.compile(r"(asc|desc)\((\w+)\)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased, accent-folded alphanumeric words."""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return TOKEN_RE.findall(text.lower())
+
+
+def field_text(value: Any) -> str:
+    if isinstance(value, list):
+        return " ".join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def facet_value(value: Any) -> str:
+    """Facet values as Algolia filters spell them (booleans are true/false)."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else str(value)
+
+
+def index_config(index_name: str, settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Searchable fields with weights, facets and ranking attribute from index-settings.json."""
+    if settings is None:
+        with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+            settings = json.load(f)[index_name]
+    fields = settings.get("searchableAttributes", [])
+    ranking = None
+    ranking_desc = True
+    for rule in settings.get("customRanking", []):
+        match = CUSTOM_RANKING_RE.fullmatch(rule)
+        if match:
+            ranking_desc, ranking = match.group(1) == "desc", match.group(2)
+            break
+    return {
+        # Earlier attributes matter more, like Algolia's attribute criterion
+        "fields": {field: float(len(fields) - i) for i, field in enumerate(fields)},
+        "facets": list(settings.get("attributesForFaceting", [])),
+        "ranking": ranking,
+        "ranking_desc": ranking_desc,
+    }
+
+
+def build_search_index(records: Iterable[Dict[str, Any]], path: Path, index_name: str,
+                       settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Index records (one pass, postings held as arrays) and write path. Returns build stats."""
+    config = index_config(index_name, settings)
+    fields = config["fields"]
+    facets = config["facets"]
+    ranking = config["ranking"]
+
+    term_ids: Dict[str, int] = {}
+    postings_docs: List[array] = []
+    postings_tfs: List[array] = []
+    doc_lengths = array("f")
+    rank_values = array("d")
+    object_ids: List[str] = []
+    names: List[str] = []
+    facet_ids: Dict[str, Dict[str, int]] = {facet: {} for facet in facets}
+    facet_columns: Dict[str, array] = {facet: array("i") for facet in facets}
+
+    for doc, record in enumerate(records):
+        weighted: Dict[int, float] = {}
+        length = 0.0
+        for field, weight in fields.items():
+            tokens = tokenize(field_text(record.get(field)))
+            length += weight * len(tokens)
+            for token in tokens:
+                tid = term_ids.get(token)
+                if tid is None:
+                    tid = term_ids[token] = len(term_ids)
+                    postings_docs.append(array("i"))
+                    postings_tfs.append(array("f"))
+                weighted[tid] = weighted.get(tid, 0.0) + weight
+        for tid, tf in weighted.items():
+            postings_docs[tid].append(doc)
+            postings_tfs[tid].append(tf)
+        doc_lengths.append(length)
+        value = record.get(ranking) if ranking else None
+        rank_values.append(float(value) if isinstance(value, (int, float)) else 0.0)
+        object_ids.append(str(record.get("objectID", doc)))
+        names.append(str(record.get("name", "")))
+        for facet in facets:
+            ids = facet_ids[facet]
+            v = facet_value(record.get(facet))
+            facet_columns[facet].append(ids.setdefault(v, len(ids)))
+
+    num_docs = len(doc_lengths)
+    avg_length = (sum(doc_lengths) / num_docs) if num_docs else 1.0
+    if not config["ranking_desc"]:
+        rank_values = array("d", (-v for v in rank_values))
+
+    # Postings become BM25 impacts, ordered best first (ties: ranking, then doc id)
+    postings_offsets = array("q", [0])
+    all_docs = array("i")
+    all_impacts = array("f")
+    forward: List[List[Tuple[int, float]]] = [[] for _ in range(num_docs)]
+    norm = [K1 * (1 - B + B * dl / avg_length) for dl in doc_lengths]
+    for tid, (docs, tfs) in enumerate(zip(postings_docs, postings_tfs)):
+        idf = math.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+        # Round through float32 so forward and inverted impacts compare equal
+        impacts = array("f", (idf * tf * (K1 + 1) / (tf + norm[d]) for d, tf in zip(docs, tfs)))
+        order = sorted(range(len(docs)), key=lambda j: (-impacts[j], -rank_values[docs[j]], docs[j]))
+        for j in order:
+            all_docs.append(docs[j])
+            all_impacts.append(impacts[j])
+            forward[docs[j]].append((tid, impacts[j]))
+        postings_offsets.append(len(all_docs))
+        postings_docs[tid] = postings_tfs[tid] = None
+
+    forward_offsets = array("q", [0])
+    forward_terms = array("i")
+    forward_impacts = array("f")
+    for entries in forward:
+        entries.sort()
+        forward_terms.extend(tid for tid, _ in entries)
+        forward_impacts.extend(impact for _, impact in entries)
+        forward_offsets.append(len(forward_terms))
+
+    by_rank = array("i", sorted(range(num_docs), key=lambda d: (-rank_values[d], d)))
+
+    strings = _encode_strings(list(term_ids) + object_ids + names)
+    sections = [
+        ("strings", strings[0], "B"), ("strings.offsets", strings[1].tobytes(), "q"),
+        ("postings.offsets", postings_offsets.tobytes(), "q"),
+        ("postings.docs", all_docs.tobytes(), "i"), ("postings.impacts", all_impacts.tobytes(), "f"),
+        ("forward.offsets", forward_offsets.tobytes(), "q"),
+        ("forward.terms", forward_terms.tobytes(), "i"), ("forward.impacts", forward_impacts.tobytes(), "f"),
+        ("rank", rank_values.tobytes(), "d"), ("by_rank", by_rank.tobytes(), "i"),
+    ]
+    facet_values = {}
+    for facet in facets:
+        column = facet_columns[facet]
+        values = list(facet_ids[facet])
+        facet_values[facet] = values
+        # Doc list per facet value, in customRanking order
+        buckets: List[List[int]] = [[] for _ in values]
+        for d in by_rank:
+            buckets[column[d]].append(d)
+        offsets = array("q", [0])
+        docs = array("i")
+        for bucket in buckets:
+            docs.extend(bucket)
+            offsets.append(len(docs))
+        sections += [
+            (f"facet.{facet}", column.tobytes(), "i"),
+            (f"facet.{facet}.offsets", offsets.tobytes(), "q"),
+            (f"facet.{facet}.docs", docs.tobytes(), "i"),
+        ]
+
+    write_section_file(path, MAGIC, {
+        "version": INDEX_VERSION,
+        "index": index_name,
+        "num_docs": num_docs,
+        "num_terms": len(term_ids),
+        "avg_length": avg_length,
+        "k1": K1,
+        "b": B,
+        "fields": fields,
+        "ranking": ranking,
+        "facets": facet_values,
+    }, sections)
+    return {"docs": num_docs, "terms": len(term_ids), "postings": len(all_docs), "bytes": path.stat().st_size}
+
+
+def _encode_strings(strings: List[str]) -> Tuple[bytes, array]:
+    offsets = array("q", [0])
+    chunks = []
+    total = 0
+    for s in strings:
+        b = s.encode("utf-8")
+        chunks.append(b)
+        total += len(b)
+        offsets.append(total)
+    return b"".join(chunks), offsets
+
+
+class LocalSearchIndex:
+    """Read-only view over an index file; all arrays stay in the page cache, not the heap."""
+
+    def __init__(self, path: Path):
+        self.file = SectionFile(path, MAGIC)
+        header = self.file.header
+        if header.get("version") != INDEX_VERSION:
+            self.file.close()
+            raise ValueError(f"{path}: index version {header.get('version')}, expected {INDEX_VERSION}")
+        self.header = header
+        self.num_docs = header["num_docs"]
+        self.num_terms = header["num_terms"]
+        s = self.file.sections
+        self._strings, self._string_offsets = s["strings"], s["strings.offsets"]
+        self._postings_offsets, self._postings_docs, self._postings_impacts = (
+            s["postings.offsets"], s["postings.docs"], s["postings.impacts"])
+        self._forward_offsets, self._forward_terms, self._forward_impacts = (
+            s["forward.offsets"], s["forward.terms"], s["forward.impacts"])
+        self._rank, self._by_rank = s["rank"], s["by_rank"]
+        self._facet_values = {facet: {v: i for i, v in enumerate(values)}
+                              for facet, values in header["facets"].items()}
+        self._terms: Optional[Dict[str, int]] = None
+
+    def close(self):
+        self._strings = self._string_offsets = None
+        self._postings_offsets = self._postings_docs = self._postings_impacts = None
+        self._forward_offsets = self._forward_terms = self._forward_impacts = None
+        self._rank = self._by_rank = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _string(self, i: int) -> str:
+        offsets = self._string_offsets
+        return bytes(self._strings[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def term_id(self, term: str) -> Optional[int]:
+        if self._terms is None:
+            # Decoded once, on first query
+            self._terms = {self._string(i): i for i in range(self.num_terms)}
+        return self._terms.get(term)
+
+    def _score(self, doc: int, terms: Sequence[int]) -> float:
+        lo, hi = self._forward_offsets[doc], self._forward_offsets[doc + 1]
+        fterms, fimpacts = self._forward_terms, self._forward_impacts
+        score = 0.0
+        for tid in terms:
+            j = bisect_left(fterms, tid, lo, hi)
+            if j < hi and fterms[j] == tid:
+                score += fimpacts[j]
+        return score
+
+    def _compile_filters(self, filters: Optional[Dict[str, Any]]) -> Optional[List[Tuple[str, set]]]:
+        """[(facet, allowed value ids)]; values within a facet are OR-ed, facets AND-ed."""
+        compiled = []
+        for facet, wanted in (filters or {}).items():
+            if facet not in self._facet_values:
+                raise ValueError(f"{facet!r} is not in attributesForFaceting")
+            wanted = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            ids = {self._facet_values[facet].get(facet_value(v)) for v in wanted} - {None}
+            compiled.append((facet, ids))
+        return compiled
+
+    def _filter_docs(self, facet: str, ids: set) -> Iterable[int]:
+        """Docs matching one facet filter, in customRanking order."""
+        offsets = self.file.sections[f"facet.{facet}.offsets"]
+        docs = self.file.sections[f"facet.{facet}.docs"]
+        lists = [docs[offsets[i]:offsets[i + 1]] for i in ids]
+        if len(lists) == 1:
+            return lists[0]
+        rank = self._rank
+        return heapq.merge(*lists, key=lambda d: (-rank[d], d))
+
+    def _filter_size(self, facet: str, ids: set) -> int:
+        offsets = self.file.sections[f"facet.{facet}.offsets"]
+        return sum(offsets[i + 1] - offsets[i] for i in ids)
+
+    def search(self, query: str = "", filters: Optional[Dict[str, Any]] = None, k: int = 10) -> Dict[str, Any]:
+        """
+        Top-k hits for query (words OR-ed, BM25 over the searchable
+        attributes), restricted by facet filters like {"category": "Fintech",
+        "batch": ["W24", "S24"]}. Ties go to the higher customRanking value.
+        """
+        start = time.perf_counter()
+        compiled = self._compile_filters(filters)
+        terms = sorted({tid for tid in (self.term_id(t) for t in tokenize(query)) if tid is not None})
+
+        if any(not ids for _, ids in compiled):
+            docs_scores: List[Tuple[float, int]] = []
+        elif not terms and query.strip():
+            docs_scores = []
+        else:
+            accept = self._accept(compiled)
+            smallest = min(compiled, key=lambda c: self._filter_size(*c)) if compiled else None
+            if not terms:
+                docs_scores = self._browse(k, accept, smallest)
+            elif smallest and self._filter_size(*smallest) ** 2 <= k * self.num_docs:
+                # Walking postings would read about k * N / size of them before
+                # finding k matches; the filter's own list is shorter
+                docs_scores = self._scan_filtered(terms, k, accept, smallest)
+            else:
+                docs_scores = self._threshold_top_k(terms, k, accept)
+
+        hits = [
+            {
+                "objectID": self._string(self.num_terms + d),
+                "name": self._string(self.num_terms + self.num_docs + d),
+                "_score": round(score, 4),
+                "_rank": self._rank[d],
+            }
+            for score, d in docs_scores
+        ]
+        return {"hits": hits, "query": query, "processingTimeMS": round((time.perf_counter() - start) * 1000, 3)}
+
+    def _accept(self, compiled: List[Tuple[str, set]]):
+        columns = [(self.file.sections[f"facet.{facet}"], ids) for facet, ids in compiled]
+        if not columns:
+            return None
+        if len(columns) == 1:
+            column, ids = columns[0]
+            return lambda d: column[d] in ids
+        return lambda d: all(column[d] in ids for column, ids in columns)
+
+    def _key(self, score: float, doc: int) -> Tuple[float, float, int]:
+        # Min-heap key: the worst kept hit sits on top
+        return score, self._rank[doc], -doc
+
+    def _finish(self, heap: List[Tuple[float, float, int]]) -> List[Tuple[float, int]]:
+        return [(score, -neg_doc) for score, _, neg_doc in sorted(heap, reverse=True)]
+
+    def _browse(self, k: int, accept, smallest) -> List[Tuple[float, int]]:
+        """Empty query: documents in customRanking order."""
+        docs = self._filter_docs(*smallest) if smallest else self._by_rank
+        out = []
+        for d in docs:
+            if accept is None or accept(d):
+                out.append((0.0, d))
+                if len(out) == k:
+                    break
+        return out
+
+    def _scan_filtered(self, terms: Sequence[int], k: int, accept, smallest) -> List[Tuple[float, int]]:
+        """Selective filter: score its documents directly through the forward index."""
+        heap: List[Tuple[float, float, int]] = []
+        for d in self._filter_docs(*smallest):
+            if not accept(d):
+                continue
+            score = self._score(d, terms)
+            if score <= 0:
+                continue
+            key = self._key(score, d)
+            if len(heap) < k:
+                heapq.heappush(heap, key)
+            elif key > heap[0]:
+                heapq.heapreplace(heap, key)
+        return self._finish(heap)
+
+    def _threshold_top_k(self, terms: Sequence[int], k: int, accept) -> List[Tuple[float, int]]:
+        """
+        Fagin's threshold algorithm over impact-ordered postings: read each
+        list in blocks, score every new document exactly via the forward index,
+        and stop once the k-th best score beats the best any unseen document
+        could still get (the sum of the lists' current impacts). Equal impacts
+        are stored in customRanking order, so an unseen document can only tie
+        that bound with a lower-ranked key than every list's frontier.
+        """
+        offsets, pdocs, pimpacts = self._postings_offsets, self._postings_docs, self._postings_impacts
+        foffsets, fterms, fimpacts, rank = self._forward_offsets, self._forward_terms, self._forward_impacts, self._rank
+        pos = [offsets[t] for t in terms]
+        end = [offsets[t + 1] for t in terms]
+        heap: List[Tuple[float, float, int]] = []
+        seen = set()
+        while True:
+            live = [i for i in range(len(terms)) if pos[i] < end[i]]
+            if not live:
+                break
+            if len(heap) == k:
+                threshold = sum(pimpacts[pos[i]] for i in live)
+                worst = heap[0]
+                if worst[0] > threshold:
+                    break
+                if worst[0] == threshold and all(
+                    worst[1:] >= (rank[pdocs[pos[i]]], -pdocs[pos[i]]) for i in live
+                ):
+                    break
+            for i in live:
+                # An unseen doc sits at or past every other list's frontier,
+                # so this bounds its score without the forward-index lookup
+                others = sum(pimpacts[pos[l]] for l in range(len(terms)) if l != i and pos[l] < end[l])
+                stop = min(pos[i] + BLOCK_SIZE, end[i])
+                for j in range(pos[i], stop):
+                    d = pdocs[j]
+                    if d in seen:
+                        continue
+                    seen.add(d)
+                    impact = pimpacts[j]
+                    if len(heap) == k and impact + others < heap[0][0]:
+                        continue
+                    if accept is not None and not accept(d):
+                        continue
+                    # Exact score: this list's impact plus the doc's forward entries
+                    # for the other terms, summed in term order like _score
+                    score = 0.0
+                    lo, hi = foffsets[d], foffsets[d + 1]
+                    for t in terms:
+                        if t == terms[i]:
+                            score += impact
+                            continue
+                        lo = bisect_left(fterms, t, lo, hi)
+                        if lo < hi and fterms[lo] == t:
+                            score += fimpacts[lo]
+                    key = (score, rank[d], -d)
+                    if len(heap) < k:
+                        heapq.heappush(heap, key)
+                    elif key > heap[0]:
+                        heapq.heapreplace(heap, key)
+                pos[i] = stop
+        return self._finish(heap)
+
+
+def parse_filters(values: List[str]) -> Dict[str, List[str]]:
+    filters: Dict[str, List[str]] = {}
+    for value in values:
+        facet, _, wanted = value.partition("=")
+        filters.setdefault(facet, []).append(wanted)
+    return filters
+
+
+def run_bench(index: LocalSearchIndex, repeat: int):
+    """Latency over a fixed mix of common, rare, multi-word, filtered and empty queries."""
+    words = [index._string(t) for t in range(index.num_terms)]
+    df = sorted(range(index.num_terms), key=lambda t: index._postings_offsets[t + 1] - index._postings_offsets[t])
+    common = [words[t] for t in df[-20:]]
+    rare = [words[t] for t in df[:: max(1, len(df) // 20)]]
+    facet, values = next(iter(index.header["facets"].items()), (None, []))
+    queries = [(w, None) for w in common + rare]
+    queries += [(f"{a} {b}", None) for a, b in zip(common, reversed(common))]
+    queries += [(f"{a} {b} {c}", None) for a, b, c in zip(common, rare, common[5:])]
+    if facet:
+        queries += [(w, {facet: v}) for w, v in zip(common, values)]
+        queries += [("", {facet: v}) for v in values[:10]]
+    queries.append(("", None))
+
+    for query, filters in queries:  # warm the term dict and page cache
+        index.search(query, filters)
+    latencies = []
+    for _ in range(repeat):
+        for query, filters in queries:
+            t = time.perf_counter()
+            index.search(query, filters)
+            latencies.append((time.perf_counter() - t) * 1000)
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]
+    print(f"🔎 {len(queries)} queries x {repeat} over {index.num_docs:,} docs / {index.num_terms:,} terms")
+    print(f"   p50 {pct(50):.3f} ms   p90 {pct(90):.3f} ms   p99 {pct(99):.3f} ms   max {latencies[-1]:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the local search index built by process-data.py --search-index.")
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--index", default="startups", help="startups or graveyard (default: startups)")
+    parser.add_argument("--path", type=Path, help="index file (default: data/processed/<index>.idx)")
+    parser.add_argument("--filter", action="append", default=[], metavar="FACET=VALUE",
+                        help="facet filter; repeat to OR values of one facet or AND different facets")
+    parser.add_argument("-k", type=int, default=10, help="number of hits (default: 10)")
+    parser.add_argument("--bench", action="store_true", help="time a fixed query mix instead")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = args.path or ROOT_DIR / "data" / "processed" / f"{args.index}.idx"
+    with LocalSearchIndex(path) as index:
+        if args.bench:
+            run_bench(index, args.repeat)
+            return
+        result = index.search(args.query, parse_filters(args.filter), args.k)
+        print(f"🔎 {len(result['hits'])} hits in {result['processingTimeMS']} ms")
+        for hit in result["hits"]:
+            print(f"   {hit['_score']:8.3f}  {hit['_rank']:6.1f}  {hit['objectID']:<28} {hit['name']}")
+
+
+if __name__ == "__main__":
+    main()
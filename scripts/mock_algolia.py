@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Algolia write API, for measuring the uploader offline.
+
+Implements the endpoints algolia_uploader.py uses:
+    DELETE /1/indexes/{index}
+    GET  /1/indexes/{index}/settings        404 until the index exists
+    PUT  /1/indexes/{index}/settings
+    POST /1/indexes/{index}/batch           addObject / updateObject / deleteObject
+    POST /1/indexes/{index}/operation       copy / move (a scoped copy, like
+                                            Algolia's, leaves the destination's
+                                            other scopes, records included, as is)
+    GET  /1/indexes/{index}/task/{taskID}
+    GET  /1/indexes                         index list with record counts
+
+Only objectIDs are kept, not the records. Responses use keep-alive HTTP/1.1.
+--latency, --rate-limit and --error-rate simulate a slow, throttling or
+flaky server.
+
+Usage:
+    python scripts/mock_algolia.py --port 8787 --latency 20 --rate-limit 200
+    python scripts/process-data.py --upload --algolia-url http://127.0.0.1:8787
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import unquote
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+           429: "Too Many Requests", 503: "Service Unavailable"}
+
+
+class MockIndex:
+    def __init__(self):
+        self.settings: Dict[str, Any] = {}
+        self.object_ids: Set[str] = set()
+
+
+class MockAlgoliaServer:
+    def __init__(self, latency_ms: float = 0, rate_limit: float = 0, error_rate: float = 0, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.indices: Dict[str, MockIndex] = {}
+        self.task_id = 0
+        self.stats = {"requests": 0, "batches": 0, "records": 0, "throttled": 0, "errors": 0, "connections": 0}
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.port: Optional[int] = None
+
+    def _next_task(self) -> Dict[str, Any]:
+        self.task_id += 1
+        return {"taskID": self.task_id, "updatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())}
+
+    def _throttled(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        if now - self._window_start >= 1:
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+        return self._window_count > self.rate_limit
+
+    def handle(self, method: str, path: str, headers: Dict[str, str], body: bytes) -> Tuple[int, Dict[str, str], Any]:
+        if not headers.get("x-algolia-api-key") or not headers.get("x-algolia-application-id"):
+            return 403, {}, {"message": "Invalid Application-ID or API key"}
+        if self._throttled():
+            self.stats["throttled"] += 1
+            retry_after = max(0.0, 1 - (time.monotonic() - self._window_start))
+            return 429, {"Retry-After": f"{retry_after:.3f}"}, {"message": "Too many requests"}
+        if method in ("POST", "PUT") and self.error_rate and self.random.random() < self.error_rate:
+            self.stats["errors"] += 1
+            return 503, {}, {"message": "Service unavailable"}
+
+        parts = [unquote(p) for p in path.split("?")[0].strip("/").split("/")]
+        if parts == ["1", "indexes"] and method == "GET":
+            items = [{"name": name, "entries": len(index.object_ids)} for name, index in self.indices.items()]
+            return 200, {}, {"items": items, "nbPages": 1}
+        if len(parts) == 3 and parts[:2] == ["1", "indexes"] and method == "DELETE":
+            self.indices.pop(parts[2], None)
+            return 200, {}, self._next_task()
+        if len(parts) < 4 or parts[:2] != ["1", "indexes"]:
+            return 404, {}, {"message": "Not found"}
+
+        name, action = parts[2], parts[3]
+        payload = json.loads(body) if body else {}
+        if action == "settings" and method == "GET":
+            index = self.indices.get(name)
+            return (200, {}, index.settings) if index else (404, {}, {"message": "Index does not exist"})
+        if action == "settings" and method == "PUT":
+            self.indices.setdefault(name, MockIndex()).settings.update(payload)
+            return 200, {}, self._next_task()
+        if action == "batch" and method == "POST":
+            index = self.indices.setdefault(name, MockIndex())
+            ids = []
+            for request in payload.get("requests", []):
+                object_id = (request.get("body") or {}).get("objectID")
+                if object_id is None:
+                    return 400, {}, {"message": "objectID is required"}
+                if request.get("action") == "deleteObject":
+                    index.object_ids.discard(object_id)
+                else:
+                    index.object_ids.add(object_id)
+                ids.append(object_id)
+            self.stats["batches"] += 1
+            self.stats["records"] += len(ids)
+            return 200, {}, {**self._next_task(), "objectIDs": ids}
+        if action == "operation" and method == "POST":
+            source = self.indices.get(name)
+            if source is None:
+                return 404, {}, {"message": "Index does not exist"}
+            destination = payload.get("destination")
+            if payload.get("operation") == "move":
+                self.indices[destination] = self.indices.pop(name)
+            elif not payload.get("scope"):
+                copy = self.indices[destination] = MockIndex()
+                copy.settings = dict(source.settings)
+                copy.object_ids = set(source.object_ids)
+            else:
+                copy = self.indices.setdefault(destination, MockIndex())
+                scope = payload["scope"]
+                if "settings" in scope:
+                    copy.settings = dict(source.settings)
+                if "records" in scope:
+                    copy.object_ids = set(source.object_ids)
+            return 200, {}, self._next_task()
+        if action == "task" and method == "GET":
+            return 200, {}, {"status": "published", "pendingTask": False}
+        return 404, {}, {"message": "Not found"}
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        try:
+            while True:
+                try:
+                    request_line = await reader.readuntil(b"\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await reader.readuntil(b"\r\n")
+                    if line == b"\r\n":
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                self.stats["requests"] += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, extra_headers, response = self.handle(method, path, headers, body)
+                data = json.dumps(response).encode("utf-8")
+                keep_alive = headers.get("connection", "").lower() != "close"
+                head = [f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}",
+                        "Content-Type: application/json; charset=utf-8",
+                        f"Content-Length: {len(data)}",
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+                head += [f"{k}: {v}" for k, v in extra_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = await asyncio.start_server(self._serve, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Run the server on a background event loop; returns its base URL."""
+        loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.start(host, port))
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=run, daemon=True).start()
+        started.wait()
+        return f"http://{host}:{self.port}"
+
+
+async def serve_forever(server: MockAlgoliaServer, host: str, port: int):
+    await server.start(host, port)
+    print(f"🧪 Mock Algolia listening on http://{host}:{server.port} (Ctrl-C to stop)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Algolia write API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency", type=float, default=0, help="added latency per request, in ms")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests per second before 429s (0: off)")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of writes answered with 503")
+    args = parser.parse_args()
+
+    server = MockAlgoliaServer(args.latency, args.rate_limit, args.error_rate)
+    try:
+        asyncio.run(serve_forever(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    print(f"\n📊 {server.stats}")
+    for name, index in server.indices.items():
+        print(f"   {name}: {len(index.object_ids)} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Upload-ready output: compact NDJSON split into gzip shards.
+
+Each shard holds at most MAX_SHARD_RECORDS records and MAX_SHARD_BYTES of
+uncompressed JSON, so one shard is exactly one Algolia batch request and the
+uploader only ever holds a few shards in memory. shards/manifest.json lists
+every shard with its record count, sizes and SHA-256, letting the uploader
+verify and retry shards independently.
+
+Shards are gzipped with a fixed mtime, so identical records always produce
+byte-identical shards (and checksums).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from compact_records import json_default
+
+# Algolia batch requests: the uploader's default batch size, and a byte cap
+# safely below the 10 MB request body limit
+MAX_SHARD_RECORDS = 1000
+MAX_SHARD_BYTES = 9 * 1024 * 1024
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ShardWriter:
+    """Writes one index's records as <index>-00000.ndjson.gz, <index>-00001.ndjson.gz, ..."""
+
+    def __init__(
+        self,
+        out_dir: Path,
+        index_name: str,
+        max_records: int = MAX_SHARD_RECORDS,
+        max_bytes: int = MAX_SHARD_BYTES,
+    ):
+        self.out_dir = out_dir
+        self.index_name = index_name
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.shards: List[Dict[str, Any]] = []
+        self._lines: List[bytes] = []
+        self._size = 0
+
+    def add(self, record: Dict[str, Any]):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8") + b"\n"
+        if self._lines and (len(self._lines) >= self.max_records or self._size + len(line) > self.max_bytes):
+            self.flush()
+        # A single record larger than max_bytes still gets a shard of its own
+        self._lines.append(line)
+        self._size += len(line)
+
+    def flush(self):
+        if not self._lines:
+            return
+        name = f"{self.index_name}-{len(self.shards):05d}.ndjson.gz"
+        data = gzip.compress(b"".join(self._lines), compresslevel=6, mtime=0)
+        tmp_path = self.out_dir / (name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.out_dir / name)
+        self.shards.append({
+            "index": self.index_name,
+            "file": name,
+            "records": len(self._lines),
+            "bytes": self._size,
+            "compressed_bytes": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+        self._lines = []
+        self._size = 0
+
+    def write(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Shard records as they arrive. Returns the record count."""
+        count = 0
+        for record in records:
+            self.add(record)
+            count += 1
+        self.flush()
+        return count
+
+
+def clear_shards(out_dir: Path):
+    """Remove the previous run's shards and manifest so none go stale."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for path in out_dir.glob("*.ndjson.gz"):
+        path.unlink()
+    manifest = out_dir / MANIFEST_NAME
+    if manifest.exists():
+        manifest.unlink()
+
+
+def write_shard_manifest(out_dir: Path, writers: Iterable[ShardWriter]):
+    writers = list(writers)
+    manifest = {
+        "max_records": max((w.max_records for w in writers), default=MAX_SHARD_RECORDS),
+        "max_bytes": max((w.max_bytes for w in writers), default=MAX_SHARD_BYTES),
+        "indices": {
+            w.index_name: {
+                "records": sum(s["records"] for s in w.shards),
+                "shards": w.shards,
+            }
+            for w in writers
+        },
+    }
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
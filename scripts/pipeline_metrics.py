@@ -0,0 +1,151 @@
+"""
+Per-stage instrumentation for the processing pipeline.
+
+Each stage records wall time, CPU time (including reaped worker processes),
+peak RSS and rows in/out. Parsing helpers also count the fields that fell
+back to a default (unparseable funding, missing years, ...). The whole thing
+is written as one JSON document so runs can be scraped and compared.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+MB = 2 ** 20
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc, ru_maxrss elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def cpu_seconds() -> float:
+    """User + system CPU of this process and of its waited-for children."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class RssSampler:
+    """Samples RSS on a background thread to catch the peak within a stage."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.peak = current_rss_bytes()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss_bytes())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+
+class Stage:
+    """Measurements of one stage; callers fill in rows_in/rows_out as they learn them."""
+
+    def __init__(self, name: str, rows_in: Optional[int] = None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out: Optional[int] = None
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rss_before = 0
+        self.rss_after = 0
+        self.peak_rss = 0
+        self.extra: Dict[str, Any] = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        return {
+            "stage": self.name,
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "rows_per_sec": round(rows / self.wall_seconds, 1) if rows and self.wall_seconds > 0 else None,
+            "rss_before_mb": round(self.rss_before / MB, 1),
+            "rss_after_mb": round(self.rss_after / MB, 1),
+            "peak_rss_mb": round(self.peak_rss / MB, 1),
+            **self.extra,
+        }
+
+
+class PipelineMetrics:
+    """Stage timings plus fallback counters for one pipeline run."""
+
+    def __init__(self, fallbacks: Optional[Counter] = None):
+        self.stages: List[Stage] = []
+        self.fallbacks: Counter = fallbacks if fallbacks is not None else Counter()
+        self.info: Dict[str, Any] = {}
+
+    def reset(self):
+        """Start a new run; fallbacks is cleared in place so aliases stay valid."""
+        self.stages = []
+        self.fallbacks.clear()
+        self.info = {}
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[Stage]:
+        stage = Stage(name, rows_in)
+        stage.rss_before = current_rss_bytes()
+        cpu_start = cpu_seconds()
+        with RssSampler() as sampler:
+            start = time.perf_counter()
+            try:
+                yield stage
+            finally:
+                stage.wall_seconds = time.perf_counter() - start
+        stage.cpu_seconds = cpu_seconds() - cpu_start
+        stage.peak_rss = sampler.peak
+        stage.rss_after = current_rss_bytes()
+        self.stages.append(stage)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.info,
+            "total_wall_seconds": round(sum(s.wall_seconds for s in self.stages), 4),
+            "total_cpu_seconds": round(sum(s.cpu_seconds for s in self.stages), 4),
+            "peak_rss_mb": round(max((s.peak_rss for s in self.stages), default=0) / MB, 1),
+            "stages": [s.to_dict() for s in self.stages],
+            "fallbacks": dict(sorted(self.fallbacks.items())),
+        }
+
+    def write(self, path: Path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def print_summary(self):
+        print("\n⏱️  Stage timings:")
+        for s in self.stages:
+            rows = f"{s.rows_out:>8} rows" if s.rows_out is not None else " " * 13
+            print(
+                f"   {s.name:<18} {s.wall_seconds:8.3f}s wall {s.cpu_seconds:8.3f}s cpu "
+                f"{rows}  peak {s.peak_rss / MB:,.1f} MB"
+            )
+        if self.fallbacks:
+            print("\n   Fields that fell back to defaults:")
+            for name, count in sorted(self.fallbacks.items(), key=lambda x: x[1], reverse=True):
+                print(f"      {name}: {count}")
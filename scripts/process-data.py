@@ -4,313 +4,695 @@ Process YC startups and failed startups data for Algolia import.
 - Cleans and normalizes data
 - Adds Algolia-friendly objectID
 - Outputs JSON files ready for upload
+- Writes facets.json, the facet counts the app's filters use (facet_cube.py)
+
+Usage:
+    python scripts/process-data.py            # pretty-printed JSON arrays
+    python scripts/process-data.py --ndjson   # streamed newline-delimited JSON
+    python scripts/process-data.py --shards   # gzip NDJSON shards sized for Algolia batches
+    python scripts/process-data.py --jobs 8   # parse yc.csv on 8 cores
+    python scripts/process-data.py --profile  # cProfile the parsing helpers
+    python scripts/process-data.py --upload   # then replace the Algolia indices
+    python scripts/process-data.py --similar 10  # store the 10 most similar records on each record
+    python scripts/process-data.py --saturation competitors  # saturation from competitor clusters
+    python scripts/process-data.py --search-index  # also build the local BM25 index (local_search.py)
+    python scripts/process-data.py --watch    # reprocess whenever yc.csv or Fails/ change
+    python scripts/process-data.py --record-budget 2048  # split startups over 2 KB into paragraph records
 """
 
+import argparse
+import cProfile
 import csv
+import gzip
+import hashlib
+import io
 import json
+import mmap
 import os
+import pstats
 import re
+import shutil
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+import field_parsers
+from algolia_uploader import DEFAULT_CONCURRENCY, AlgoliaError, load_index_settings, upload_indices
+from compact_records import CompactRecord, json_default, record_class
+from competitor_clusters import CompetitorClusters, find_competitor_clusters
+from csv_snapshot import cached_records, load_snapshot
+from data_watcher import DEFAULT_DEBOUNCE, DEFAULT_INTERVAL, ChangeSet, DataWatcher, FileState, file_state
+from entity_resolution import EntityIndex, link_graveyard_to_startups
+from facet_cube import PUBLIC_FACETS_PATH, FacetCube
+from field_parsers import (
+    FALLBACKS, clean_text, extract_year, extract_years, parse_founders, parse_funding, parse_tags, safe_int,
+)
+from local_search import build_search_index
+from ndjson_shards import ShardWriter, clear_shards, write_shard_manifest
+from record_budget import RecordBudget, is_child
+from scoring_engine import write_category_counts
+from pipeline_metrics import PipelineMetrics
+from similarity import SIMILARITY_FIELDS, Neighbours, compute_neighbours
+from stage_dag import StageDAG
+from tag_cooccurrence import TagMatrix, build_tag_matrix
+from survival_scoring import DEFAULT_SCORER, ScoringColumns, get_competitor_saturation
 
 # Paths
-ROOT_DIR = Path("/Users/dm-vu-khoi.nguyen/Documents/CookProject/hackathon/algolia")
+ROOT_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = ROOT_DIR / "data"
 OUTPUT_DIR = ROOT_DIR / "data" / "processed"
 FAILS_DIR = DATA_DIR / "Fails"
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+# objectID -> hash of what the indices hold, as of the last successful upload
+MANIFEST_PATH = OUTPUT_DIR / "manifest.json"
+# The same for the latest run's output; an upload moves it over MANIFEST_PATH
+PENDING_MANIFEST_PATH = OUTPUT_DIR / "manifest.pending.json"
+DELTA_DIR = OUTPUT_DIR / "delta"
+SHARDS_DIR = OUTPUT_DIR / "shards"
+MERGE_REPORT_PATH = OUTPUT_DIR / "graveyard_merges.json"
+METRICS_PATH = OUTPUT_DIR / "metrics.json"
+PROFILE_PATH = OUTPUT_DIR / "profile.pstats"
+FACETS_PATH = OUTPUT_DIR / "facets.json"
+FACET_KEYS_PATH = OUTPUT_DIR / "facet_keys.json"
+LEAN_PATH = OUTPUT_DIR / "startups.lean.json"
+# Category counts saturation was scored with, for scoring_engine.py
+CATEGORY_COUNTS_PATH = OUTPUT_DIR / "category_counts.json"
+# Tag co-occurrence matrix and per-tag counts by batch year
+TAG_MATRIX_PATH = OUTPUT_DIR / "tag_matrix.json"
+# --watch writes each run here, then moves the files into OUTPUT_DIR
+STAGING_DIR_NAME = ".staging"
+# PUBLIC_FACETS_PATH, the copy of facets.json the app serves, is only written
+# for the default paths
+
+# Bump when a parser/cleaner changes, so cached snapshots are rebuilt
+PARSER_VERSION = "1"
+# Turned off by --no-cache
+USE_SNAPSHOTS = True
+# Turned on by --compact: hold parsed records as compact slotted objects
+# rather than dicts (compact_records.py). Less memory, slower field access
+COMPACT_RECORDS = False
+
+# Target size of one --jobs parsing chunk
+CSV_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Where market saturation comes from (--saturation)
+SATURATION_SOURCES = ("category", "competitors")
+
+# Stage timings of the current run. FALLBACKS counts fields the field parsers
+# had to default; rows loaded from a snapshot skip the parsers and are not counted.
+METRICS = PipelineMetrics(FALLBACKS)
+
+# Helpers reported by --profile
+PROFILED_HELPERS = ["clean_text", "parse_tags", "parse_founders", "parse_funding", "extract_years", "extract_year", "safe_int"]
 
 # Create output directory
 OUTPUT_DIR.mkdir(exist_ok=True)
 
 
-def clean_text(text: str) -> str:
-    """Clean and normalize text content."""
-    if not text or text == "[]":
-        return ""
-    text = str(text).strip()
-    # Remove extra quotes from stringified arrays
-    if text.startswith("'") and text.endswith("'"):
-        text = text[1:-1]
-    elif text.startswith('"') and text.endswith('"'):
-        text = text[1:-1]
-    return text
+def configure_paths(data_dir: Path, output_dir: Path = None):
+    """Point the pipeline at another data directory (--data-dir, benchmarks)."""
+    global DATA_DIR, OUTPUT_DIR, FAILS_DIR, SNAPSHOT_DIR, MANIFEST_PATH, PENDING_MANIFEST_PATH, DELTA_DIR
+    global MERGE_REPORT_PATH
+    global SHARDS_DIR, METRICS_PATH, PROFILE_PATH, FACETS_PATH, FACET_KEYS_PATH, PUBLIC_FACETS_PATH, LEAN_PATH
+    global CATEGORY_COUNTS_PATH, TAG_MATRIX_PATH
+    DATA_DIR = Path(data_dir)
+    OUTPUT_DIR = Path(output_dir) if output_dir else DATA_DIR / "processed"
+    FAILS_DIR = DATA_DIR / "Fails"
+    SNAPSHOT_DIR = DATA_DIR / "snapshots"
+    MANIFEST_PATH = OUTPUT_DIR / "manifest.json"
+    PENDING_MANIFEST_PATH = OUTPUT_DIR / "manifest.pending.json"
+    DELTA_DIR = OUTPUT_DIR / "delta"
+    SHARDS_DIR = OUTPUT_DIR / "shards"
+    MERGE_REPORT_PATH = OUTPUT_DIR / "graveyard_merges.json"
+    METRICS_PATH = OUTPUT_DIR / "metrics.json"
+    PROFILE_PATH = OUTPUT_DIR / "profile.pstats"
+    FACETS_PATH = OUTPUT_DIR / "facets.json"
+    FACET_KEYS_PATH = OUTPUT_DIR / "facet_keys.json"
+    LEAN_PATH = OUTPUT_DIR / "startups.lean.json"
+    CATEGORY_COUNTS_PATH = OUTPUT_DIR / "category_counts.json"
+    TAG_MATRIX_PATH = OUTPUT_DIR / "tag_matrix.json"
+    PUBLIC_FACETS_PATH = None
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def build_yc_record(row: Dict[str, str], i: int) -> Dict[str, Any]:
+    """Map one yc.csv row to an Algolia startup record."""
+    tags = parse_tags(row.get("tags", "[]"))
+    if not tags:
+        FALLBACKS["category.other"] += 1
+    return {
+        "objectID": f"yc_{row.get('company_id', i)}",
+        "name": clean_text(row.get("company_name", "")),
+        "description": clean_text(row.get("short_description", "")),
+        "long_description": clean_text(row.get("long_description", "")),
+        "batch": clean_text(row.get("batch", "")),
+        "status": clean_text(row.get("status", "Active")),
+        "tags": tags,
+        "location": clean_text(row.get("company_location", "")),
+        "year_founded": extract_year(row.get("year_founded")),
+        "team_size": safe_int(row.get("team_size")),
+        "website": clean_text(row.get("website", "")),
+        "url": clean_text(row.get("url", "")),
+        "founders": parse_founders(row.get("founders", "[]")),
+        "is_hiring": row.get("is_hiring", "False") == "True",
+        "open_jobs": safe_int(row.get("number_of_open_jobs")),
+        "image": clean_text(row.get("company_image", "")),
+        "category": tags[0] if tags else "Other",
+        "index": "startups",  # For Algolia
+    }
 
 
-def safe_int(value: Any, default=0) -> int:
-    """Safely convert to int."""
-    try:
-        return int(value) if value else default
-    except (ValueError, TypeError):
-        return default
+def _count_quotes(data, start: int, end: int) -> int:
+    # mmap has no count(); slice it in bounded blocks instead
+    total = 0
+    for pos in range(start, end, CSV_CHUNK_BYTES):
+        total += data[pos:min(end, pos + CSV_CHUNK_BYTES)].count(b'"')
+    return total
 
 
-def parse_tags(tags_str: str) -> List[str]:
-    """Parse tag string from YC data."""
-    if not tags_str or tags_str == "[]":
-        return []
-    # Remove brackets and quotes, split by comma
-    tags_str = tags_str.strip("[]'")
-    tags = [t.strip().strip('"').strip("'") for t in tags_str.split(",")]
-    return [t for t in tags if t]
+def find_csv_chunks(data, num_chunks: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """
+    Split raw CSV bytes (or an mmap) into byte ranges that start and end on record boundaries.
+
+    A newline ends a record only when it sits outside a quoted field, i.e. when
+    the number of '"' bytes before it is even (escaped quotes come in pairs and
+    keep the parity). long_description contains quoted newlines, so plain
+    line splitting would cut records in half.
 
+    Returns (header_end, [(start, end), ...]) covering data[header_end:].
+    """
+    def next_boundary(pos: int, parity: int) -> Tuple[int, int]:
+        while True:
+            nl = data.find(b"\n", pos)
+            if nl == -1:
+                return len(data), parity
+            parity += _count_quotes(data, pos, nl)
+            pos = nl + 1
+            if parity % 2 == 0:
+                return pos, parity
+
+    header_end, parity = next_boundary(0, 0)
+    size = len(data)
+    step = max(1, (size - header_end) // max(1, num_chunks))
+
+    chunks = []
+    start = header_end
+    while start < size:
+        target = min(size, start + step)
+        parity += _count_quotes(data, start, target)
+        end, parity = next_boundary(target, parity) if target < size else (size, parity)
+        chunks.append((start, end))
+        start = end
+    return header_end, chunks
+
+
+def _read_csv_chunk(csv_path: Path, fieldnames: List[str], start: int, end: int) -> csv.DictReader:
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        raw = f.read(end - start)
+    # Same universal-newline decoding as open(csv_path, "r")
+    text = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8")
+    return csv.DictReader(text, fieldnames=fieldnames)
+
+
+def _parse_yc_chunk(job: Tuple[Path, List[str], int, int]) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Process-pool worker: build records for one byte range of yc.csv, plus its fallback counts."""
+    csv_path, fieldnames, start, end = job
+    # Workers are reused across chunks, so counts are per chunk
+    FALLBACKS.clear()
+    records = [build_yc_record(row, i) for i, row in enumerate(_read_csv_chunk(csv_path, fieldnames, start, end))]
+    return records, dict(FALLBACKS)
+
+
+def _count_yc_chunk(job: Tuple[Path, List[str], int, int]) -> Dict[str, int]:
+    """Process-pool worker: category counts for one byte range of yc.csv."""
+    csv_path, fieldnames, start, end = job
+    return count_categories_from_rows(_read_csv_chunk(csv_path, fieldnames, start, end))
+
+
+def map_yc_chunks(worker, jobs: int, pool: Optional[Executor] = None) -> Iterator[Tuple[List[str], Any]]:
+    """
+    Run worker over record-aligned chunks of yc.csv in a process pool (pool,
+    or a new one of jobs workers). Results are yielded in file order, so
+    merging them reproduces the single-process output exactly.
+    """
+    csv_path = DATA_DIR / "yc.csv"
+    with open(csv_path, "r", encoding="utf-8") as f:
+        fieldnames = next(csv.reader(f))
+
+    with open(csv_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Several chunks per worker keeps the pool busy when rows vary in size
+            num_chunks = max(jobs * 4, len(data) // CSV_CHUNK_BYTES)
+            _, chunks = find_csv_chunks(data, num_chunks)
+
+    work = [(csv_path, fieldnames, start, end) for start, end in chunks]
+    if pool is not None:
+        for result in pool.map(worker, work):
+            yield fieldnames, result
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for result in pool.map(worker, work):
+            yield fieldnames, result
+
+
+# Column layout of the cached yc.csv snapshot, in record key order
+YC_SNAPSHOT_SCHEMA = [
+    ("objectID", "str"), ("name", "str"), ("description", "str"),
+    ("long_description", "str"), ("batch", "str"), ("status", "str"),
+    ("tags", "str_list"), ("location", "str"), ("year_founded", "int"),
+    ("team_size", "int"), ("website", "str"), ("url", "str"),
+    ("founders", ("dict_list", ("name", "title"))), ("is_hiring", "bool"),
+    ("open_jobs", "int"), ("image", "str"), ("category", "str"), ("index", "str"),
+]
+
+
+def parse_yc_rows(jobs: int = 1, pool: Optional[Executor] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Parse yc.csv from text, yielding (row index, record)."""
+    csv_path = DATA_DIR / "yc.csv"
 
-def extract_year(year_str: str) -> int:
-    """Extract year from various formats."""
-    if not year_str:
-        return None
-    match = re.search(r"\d{4}", str(year_str))
-    return int(match.group()) if match else None
+    if jobs > 1:
+        i = 0
+        for fieldnames, (records, fallbacks) in map_yc_chunks(_parse_yc_chunk, jobs, pool):
+            FALLBACKS.update(fallbacks)
+            for record in records:
+                if "company_id" not in fieldnames:
+                    # Workers only know their chunk-local row index
+                    record["objectID"] = f"yc_{i}"
+                yield i, record
+                i += 1
+        return
 
+    with open(csv_path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for i, row in enumerate(reader):
+            yield i, build_yc_record(row, i)
 
-def parse_founders(founders_str: str) -> List[Dict[str, str]]:
-    """Parse founders JSON string."""
-    if not founders_str or founders_str == "[]":
-        return []
-    try:
-        founders = eval(founders_str) if isinstance(founders_str, str) else founders_str
-        if isinstance(founders, list):
-            return [
-                {
-                    "name": f.get("name", ""),
-                    "title": f.get("title", ""),
-                }
-                for f in founders
-            ]
-    except:
-        pass
-    return []
-
-
-def parse_funding(funding_str: str) -> int:
-    """Parse funding string to integer (in USD)."""
-    if not funding_str:
-        return 0
-    funding_str = str(funding_str).strip()
-
-    # Handle formats like "$655M", "$1.5B", "$30M (est.)", "N/A"
-    funding_str = re.sub(r'\(est\.\)', '', funding_str, flags=re.IGNORECASE)
-    funding_str = funding_str.strip().lower()
-
-    if funding_str in ['n/a', '', '-', '0', '$0']:
-        return 0
-
-    # Extract the pattern
-    match = re.search(r'\$?([\d.]+)([kmb]?)', funding_str, re.IGNORECASE)
-    if not match:
-        return 0
-
-    amount = float(match.group(1))
-    unit = match.group(2).lower() if match.group(2) else ''
-
-    # Convert to actual dollar amount
-    if unit == 'b':
-        return int(amount * 1_000_000_000)
-    elif unit == 'm':
-        return int(amount * 1_000_000)
-    elif unit == 'k':
-        return int(amount * 1_000)
-    else:
-        return int(amount)
-
-
-def extract_years(years_str: str) -> Dict[str, int]:
-    """Extract start and end year from 'Years of Operation' field."""
-    if not years_str:
-        return {"start": None, "end": None, "duration": None}
-
-    # Extract all years from the string
-    years = re.findall(r'\d{4}', str(years_str))
-
-    if len(years) >= 2:
-        return {
-            "start": int(years[0]),
-            "end": int(years[-1]),
-            "duration": int(years[-1]) - int(years[0])
-        }
-    elif len(years) == 1:
-        return {
-            "start": int(years[0]),
-            "end": None,
-            "duration": None
-        }
-    else:
-        return {"start": None, "end": None, "duration": None}
 
+def snapshot_path(csv_path: Path) -> Path:
+    return SNAPSHOT_DIR / f"{csv_path.name}.snap"
 
-def process_yc_data() -> List[Dict[str, Any]]:
+
+def cached_rows(csv_path: Path, schema, parse) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(row, record) pairs from the snapshot of csv_path when it is current, else from parse()."""
+    if not USE_SNAPSHOTS:
+        return parse()
+    return cached_records(csv_path, snapshot_path(csv_path), schema, PARSER_VERSION, parse)
+
+
+def iter_yc_data(jobs: int = 1, pool: Optional[Executor] = None) -> Iterator[Dict[str, Any]]:
+    """Stream YC startup records one CSV row at a time."""
+    rows = cached_rows(DATA_DIR / "yc.csv", YC_SNAPSHOT_SCHEMA, lambda: parse_yc_rows(jobs, pool))
+    for _, record in rows:
+        yield record
+
+
+def process_yc_data(jobs: int = 1, pool: Optional[Executor] = None) -> List[Dict[str, Any]]:
     """Process YC startups CSV data."""
-    startups = []
+    records = iter_yc_data(jobs, pool)
+    startups = list(map(StartupRecord, records) if COMPACT_RECORDS else records)
+    print(f"Processed {len(startups)} YC startups")
+    return startups
+
+
+def count_categories_from_rows(rows: Iterable[Dict[str, str]]) -> Dict[str, int]:
+    category_counts: Dict[str, int] = {}
+    for row in rows:
+        tags = parse_tags(row.get("tags", "[]"))
+        cat = tags[0] if tags else "Other"
+        category_counts[cat] = category_counts.get(cat, 0) + 1
+    return category_counts
+
+
+def count_yc_categories(jobs: int = 1, pool: Optional[Executor] = None) -> Dict[str, int]:
+    """
+    Count startups per category straight from yc.csv.
+    Only the tags column is parsed, so the streaming mode can learn the
+    saturation inputs before it builds any full record.
+    """
     csv_path = DATA_DIR / "yc.csv"
+    snapshot = load_snapshot(snapshot_path(csv_path), csv_path, PARSER_VERSION) if USE_SNAPSHOTS else None
+    if snapshot is not None:
+        try:
+            category_counts: Dict[str, int] = {}
+            for cat in snapshot.iter_column("category"):
+                category_counts[cat] = category_counts.get(cat, 0) + 1
+            return category_counts
+        finally:
+            snapshot.close()
+
+    if jobs > 1:
+        category_counts: Dict[str, int] = {}
+        for _, chunk_counts in map_yc_chunks(_count_yc_chunk, jobs, pool):
+            for cat, count in chunk_counts.items():
+                category_counts[cat] = category_counts.get(cat, 0) + count
+        return category_counts
+
+    with open(DATA_DIR / "yc.csv", "r", encoding="utf-8") as f:
+        return count_categories_from_rows(csv.DictReader(f))
+
+
+# Sector used when a row of a categorized fail file has none. Files listed
+# here come first, in this order; any other Fails/*.csv follows, sorted by
+# name, with its sector taken from the file name (sector_from_filename)
+FAIL_CATEGORY_FILES = {
+    "Startup Failure (Health Care).csv": "Health Care",
+    "Startup Failure (Retail Trade).csv": "Retail Trade",
+    "Startup Failure (Finance and Insurance).csv": "Finance and Insurance",
+    "Startup Failure (Manufactures).csv": "Manufacturing",
+    "Startup Failures (Information Sector).csv": "Information Technology",
+    "Startup Failure (Food and services).csv": "Food & Services",
+}
+# The main fail file: simple columns only, parsed after every categorized file
+MAIN_FAIL_FILE = "Startup Failures.csv"
+# "Startup Failure (Health Care).csv" -> "Health Care"
+FAIL_FILENAME_SECTOR_RE = re.compile(r"\(([^)]+)\)")
+
+
+def sector_from_filename(filename: str) -> str:
+    """Default sector of a fail file not in FAIL_CATEGORY_FILES: its parenthesized part, or its stem."""
+    match = FAIL_FILENAME_SECTOR_RE.search(filename)
+    return clean_text(match.group(1) if match else Path(filename).stem) or "Unknown"
+
+
+def slugify(text: str) -> str:
+    """Lowercase ASCII slug used to build stable objectIDs."""
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+def fail_object_id(prefix: str, name: str, used_ids: set) -> str:
+    """
+    Stable graveyard objectID derived from the company name, so a record keeps
+    its ID when rows are added or reordered in the source CSV.
+    Names that slugify identically get a short hash of the raw name appended.
+    """
+    object_id = f"{prefix}_{slugify(name)}"
+    if object_id in used_ids:
+        object_id += "_" + hashlib.sha1(name.encode("utf-8")).hexdigest()[:6]
+    used_ids.add(object_id)
+    return object_id
+
+
+# Failure flag field -> CSV column
+FAIL_FLAG_COLUMNS = [
+    ("lost_to_giants", "Giants"),
+    ("no_budget", "No Budget"),
+    ("competition", "Competition"),
+    ("poor_market_fit", "Poor Market Fit"),
+    ("acquisition_stagnation", "Acquisition Stagnation"),
+    ("high_operational_costs", "High Operational Costs"),
+    ("platform_dependency", "Platform Dependency"),
+    ("monetization_failure", "Monetization Failure"),
+    ("niche_limits", "Niche Limits"),
+    ("execution_flaws", "Execution Flaws"),
+    ("trend_shifts", "Trend Shifts"),
+    ("toxicity_trust_issues", "Toxicity/Trust Issues"),
+    ("regulatory_pressure", "Regulatory Pressure"),
+    ("overhype", "Overhype"),
+]
+
+# Column layouts of the cached fail CSV snapshots, in record key order
+_FAIL_BASE_SCHEMA = [
+    ("objectID", "str"), ("name", "str"), ("sector", "str"), ("category", "str"),
+    ("years_of_operation", "str"), ("what_they_did", "str"), ("how_much_raised", "str"),
+    ("raised_amount", "int"), ("why_they_failed", "str"), ("takeaway", "str"),
+    ("year_founded", "int"), ("year_closed", "int"), ("operating_years", "int"),
+]
+FAIL_SNAPSHOT_SCHEMA = _FAIL_BASE_SCHEMA + [(field, "bool") for field, _ in FAIL_FLAG_COLUMNS] + [("index", "str")]
+MAIN_FAIL_SNAPSHOT_SCHEMA = _FAIL_BASE_SCHEMA + [
+    ("lost_to_giants", "bool"), ("competition", "bool"), ("poor_market_fit", "bool"), ("index", "str"),
+]
+
+# In-memory record layouts (compact_records.py): the snapshot columns, plus
+# the fields later stages add
+StartupRecord = record_class(
+    "StartupRecord",
+    [name for name, _ in YC_SNAPSHOT_SCHEMA],
+    added_fields=[
+        "cluster_size", "competitor_density", "tag_density", "tag_combo_density", "tag_growth", "survival_score", "survival_breakdown", "saturation",
+        "graveyard_id", "similar_ids", "similar_scores", "parent_id",
+    ],
+    interned=["batch", "status", "location", "category", "index", "saturation"],
+)
+_FAIL_ADDED_FIELDS = ["yc_object_id", "similar_ids", "similar_scores"]
+_FAIL_INTERNED = ["sector", "category", "years_of_operation", "how_much_raised", "index"]
+FAIL_RECORD_CLASSES = {
+    cls.FIELDS: cls
+    for cls in (
+        record_class(
+            "FailRecord", [name for name, _ in FAIL_SNAPSHOT_SCHEMA], _FAIL_ADDED_FIELDS,
+            flags=[field for field, _ in FAIL_FLAG_COLUMNS], interned=_FAIL_INTERNED,
+        ),
+        record_class(
+            "MainFailRecord", [name for name, _ in MAIN_FAIL_SNAPSHOT_SCHEMA], _FAIL_ADDED_FIELDS,
+            flags=["lost_to_giants", "competition", "poor_market_fit"], interned=_FAIL_INTERNED,
+        ),
+    )
+}
+
+
+def build_fail_record(row: Dict[str, str], default_category: str, name: str) -> Dict[str, Any]:
+    """Map one categorized fail CSV row to a graveyard record."""
+    # Extract years information
+    years_info = extract_years(row.get("Years of Operation") or row.get("Years") or "")
+
+    # Parse all the rich fields!
+    return {
+        "objectID": "",  # assigned once the row survives dedupe
+        "name": name,
+
+        # Basic info
+        "sector": clean_text(row.get("Sector") or default_category),
+        "category": clean_text(row.get("Sector") or default_category),
+        "years_of_operation": clean_text(row.get("Years of Operation") or row.get("Years") or ""),
+
+        # The RICH data!
+        "what_they_did": clean_text(row.get("What They Did") or ""),
+        "how_much_raised": clean_text(row.get("How Much They Raised") or "N/A"),
+        "raised_amount": parse_funding(row.get("How Much They Raised") or "0"),
+        "why_they_failed": clean_text(row.get("Why They Failed") or ""),
+        "takeaway": clean_text(row.get("Takeaway") or ""),
+
+        # Years data
+        "year_founded": years_info["start"],
+        "year_closed": years_info["end"],
+        "operating_years": years_info["duration"],
+
+        # Failure flags (useful for filtering/analysis)
+        **{field: safe_int(row.get(column, 0)) == 1 for field, column in FAIL_FLAG_COLUMNS},
+
+        # Index identifier
+        "index": "graveyard",
+    }
 
-    with open(csv_path, "r", encoding="utf-8") as f:
+
+def build_main_fail_record(row: Dict[str, str], name: str) -> Dict[str, Any]:
+    """Map one row of the main Startup Failures.csv (simple columns only)."""
+    years_info = extract_years(row.get("Years of Operation", ""))
+
+    return {
+        "objectID": "",  # assigned once the row survives dedupe
+        "name": name,
+        "sector": clean_text(row.get("Sector", "Unknown")),
+        "category": clean_text(row.get("Sector", "Unknown")),
+        "years_of_operation": clean_text(row.get("Years of Operation", "")),
+        "what_they_did": "",
+        "how_much_raised": "N/A",
+        "raised_amount": 0,
+        "why_they_failed": "",
+        "takeaway": "",
+        "year_founded": years_info["start"],
+        "year_closed": years_info["end"],
+        "operating_years": years_info["duration"],
+        "lost_to_giants": False,
+        "competition": False,
+        "poor_market_fit": False,
+        "index": "graveyard",
+    }
+
+
+def parse_fail_file(file_path: Path, default_category: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(row index, record) for every named row of a categorized fail CSV."""
+    with open(file_path, "r", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for i, row in enumerate(reader):
-            # Extract relevant fields for Algolia
-            startup = {
-                "objectID": f"yc_{row.get('company_id', i)}",
-                "name": clean_text(row.get("company_name", "")),
-                "description": clean_text(row.get("short_description", "")),
-                "long_description": clean_text(row.get("long_description", "")),
-                "batch": clean_text(row.get("batch", "")),
-                "status": clean_text(row.get("status", "Active")),
-                "tags": parse_tags(row.get("tags", "[]")),
-                "location": clean_text(row.get("company_location", "")),
-                "year_founded": extract_year(row.get("year_founded")),
-                "team_size": safe_int(row.get("team_size")),
-                "website": clean_text(row.get("website", "")),
-                "url": clean_text(row.get("url", "")),
-                "founders": parse_founders(row.get("founders", "[]")),
-                "is_hiring": row.get("is_hiring", "False") == "True",
-                "open_jobs": safe_int(row.get("number_of_open_jobs")),
-                "image": clean_text(row.get("company_image", "")),
-                "category": parse_tags(row.get("tags", "[]"))[0] if parse_tags(row.get("tags", "[]")) else "Other",
-                "index": "startups",  # For Algolia
-            }
-            startups.append(startup)
+            # Get name with fallbacks
+            name = clean_text(row.get("Name") or row.get("Company") or row.get("Startup") or "")
+            if name:
+                yield i, build_fail_record(row, default_category, name)
 
-    print(f"Processed {len(startups)} YC startups")
-    return startups
+
+def parse_main_fail_file(file_path: Path) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """(row index, record) for every named row of the main Startup Failures.csv."""
+    with open(file_path, "r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for i, row in enumerate(reader):
+            name = clean_text(row.get("Name", ""))
+            if name:
+                yield i, build_main_fail_record(row, name)
 
 
-def process_fails_data() -> List[Dict[str, Any]]:
-    """Process failed startups CSV data with full field mapping."""
-    fails = []
-
-    # Process categorized fail files (these have the rich data!)
-    category_files = [
-        ("Startup Failure (Health Care).csv", "Health Care"),
-        ("Startup Failure (Retail Trade).csv", "Retail Trade"),
-        ("Startup Failure (Finance and Insurance).csv", "Finance and Insurance"),
-        ("Startup Failure (Manufactures).csv", "Manufacturing"),
-        ("Startup Failures (Information Sector).csv", "Information Technology"),
-        ("Startup Failure (Food and services).csv", "Food & Services"),
-    ]
-
-    for filename, default_category in category_files:
+# (path, default sector or None for the main Startup Failures.csv, snapshot path or None)
+FailJob = Tuple[Path, Optional[str], Optional[Path]]
+
+
+def fail_sources() -> List[Tuple[str, str, FailJob]]:
+    """
+    (file name, objectID prefix, parse job) per fail CSV, in priority order.
+    Categorized files come first, so their rich rows win over the simple
+    rows of the main Startup Failures.csv.
+    """
+    sources = []
+    discovered = {path.name for path in FAILS_DIR.glob("*.csv")} - {MAIN_FAIL_FILE}
+    listed = [name for name in FAIL_CATEGORY_FILES if name in discovered]
+    for filename in listed + sorted(discovered - set(listed)):
         file_path = FAILS_DIR / filename
-        if not file_path.exists():
-            continue
-
-        with open(file_path, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader):
-                # Get name with fallbacks
-                name = clean_text(row.get("Name") or row.get("Company") or row.get("Startup") or "")
-                if not name:
-                    continue
-
-                # Extract years information
-                years_info = extract_years(row.get("Years of Operation") or row.get("Years") or "")
-
-                # Parse all the rich fields!
-                fail = {
-                    "objectID": f"fail_{default_category.replace(' ', '_').replace('&', 'and')}_{i}",
-                    "name": name,
-
-                    # Basic info
-                    "sector": clean_text(row.get("Sector") or default_category),
-                    "category": clean_text(row.get("Sector") or default_category),
-                    "years_of_operation": clean_text(row.get("Years of Operation") or row.get("Years") or ""),
-
-                    # The RICH data!
-                    "what_they_did": clean_text(row.get("What They Did") or ""),
-                    "how_much_raised": clean_text(row.get("How Much They Raised") or "N/A"),
-                    "raised_amount": parse_funding(row.get("How Much They Raised") or "0"),
-                    "why_they_failed": clean_text(row.get("Why They Failed") or ""),
-                    "takeaway": clean_text(row.get("Takeaway") or ""),
-
-                    # Years data
-                    "year_founded": years_info["start"],
-                    "year_closed": years_info["end"],
-                    "operating_years": years_info["duration"],
-
-                    # Failure flags (useful for filtering/analysis)
-                    "lost_to_giants": safe_int(row.get("Giants", 0)) == 1,
-                    "no_budget": safe_int(row.get("No Budget", 0)) == 1,
-                    "competition": safe_int(row.get("Competition", 0)) == 1,
-                    "poor_market_fit": safe_int(row.get("Poor Market Fit", 0)) == 1,
-                    "acquisition_stagnation": safe_int(row.get("Acquisition Stagnation", 0)) == 1,
-                    "high_operational_costs": safe_int(row.get("High Operational Costs", 0)) == 1,
-                    "platform_dependency": safe_int(row.get("Platform Dependency", 0)) == 1,
-                    "monetization_failure": safe_int(row.get("Monetization Failure", 0)) == 1,
-                    "niche_limits": safe_int(row.get("Niche Limits", 0)) == 1,
-                    "execution_flaws": safe_int(row.get("Execution Flaws", 0)) == 1,
-                    "trend_shifts": safe_int(row.get("Trend Shifts", 0)) == 1,
-                    "toxicity_trust_issues": safe_int(row.get("Toxicity/Trust Issues", 0)) == 1,
-                    "regulatory_pressure": safe_int(row.get("Regulatory Pressure", 0)) == 1,
-                    "overhype": safe_int(row.get("Overhype", 0)) == 1,
-
-                    # Index identifier
-                    "index": "graveyard",
-                }
-                fails.append(fail)
+        default_category = FAIL_CATEGORY_FILES.get(filename) or sector_from_filename(filename)
+        prefix = f"fail_{default_category.replace(' ', '_').replace('&', 'and')}"
+        sources.append((filename, prefix, (file_path, default_category, snapshot_path(file_path) if USE_SNAPSHOTS else None)))
 
     # Also process main Startup Failures.csv (simple columns only)
-    main_fails = FAILS_DIR / "Startup Failures.csv"
+    main_fails = FAILS_DIR / MAIN_FAIL_FILE
     if main_fails.exists():
-        with open(main_fails, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for i, row in enumerate(reader):
-                name = clean_text(row.get("Name", ""))
-                if not name:
-                    continue
-
-                years_info = extract_years(row.get("Years of Operation", ""))
-
-                fail = {
-                    "objectID": f"fail_main_{i}",
-                    "name": name,
-                    "sector": clean_text(row.get("Sector", "Unknown")),
-                    "category": clean_text(row.get("Sector", "Unknown")),
-                    "years_of_operation": clean_text(row.get("Years of Operation", "")),
-                    "what_they_did": "",
-                    "how_much_raised": "N/A",
-                    "raised_amount": 0,
-                    "why_they_failed": "",
-                    "takeaway": "",
-                    "year_founded": years_info["start"],
-                    "year_closed": years_info["end"],
-                    "operating_years": years_info["duration"],
-                    "lost_to_giants": False,
-                    "competition": False,
-                    "poor_market_fit": False,
-                    "index": "graveyard",
-                }
-
-                # Only add if not already in fails (by name)
-                if not any(f["name"].lower() == name.lower() for f in fails):
-                    fails.append(fail)
-
-    # Remove duplicates by name
-    seen = set()
-    unique_fails = []
-    for fail in fails:
-        key = fail["name"].lower()
-        if key not in seen:
-            seen.add(key)
-            unique_fails.append(fail)
-
-    print(f"Processed {len(unique_fails)} failed startups")
+        sources.append((main_fails.name, "fail_main", (main_fails, None, snapshot_path(main_fails) if USE_SNAPSHOTS else None)))
+    return sources
+
+
+def parse_fail_source(job: FailJob) -> Tuple[List[Tuple[int, Dict[str, Any]]], bool, Dict[str, int]]:
+    """
+    (row index, record) pairs of one fail CSV, whether they came from its
+    snapshot, and the fields that fell back to defaults. Every file is cached
+    on its own fingerprint, so a changed file only costs its own parse.
+    Runs inline or in a pool worker.
+    """
+    file_path, default_category, snap = job
+    if default_category is None:
+        schema, parse = MAIN_FAIL_SNAPSHOT_SCHEMA, lambda: parse_main_fail_file(file_path)
+    else:
+        schema, parse = FAIL_SNAPSHOT_SCHEMA, lambda: parse_fail_file(file_path, default_category)
+
+    snapshot = load_snapshot(snap, file_path, PARSER_VERSION) if snap is not None else None
+    if snapshot is not None:
+        try:
+            return list(snapshot.iter_records()), True, {}
+        finally:
+            snapshot.close()
+
+    # Counts are handed back rather than left in FALLBACKS, so the caller
+    # merges them the same way whether this ran inline or in a reused worker
+    saved = FALLBACKS.copy()
+    FALLBACKS.clear()
+    try:
+        rows = parse() if snap is None else cached_records(file_path, snap, schema, PARSER_VERSION, parse)
+        return list(rows), False, dict(FALLBACKS)
+    finally:
+        FALLBACKS.clear()
+        FALLBACKS.update(saved)
+
+
+ParsedFails = List[Tuple[str, str, List[Tuple[int, Dict[str, Any]]]]]
+
+
+def collect_fail_sources(
+    sources: List[Tuple[str, str, FailJob]], results: Iterable[Tuple[List, bool, Dict[str, int]]]
+) -> Tuple[ParsedFails, int]:
+    """Pair parse_fail_source results with their sources; returns them and how many came from snapshots."""
+    parsed: ParsedFails = []
+    cached = 0
+    for (source, prefix, _), (rows, from_snapshot, fallbacks) in zip(sources, results):
+        FALLBACKS.update(fallbacks)
+        cached += from_snapshot
+        parsed.append((source, prefix, rows))
+    return parsed, cached
+
+
+def parse_fail_sources(pool: Optional[Executor] = None) -> Tuple[ParsedFails, int]:
+    """Parse every fail CSV, concurrently when a process pool is given."""
+    sources = fail_sources()
+    jobs = [job for _, _, job in sources]
+    results = pool.map(parse_fail_source, jobs) if pool is not None else map(parse_fail_source, jobs)
+    return collect_fail_sources(sources, results)
+
+
+def iter_fails_data(entities: EntityIndex = None, parsed: ParsedFails = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream graveyard records, skipping companies already emitted. Rows that
+    resolve to an existing company are recorded in entities.merges; kept rows
+    whose name is close to an existing one in entities.near_misses.
+    parsed is parse_fail_sources()' output; the files are parsed here when
+    it is None.
+    """
+    if entities is None:
+        entities = EntityIndex()
+    if parsed is None:
+        parsed, _ = parse_fail_sources()
+    used_ids = set()
+
+    def claim(name: str, source: str) -> bool:
+        key, how = entities.resolve(name)
+        if key is not None:
+            entities.record_merge(name, source, key, how)
+            return False
+        similar = entities.near_miss(name)
+        if similar is not None:
+            entities.record_near_miss(name, source, similar)
+        return True
+
+    for source, prefix, rows in parsed:
+        for i, record in rows:
+            name = record["name"]
+            if not claim(name, f"{source} row {i + 1}"):
+                continue
+            record["objectID"] = fail_object_id(prefix, name, used_ids)
+            entities.add(name, record["objectID"])
+            yield record
+
+
+def process_fails_data(entities: EntityIndex = None, parsed: ParsedFails = None) -> List[Dict[str, Any]]:
+    """Process failed startups CSV data with full field mapping."""
+    if entities is None:
+        entities = EntityIndex()
+    records = iter_fails_data(entities, parsed)
+    if COMPACT_RECORDS:
+        records = (FAIL_RECORD_CLASSES[tuple(record)](record) for record in records)
+    unique_fails = list(records)
+    print(f"Processed {len(unique_fails)} failed startups ({len(entities.merges)} duplicate rows merged)")
+    if entities.near_misses:
+        print(f"   {len(entities.near_misses)} kept with a name close to another's (near_misses in {MERGE_REPORT_PATH.name})")
+    save_merge_report(entities.merges, entities.near_misses)
     return unique_fails
 
 
-def get_category_saturation(category: str, category_counts: Dict[str, int]) -> str:
+def save_merge_report(merges: List[Dict[str, Any]], near_misses: List[Dict[str, Any]] = ()):
     """
-    Determine market saturation level based on category count.
-    More startups in category = higher saturation.
+    Which source rows were folded into which graveyard record, and which
+    were kept although their name is close to an earlier record's.
     """
-    count = category_counts.get(category, 0)
+    with open(MERGE_REPORT_PATH, "w", encoding="utf-8") as f:
+        json.dump({"merges": merges, "near_misses": list(near_misses)}, f, indent=2, ensure_ascii=False)
 
-    # Saturation thresholds based on our dataset
-    if count >= 300:
-        return "High"  # Saturated markets
-    elif count >= 100:
-        return "Medium"  # Moderate competition
-    else:
-        return "Low"  # Emerging markets
+
+def competitor_saturation(startup: Dict) -> str:
+    """Saturation from the startup's near-duplicate competitors (find_competitors)."""
+    return get_competitor_saturation(startup.get("competitor_density", 0))
+
+
+def score_startup(startup: Dict, category_counts: Dict[str, int], saturation_source: str = "category") -> Dict:
+    """Add survival_score, survival_breakdown and saturation to one startup."""
+    saturation = competitor_saturation(startup) if saturation_source == "competitors" else None
+    return DEFAULT_SCORER.score_record(startup, category_counts, saturation)
 
 
-def enhance_with_insights(startups: List[Dict]) -> List[Dict]:
+def iter_enhanced(
+    startups: Iterable[Dict], category_counts: Dict[str, int], saturation_source: str = "category"
+) -> Iterator[Dict]:
+    """Per-record scoring stage for the streaming pipeline."""
+    for startup in startups:
+        yield score_startup(startup, category_counts, saturation_source)
+
+
+def enhance_with_insights(startups: List[Dict], saturation_source: str = "category") -> List[Dict]:
     """
     Calculate survival scores using realistic baselines and available signals.
 
@@ -319,236 +701,921 @@ def enhance_with_insights(startups: List[Dict]) -> List[Dict]:
     - Category performance trends
     - Growth signals (hiring, team size, open jobs)
     - Batch era (older batches have more proven track record)
-    - Market saturation analysis
+    - Market saturation analysis, from category size or, with
+      saturation_source="competitors", from competitor clusters
     """
+    # Scoring runs over columns; category counts for saturation come from them too
+    columns = ScoringColumns(startups)
+    category_counts = columns.category_counts()
+    write_category_counts(CATEGORY_COUNTS_PATH, category_counts, saturation_source)
+    saturations = [competitor_saturation(s) for s in startups] if saturation_source == "competitors" else None
+    return DEFAULT_SCORER.score_columns(columns, category_counts, saturations).apply(startups)
 
-    # Realistic base success rates by batch era (from YC historical data)
-    # Format: (start_year, end_year): base_success_rate
-    batch_success_rates = {
-        (2005, 2009): 0.25,  # Early batches (W01-W09): proven winners, 25%
-        (2010, 2013): 0.30,  # Golden era (W10-W13): 30%
-        (2014, 2017): 0.22,  # Growth phase (W14-W17): 22%
-        (2018, 2020): 0.18,  # Late cycle (W18-W20): 18%
-        (2021, 2024): 0.12,  # COVID era (W21-W24): too early to tell, 12%
-    }
 
-    # First, count categories for saturation analysis
-    category_counts: Dict[str, int] = {}
-    for s in startups:
-        cat = s.get("category", "Other")
-        category_counts[cat] = category_counts.get(cat, 0) + 1
+def write_ndjson(records: Iterable[Dict], path: Path) -> int:
+    """Write records one per line as they arrive. Returns the record count."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=json_default))
+            f.write("\n")
+            count += 1
+    return count
 
-    # Category multipliers based on market conditions
-    category_multipliers = {
-        # Hot categories
-        "AI/ML": 1.25,
-        "Artificial Intelligence": 1.25,
-        "Fintech": 1.15,
-        "Climate Tech": 1.20,
-        "Biotech": 1.10,
-        "Defense": 1.15,
-
-        # Solid categories
-        "SaaS": 1.10,
-        "B2B": 1.10,
-        "Developer Tools": 1.12,
-        "Infrastructure": 1.10,
-        "Healthcare": 1.05,
-
-        # Challenging categories
-        "Consumer": 0.90,
-        "E-commerce": 0.85,
-        "Marketplace": 0.80,
-        "Social Media": 0.75,
-        "Food Delivery": 0.80,
-        "Transportation": 0.85,
-
-        # Default
-        "Other": 1.0,
-    }
 
-    # Category trend scores (5 = emerging, 1 = saturated)
-    category_trends = {
-        "AI": 5, "Artificial Intelligence": 5, "Machine Learning": 5, "ML": 5,
-        "Generative AI": 5, "LLM": 5,
-        "Climate Tech": 4, "Climate": 4, "Biotech": 4, "Biology": 4,
-        "Web3": 3, "Crypto": 2, "Blockchain": 2,
-        "SaaS": 3, "B2B": 3, "Developer Tools": 4, "Infrastructure": 3,
-        "Fintech": 3, "Finance": 3, "Payments": 3,
-        "E-commerce": 2, "Healthcare": 3, "Health": 3, "Medical": 3,
-        "Social": 1, "Social Media": 1, "Marketplace": 1, "Marketplaces": 1,
-        "Consumer": 2, "Food": 1, "Food Delivery": 1, "Transportation": 1,
-        "Mobility": 1, "Gig": 1, "On-demand": 1,
-    }
+def record_hash(record: Dict) -> str:
+    """Content hash of a record, independent of key order."""
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, default=json_default)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
 
-    for startup in startups:
-        status = startup.get("status", "Active")
-        batch = startup.get("batch", "")
-        category = startup.get("category", "Other")
-        is_hiring = startup.get("is_hiring", False)
-        open_jobs = startup.get("open_jobs", 0)
-        team_size = startup.get("team_size", 0)
-
-        # Extract batch year
-        batch_year = 2020  # Default to recent
-        if batch:
-            match = re.search(r"W(\d+)", batch, re.IGNORECASE)
-            if match:
-                batch_year = 2005 + int(match.group(1))
-
-        # Get base success rate from batch era
-        base_rate = 0.15  # Default 15%
-        for (start, end), rate in batch_success_rates.items():
-            if start <= batch_year <= end:
-                base_rate = rate
-                break
-
-        # Get category multiplier
-        category_mult = category_multipliers.get(category, category_multipliers.get("Other", 1.0))
-
-        # Growth signals boost (actively growing companies are healthier)
-        growth_boost = 0
-        if is_hiring:
-            growth_boost += 0.05  # +5% for hiring
-        if open_jobs > 10:
-            growth_boost += 0.04  # +4% for lots of open jobs
-        elif open_jobs > 3:
-            growth_boost += 0.02  # +2% for some open jobs
-
-        if team_size > 20:
-            growth_boost += 0.03  # +3% for larger team
-        elif team_size > 5:
-            growth_boost += 0.015  # +1.5% for moderate team
-
-        # Solo founder penalty (statistically harder)
-        if team_size == 1:
-            base_rate *= 0.85  # -15% for solo founders
-
-        # Calculate final score
-        if status == "Active":
-            # Base rate * category multiplier + growth boost
-            raw_score = (base_rate * category_mult) + growth_boost
-
-            # Convert to percentage and clamp
-            score = int(raw_score * 100)
-            base_survival = min(85, max(5, score))
 
-        else:
-            # Inactive/exited companies
-            # Give them moderate score (may have exited successfully)
-            base_survival = 40
-
-        # ===== MULTI-FACTOR SURVIVAL BREAKDOWN =====
-        # Growth Score (35%): Based on calculated survival_score
-        growth_score = int(base_survival * 0.35)
-
-        # Market Score (25%): Saturation penalty + trend bonus
-        saturation = get_category_saturation(category, category_counts)
-        saturation_penalty = {"High": -15, "Medium": -5, "Low": 0}.get(saturation, -2)
-
-        # Category trend score (5 = emerging, 1 = saturated)
-        trend_score_raw = category_trends.get(category, 2)
-        for key, val in category_trends.items():
-            if key.lower() in category.lower():
-                trend_score_raw = val
-                break
-        trend_bonus = (trend_score_raw - 2.5) * 4  # -10 to +10
-        market_score = int(max(0, min(25, 25 + saturation_penalty + trend_bonus)))
-
-        # Team Score (20%): YC batch = proven team
-        team_score = 20 if batch else 5
-
-        # Funding Score (15%): Hiring status and YC participation
-        if is_hiring:
-            funding_score = int(15 * 0.85)  # 13
-        elif batch:
-            funding_score = int(15 * 0.60)  # 9
-        elif team_size and team_size > 10:
-            funding_score = int(15 * 0.50)  # 8
-        else:
-            funding_score = int(15 * 0.25)  # 4
-
-        # Trend Score (5%): Category hype cycle
-        trend_score = int((trend_score_raw / 5) * 100)
-
-        # Total survival score (clamped to 0-100)
-        total_survival = max(0, min(100,
-            growth_score + market_score + team_score + funding_score + (trend_score_raw / 5 * 5)
-        ))
-
-        # Store survival score and breakdown
-        startup["survival_score"] = int(total_survival)
-        startup["survival_breakdown"] = {
-            "total": int(total_survival),
-            "growth": int((growth_score / 0.35) if growth_score > 0 else base_survival),
-            "market": int((market_score / 25) * 100),
-            "team": 100 if batch else 25,
-            "funding": int((funding_score / 15) * 100),
-            "trend": trend_score,
-            "penalty": 0
-        }
-
-        # Add market saturation field
-        startup["saturation"] = saturation
+def load_manifest() -> Dict[str, Dict[str, str]]:
+    """objectID -> content hash per index, as of the last successful upload."""
+    if not MANIFEST_PATH.exists():
+        return {}
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
 
-    return startups
 
+def save_pending_manifest(manifest: Dict[str, Dict[str, str]]):
+    """
+    Record this run's output as the pending manifest. It only replaces
+    MANIFEST_PATH once an upload succeeds (commit_manifest, or
+    upload-to-algolia.js), so until then every run's delta is taken against
+    what the indices actually hold.
+    """
+    with open(PENDING_MANIFEST_PATH, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
 
-def main():
-    print("🔥 Processing Startup Roast datasets...\n")
 
-    # Process YC startups
-    print("📊 Processing YC startups...")
-    startups = process_yc_data()
-    startups = enhance_with_insights(startups)
+def commit_manifest():
+    """After a successful upload: the pending manifest is what the indices now hold."""
+    if PENDING_MANIFEST_PATH.exists():
+        os.replace(PENDING_MANIFEST_PATH, MANIFEST_PATH)
+
 
-    # Save startups
-    startups_path = OUTPUT_DIR / "startups.json"
-    with open(startups_path, "w", encoding="utf-8") as f:
-        json.dump(startups, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved {len(startups)} startups to {startups_path}")
+class JsonArrayWriter:
+    """A JSON array written one element per line as elements arrive."""
 
-    # Process failed startups
-    print("\n💀 Processing failed startups...")
-    fails = process_fails_data()
+    def __init__(self, path: Path):
+        self.f = open(path, "w", encoding="utf-8")
+        self.count = 0
 
-    # Save fails
-    fails_path = OUTPUT_DIR / "graveyard.json"
-    with open(fails_path, "w", encoding="utf-8") as f:
-        json.dump(fails, f, indent=2, ensure_ascii=False)
-    print(f"✅ Saved {len(fails)} failed startups to {fails_path}")
+    def write(self, item: Any):
+        self.f.write(",\n" if self.count else "[\n")
+        self.f.write(json.dumps(item, ensure_ascii=False, default=json_default))
+        self.count += 1
 
-    # Stats
+    def close(self):
+        self.f.write("\n]\n" if self.count else "[]\n")
+        self.f.close()
+
+
+class DeltaTracker:
+    """
+    Compares records against the last uploaded manifest as they stream past.
+    Added/updated records go straight to their delta files; everything is
+    reduced to its hash for the pending manifest.
+    """
+
+    def __init__(self, index_name: str, previous: Dict[str, str]):
+        self.index_name = index_name
+        self.previous = previous
+        self.hashes: Dict[str, str] = {}
+        self.added: Optional[JsonArrayWriter] = None
+        self.updated: Optional[JsonArrayWriter] = None
+
+    def _open(self):
+        DELTA_DIR.mkdir(exist_ok=True)
+        self.added = JsonArrayWriter(DELTA_DIR / f"{self.index_name}.added.json")
+        self.updated = JsonArrayWriter(DELTA_DIR / f"{self.index_name}.updated.json")
+
+    def track(self, records: Iterable[Dict]) -> Iterator[Dict]:
+        if self.added is None:
+            self._open()
+        for record in records:
+            object_id = record["objectID"]
+            if object_id in self.hashes:
+                # yc.csv repeats some company_ids; the first copy is the one diffed
+                yield record
+                continue
+            digest = record_hash(record)
+            self.hashes[object_id] = digest
+            old = self.previous.get(object_id)
+            if old is None:
+                self.added.write(record)
+            elif old != digest:
+                self.updated.write(record)
+            yield record
+
+    @property
+    def deleted(self) -> List[str]:
+        return sorted(set(self.previous) - set(self.hashes))
+
+    def write(self):
+        """Finish <index>.added.json and <index>.updated.json and write <index>.deleted.json."""
+        if self.added is None:
+            self._open()
+        self.added.close()
+        self.updated.close()
+        deleted = self.deleted
+        with open(DELTA_DIR / f"{self.index_name}.deleted.json", "w", encoding="utf-8") as f:
+            json.dump(deleted, f, indent=2, ensure_ascii=False)
+        print(
+            f"🔁 {self.index_name} delta: +{self.added.count} added, "
+            f"~{self.updated.count} updated, -{len(deleted)} deleted"
+        )
+
+
+def new_facet_cube() -> FacetCube:
+    return FacetCube([field for field, _ in FAIL_FLAG_COLUMNS])
+
+
+def write_facets(cube: FacetCube):
+    """Write facets.json and its objectID sidecar (and the app's static copy), as a metrics stage."""
+    with METRICS.stage("write_facets") as stage:
+        size = cube.write(FACETS_PATH, FACET_KEYS_PATH)
+        if PUBLIC_FACETS_PATH is not None:
+            shutil.copyfile(FACETS_PATH, PUBLIC_FACETS_PATH)
+        stage.rows_in = cube.total("startups") + cube.total("graveyard")
+        stage.rows_out = sum(len(cells) for cells in cube.cells.values())
+        stage.extra["bytes_out"] = size
+    print(f"🧊 Wrote {stage.rows_out} facet cells ({size / 1024:.1f} KB) to {FACETS_PATH}")
+
+
+def new_record_budget(budget: int) -> RecordBudget:
+    """A RecordBudget for the startups index, writing LEAN_PATH."""
+    facets = load_index_settings()["startups"].get("attributesForFaceting", [])
+    return RecordBudget(budget, facets, LEAN_PATH)
+
+
+def print_budget(budget: RecordBudget):
+    stats = budget.stats
+    print(
+        f"✂️  {stats['split']} startups over {stats['budget']:,} B split into {stats['children']} paragraph records "
+        f"({stats['bytes_in'] / 1e6:.2f} -> {stats['bytes_out'] / 1e6:.2f} MB, largest {stats['max_bytes_out']:,} B)"
+    )
+    if stats["over_budget"]:
+        print(f"⚠️  {stats['over_budget']} records are still over budget without their long_description")
+    print(f"🪶 Wrote lean projections to {budget.lean_path}")
+
+
+def print_stats(num_startups: int, num_fails: int, cube: FacetCube):
     print("\n📈 Dataset Statistics:")
-    print(f"   Active Startups: {len(startups)}")
-    print(f"   Failed Startups: {len(fails)}")
+    print(f"   Active Startups: {num_startups}")
+    print(f"   Failed Startups: {num_fails}")
 
     # Category breakdown for startups
-    categories = {}
-    for s in startups:
-        cat = s.get("category", "Other")
-        categories[cat] = categories.get(cat, 0) + 1
     print(f"\n   Top Categories:")
-    for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:10]:
+    for cat, count in list(cube.facet_counts("startups", "category").items())[:10]:
         print(f"      {cat}: {count}")
 
     # Failure breakdown
-    failure_reasons = {}
-    for f in fails:
-        if f.get("poor_market_fit"):
-            failure_reasons["Poor Market Fit"] = failure_reasons.get("Poor Market Fit", 0) + 1
-        if f.get("competition"):
-            failure_reasons["Competition"] = failure_reasons.get("Competition", 0) + 1
-        if f.get("monetization_failure"):
-            failure_reasons["Monetization Failure"] = failure_reasons.get("Monetization Failure", 0) + 1
-        if f.get("execution_flaws"):
-            failure_reasons["Execution Flaws"] = failure_reasons.get("Execution Flaws", 0) + 1
-        if f.get("ran_out_of_cash"):
-            failure_reasons["Ran Out of Cash"] = failure_reasons.get("Ran Out of Cash", 0) + 1
-
+    labels = dict(FAIL_FLAG_COLUMNS)
     print(f"\n   Top Failure Reasons:")
-    for reason, count in sorted(failure_reasons.items(), key=lambda x: x[1], reverse=True)[:5]:
-        print(f"      {reason}: {count}")
+    for flag, count in list(cube.flag_counts().get("", {}).items())[:5]:
+        print(f"      {labels[flag]}: {count}")
+
+
+def write_deltas(*trackers: DeltaTracker):
+    """Finish the delta files, then record this run as the pending manifest."""
+    print("")
+    for tracker in trackers:
+        tracker.write()
+    save_pending_manifest({tracker.index_name: tracker.hashes for tracker in trackers})
+
+
+def find_competitors(startups: Iterable[Dict]) -> CompetitorClusters:
+    """Near-duplicate competitor clusters over the startups' descriptions, as a metrics stage."""
+    with METRICS.stage("competitors") as stage:
+        stats: Dict[str, Any] = {}
+        clusters = find_competitor_clusters(startups, stats=stats)
+        stage.rows_out = len(clusters)
+        stage.extra.update(stats)
+    print(f"👥 {stats['clusters']} competitor clusters among {len(clusters)} startups")
+    return clusters
+
+
+def find_tag_markets(startups: Iterable[Dict]) -> TagMatrix:
+    """Tag co-occurrence matrix and per-tag batch-year counts, as a metrics stage; writes TAG_MATRIX_PATH."""
+    with METRICS.stage("tag_matrix") as stage:
+        stats: Dict[str, Any] = {}
+        matrix = build_tag_matrix(startups, stats=stats)
+        stage.rows_out = len(matrix)
+        stage.extra.update(stats)
+        stage.extra["bytes_out"] = matrix.write(TAG_MATRIX_PATH)
+    print(f"🏷️  {stats['tags']} tags, {stats['pairs']:,} co-occurring pairs over {len(matrix)} startups")
+    return matrix
+
+
+def find_similar(index_name: str, records: Iterable[Dict], k: int, jobs: int = 1) -> Neighbours:
+    """Top-k TF-IDF neighbours for every record of one index, as a metrics stage."""
+    with METRICS.stage(f"similar_{index_name}") as stage:
+        stats: Dict[str, Any] = {}
+        neighbours = compute_neighbours(records, SIMILARITY_FIELDS[index_name], k, jobs, stats)
+        stage.rows_out = len(neighbours)
+        stage.extra.update(stats)
+    print(f"🧭 Found {k} similar records for each of {len(neighbours)} {index_name} ({stats['terms']:,} terms)")
+    return neighbours
+
+
+def run_streaming(
+    jobs: int = 1,
+    sharded: bool = False,
+    similar_k: int = 0,
+    saturation_source: str = "category",
+    record_budget: int = 0,
+):
+    """
+    Streaming mode: CSV rows flow through parsing and scoring one record at a
+    time and are appended to .ndjson files (or gzip shards in SHARDS_DIR when
+    sharded), so memory stays flat with input size.
+    Category counts for saturation come from a cheap tags-only pre-pass, and
+    tag markets from a tags pre-pass. Competitor clusters take a description
+    pre-pass, which is only run when saturation comes from them or --similar
+    already pays for text pre-passes; otherwise the streamed startups have no
+    cluster_size / competitor_density.
+    With similar_k, a text pre-pass over the startups finds their neighbours
+    before the main pass attaches them.
+    With jobs > 1 the graveyard files and the yc.csv passes share one
+    process pool. With record_budget, oversized startups are split into
+    paragraph records (record_budget.py) just before they are written.
+    """
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    try:
+        stream_indices(jobs, pool, sharded, similar_k, saturation_source, record_budget)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def stream_indices(
+    jobs: int, pool: Optional[Executor], sharded: bool, similar_k: int, saturation_source: str, record_budget: int
+):
+    if sharded:
+        clear_shards(SHARDS_DIR)
+        shard_writers = {name: ShardWriter(SHARDS_DIR, name) for name in ("startups", "graveyard")}
+
+    def write_index(index_name: str, records: Iterable[Dict]) -> Tuple[int, Path]:
+        if sharded:
+            return shard_writers[index_name].write(records), SHARDS_DIR
+        path = OUTPUT_DIR / f"{index_name}.ndjson"
+        return write_ndjson(records, path), path
+
+    manifest = load_manifest()
+    startups_delta = DeltaTracker("startups", manifest.get("startups", {}))
+    fails_delta = DeltaTracker("graveyard", manifest.get("graveyard", {}))
+    cube = new_facet_cube()
+
+    # The graveyard is small and is needed in full to flag dead YC companies,
+    # so it is resolved first and written once the YC stream has been linked.
+    print("💀 Processing failed startups...")
+    with METRICS.stage("parse_graveyard") as stage:
+        parsed, cached = parse_fail_sources(pool)
+        entities = EntityIndex()
+        fails = process_fails_data(entities, parsed)
+        stage.rows_in = len(fails) + len(entities.merges)
+        stage.rows_out = len(fails)
+        stage.extra.update({
+            "files": len(parsed), "files_cached": cached, "near_misses": len(entities.near_misses),
+        })
+
+    print("\n📊 Streaming YC startups...")
+    with METRICS.stage("count_categories") as stage:
+        category_counts = count_yc_categories(jobs, pool)
+        stage.rows_out = sum(category_counts.values())
+    write_category_counts(CATEGORY_COUNTS_PATH, category_counts, saturation_source)
+    clusters = None
+    if saturation_source == "competitors" or similar_k:
+        clusters = find_competitors(iter_yc_data(jobs, pool))
+    tag_markets = find_tag_markets(iter_yc_data(jobs, pool))
+    if similar_k:
+        startup_neighbours = find_similar("startups", iter_yc_data(jobs, pool), similar_k, jobs)
+        for _ in find_similar("graveyard", fails, similar_k, jobs).attach(fails):
+            pass
+
+    # Parsing, scoring, linking and writing are interleaved per record here,
+    # so they are measured as one stage
+    with METRICS.stage("stream_startups") as stage:
+        startups = iter_yc_data(jobs, pool)
+        if clusters is not None:
+            startups = clusters.attach(startups)
+        startups = tag_markets.attach(startups)
+        startups = iter_enhanced(startups, category_counts, saturation_source)
+        if similar_k:
+            startups = startup_neighbours.attach(startups)
+        startups = link_graveyard_to_startups(fails, startups)
+        budget = new_record_budget(record_budget) if record_budget else None
+        if budget:
+            startups = budget.split(startups)
+        startups = startups_delta.track(cube.count("startups", startups))
+        num_records, startups_path = write_index("startups", startups)
+        stage.rows_out = num_records
+        num_startups = num_records
+        if budget:
+            stage.extra["record_budget"] = budget.stats
+            num_startups -= budget.stats["children"]
+    print(f"✅ Streamed {num_startups} startups to {startups_path}")
+    if budget:
+        print_budget(budget)
+
+    with METRICS.stage("write_graveyard", rows_in=len(fails)) as stage:
+        num_fails, fails_path = write_index("graveyard", fails_delta.track(cube.count("graveyard", fails)))
+        stage.rows_out = num_fails
+    print(f"✅ Saved {num_fails} failed startups to {fails_path}")
+
+    if sharded:
+        write_shard_manifest(SHARDS_DIR, shard_writers.values())
+        num_shards = sum(len(w.shards) for w in shard_writers.values())
+        print(f"📦 Wrote {num_shards} upload shards and {SHARDS_DIR / 'manifest.json'}")
+
+    with METRICS.stage("write_deltas"):
+        write_deltas(startups_delta, fails_delta)
+    write_facets(cube)
+
+    print_stats(num_startups, num_fails, cube)
+
+
+def copy_record(record: Dict) -> Dict:
+    """A copy whose top-level fields can be set without touching record."""
+    return type(record)(record) if isinstance(record, CompactRecord) else dict(record)
+
+
+class BatchCache:
+    """
+    What a --watch process keeps between runs, keyed by the (mtime, size) of
+    the source file: each graveyard file's parse, and the YC startups as
+    scored (before graveyard linking). A run reuses whatever still matches,
+    so an unchanged file is neither read nor re-scored. Entries are handed
+    out as copies, since later stages set fields on records.
+    """
+
+    def __init__(self):
+        self.fails: Dict[Path, Tuple[FileState, Tuple[List, bool, Dict[str, int]]]] = {}
+        self.startups: Optional[Tuple[Any, List[Dict]]] = None
+
+    def fail_result(self, job: FailJob) -> Optional[Tuple[List, bool, Dict[str, int]]]:
+        """A parse_fail_source result for job's file, if the file has not changed since."""
+        entry = self.fails.get(job[0])
+        if entry is None or entry[0] != file_state(job[0]):
+            return None
+        rows = entry[1][0]
+        # Counted as cached; its fallbacks were counted by the run that parsed it
+        return [(i, dict(record)) for i, record in rows], True, {}
+
+    def store_fail(self, job: FailJob, state: Optional[FileState], result: Tuple[List, bool, Dict[str, int]]):
+        rows, cached, fallbacks = result
+        self.fails[job[0]] = (state, ([(i, dict(record)) for i, record in rows], cached, fallbacks))
+
+    def startups_key(self, saturation_source: str) -> Any:
+        return file_state(DATA_DIR / "yc.csv"), saturation_source, COMPACT_RECORDS
+
+    def scored_startups(self, key: Any) -> Optional[List[Dict]]:
+        if self.startups is None or self.startups[0] != key:
+            return None
+        return [copy_record(s) for s in self.startups[1]]
+
+    def store_startups(self, key: Any, startups: List[Dict]):
+        self.startups = key, [copy_record(s) for s in startups]
+
+
+def run_batch(
+    jobs: int = 1,
+    similar_k: int = 0,
+    saturation_source: str = "category",
+    cache: BatchCache = None,
+    record_budget: int = 0,
+):
+    """
+    Batch mode as a stage DAG (stage_dag.py). With jobs > 1, every graveyard
+    file parses in a process pool while yc.csv parses in chunks on the same
+    pool, and the YC chain (competitors, tag markets, scoring) runs while any graveyard
+    file is still in flight. Each file is cached on its own snapshot, so a
+    changed file only costs its own parse. With one job the stages run in
+    the order below.
+    With a cache (--watch), files unchanged since an earlier run skip their
+    parse, and the YC chain is skipped when yc.csv is unchanged.
+    With record_budget, the written startups are split to fit it
+    (record_budget.py).
+    """
+    sources = fail_sources()
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    dag = StageDAG()
+
+    def parse_yc() -> List[Dict]:
+        print("📊 Processing YC startups...")
+        with METRICS.stage("parse_yc") as stage:
+            startups = process_yc_data(jobs, pool)
+            stage.rows_out = len(startups)
+        return startups
+
+    def competitors(startups: List[Dict]) -> List[Dict]:
+        for _ in find_competitors(startups).attach(startups):
+            pass
+        return startups
+
+    def tag_markets(startups: List[Dict]) -> List[Dict]:
+        for _ in find_tag_markets(startups).attach(startups):
+            pass
+        return startups
+
+    def score(startups: List[Dict]) -> List[Dict]:
+        with METRICS.stage("score", rows_in=len(startups)) as stage:
+            startups = enhance_with_insights(startups, saturation_source)
+            stage.rows_out = len(startups)
+        return startups
+
+    def parse_graveyard(*results) -> List[Dict]:
+        print("\n💀 Processing failed startups...")
+        with METRICS.stage("parse_graveyard") as stage:
+            if cache is not None:
+                for (_, _, job), state, result in zip(sources, fail_states, results):
+                    cache.store_fail(job, state, result)
+            parsed, cached = collect_fail_sources(sources, results)
+            entities = EntityIndex()
+            fails = process_fails_data(entities, parsed)
+            stage.rows_in = len(fails) + len(entities.merges)
+            stage.rows_out = len(fails)
+            stage.extra.update({
+                "files": len(sources), "files_cached": cached, "near_misses": len(entities.near_misses),
+            })
+        print(f"📁 {len(sources)} graveyard files, {cached} from snapshots")
+        return fails
+
+    # Flag YC companies that also show up in the graveyard
+    def link_graveyard(startups: List[Dict], fails: List[Dict]) -> List[Dict]:
+        with METRICS.stage("link_graveyard", rows_in=len(startups)) as stage:
+            linked = sum(1 for s in link_graveyard_to_startups(fails, startups) if "graveyard_id" in s)
+            stage.rows_out = len(startups)
+            stage.extra["linked"] = linked
+        print(f"🔗 {linked} YC startups matched a graveyard entry")
+        return startups
+
+    def similar(startups: List[Dict], fails: List[Dict]):
+        for _ in find_similar("startups", startups, similar_k, jobs).attach(startups):
+            pass
+        for _ in find_similar("graveyard", fails, similar_k, jobs).attach(fails):
+            pass
+
+    def budget_startups(startups: List[Dict], *_) -> List[Dict]:
+        with METRICS.stage("record_budget", rows_in=len(startups)) as stage:
+            budget = new_record_budget(record_budget)
+            records = list(budget.split(startups))
+            stage.rows_out = len(records)
+            stage.extra.update(budget.stats)
+        print_budget(budget)
+        return records
+
+    def write_json(startups: List[Dict], fails: List[Dict], *_):
+        with METRICS.stage("write_json", rows_in=len(startups) + len(fails)) as stage:
+            # Save startups
+            startups_path = OUTPUT_DIR / "startups.json"
+            with open(startups_path, "w", encoding="utf-8") as f:
+                json.dump(startups, f, indent=2, ensure_ascii=False, default=json_default)
+            children = sum(1 for s in startups if is_child(s)) if record_budget else 0
+            extra = f" (+{children} paragraph records)" if children else ""
+            print(f"✅ Saved {len(startups) - children} startups{extra} to {startups_path}")
+
+            # Save fails
+            fails_path = OUTPUT_DIR / "graveyard.json"
+            with open(fails_path, "w", encoding="utf-8") as f:
+                json.dump(fails, f, indent=2, ensure_ascii=False, default=json_default)
+            print(f"✅ Saved {len(fails)} failed startups to {fails_path}")
+            stage.rows_out = len(startups) + len(fails)
+
+    def write_outputs(startups: List[Dict], fails: List[Dict], *_):
+        with METRICS.stage("write_deltas"):
+            manifest = load_manifest()
+            startups_delta = DeltaTracker("startups", manifest.get("startups", {}))
+            fails_delta = DeltaTracker("graveyard", manifest.get("graveyard", {}))
+            cube = new_facet_cube()
+            for _ in startups_delta.track(cube.count("startups", startups)):
+                pass
+            for _ in fails_delta.track(cube.count("graveyard", fails)):
+                pass
+            write_deltas(startups_delta, fails_delta)
+        write_facets(cube)
+        children = sum(1 for s in startups if is_child(s)) if record_budget else 0
+        print_stats(len(startups) - children, len(fails), cube)
+
+    fail_nodes = []
+    # Taken before parsing, so a file written mid-parse is parsed again next run
+    fail_states = [file_state(job[0]) for _, _, job in sources]
+    for source, _, job in sources:
+        fail_nodes.append(f"parse_fail:{source}")
+        cached = cache.fail_result(job) if cache is not None else None
+        if cached is not None:
+            dag.add(fail_nodes[-1], lambda result=cached: result)
+        else:
+            dag.add(fail_nodes[-1], parse_fail_source, job, pool=True)
+
+    startups_key = cache.startups_key(saturation_source) if cache is not None else None
+    scored = cache.scored_startups(startups_key) if cache is not None else None
+    if scored is not None:
+        print(f"📊 yc.csv unchanged, reusing {len(scored)} scored YC startups")
+        dag.add("score", lambda: scored)
+    else:
+        def score_and_cache(startups: List[Dict]) -> List[Dict]:
+            startups = score(startups)
+            if cache is not None:
+                cache.store_startups(startups_key, startups)
+            return startups
+
+        dag.add("parse_yc", parse_yc)
+        dag.add("competitors", competitors, deps=["parse_yc"])
+        dag.add("tag_markets", tag_markets, deps=["competitors"])
+        dag.add("score", score_and_cache, deps=["tag_markets"])
+    dag.add("parse_graveyard", parse_graveyard, deps=fail_nodes)
+    dag.add("link_graveyard", link_graveyard, deps=["score", "parse_graveyard"])
+    # Similar records are attached in place, so writers wait on that stage too
+    written = ["link_graveyard", "parse_graveyard"]
+    if similar_k:
+        dag.add("similar", similar, deps=written)
+        written.append("similar")
+    if record_budget:
+        # From here on the startups are the budgeted records
+        dag.add("record_budget", budget_startups, deps=written)
+        written = ["record_budget", *written[1:]]
+    dag.add("write_json", write_json, deps=written)
+    dag.add("write_outputs", write_outputs, deps=written + ["write_json"])
+
+    try:
+        dag.run(pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    METRICS.info["stage_dag"] = dag.timings
+
+
+def watched_files() -> List[Path]:
+    return [DATA_DIR / "yc.csv", *sorted(FAILS_DIR.glob("*.csv"))]
+
+
+def publish_staged(staging: Path, live: Path) -> int:
+    """
+    Move every file of a staged run into live. Each file is swapped in with
+    os.replace, so readers see either the old or the new version of it,
+    never a partial write. The pending manifest goes last: once it is
+    replaced, the records and delta it describes are already in place.
+    """
+    files = sorted((p for p in staging.rglob("*") if p.is_file()), key=lambda p: p.name == PENDING_MANIFEST_PATH.name)
+    for path in files:
+        target = live / path.relative_to(staging)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target)
+    shutil.rmtree(staging, ignore_errors=True)
+    return len(files)
+
+
+def run_watch_cycle(args: argparse.Namespace, jobs: int, cache: BatchCache, changes: Optional[ChangeSet] = None):
+    """
+    One --watch run: process into OUTPUT_DIR/.staging, then swap the results
+    into OUTPUT_DIR, then upload them with --upload. A failed run leaves the
+    previous artifacts in place.
+
+    The delta is taken against OUTPUT_DIR's manifest.json, which only moves
+    when an upload succeeds, so until then every cycle's delta holds all the
+    changes since the last upload, not just this cycle's.
+    """
+    global PUBLIC_FACETS_PATH, MANIFEST_PATH
+    live_dir, public_facets = OUTPUT_DIR, PUBLIC_FACETS_PATH
+    staging = live_dir / STAGING_DIR_NAME
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    METRICS.reset()
+    METRICS.info.update({
+        "mode": "watch",
+        "jobs": jobs,
+        "similar_k": args.similar,
+        "saturation": args.saturation,
+        "record_budget": args.record_budget,
+        "snapshots": USE_SNAPSHOTS,
+        "compact_records": COMPACT_RECORDS,
+        "data_dir": str(DATA_DIR),
+        "changed": [str(p) for p in changes.changed] if changes else [],
+    })
+    started, start = time.time(), time.perf_counter()
+    configure_paths(DATA_DIR, staging)
+    MANIFEST_PATH = live_dir / MANIFEST_PATH.name
+    try:
+        run_batch(
+            jobs, similar_k=args.similar, saturation_source=args.saturation, cache=cache,
+            record_budget=args.record_budget,
+        )
+        if args.search_index:
+            run_search_index("json")
+    except Exception as error:
+        print(f"❌ Run failed, keeping the previous artifacts: {error!r}")
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+    finally:
+        configure_paths(DATA_DIR, live_dir)
+        PUBLIC_FACETS_PATH = public_facets
+
+    published = publish_staged(staging, live_dir)
+    if PUBLIC_FACETS_PATH is not None:
+        shutil.copyfile(FACETS_PATH, PUBLIC_FACETS_PATH.with_name(PUBLIC_FACETS_PATH.name + ".tmp"))
+        os.replace(PUBLIC_FACETS_PATH.with_name(PUBLIC_FACETS_PATH.name + ".tmp"), PUBLIC_FACETS_PATH)
+    processing = time.perf_counter() - start
+    print(f"\n🔄 Swapped {published} files into {live_dir}")
+    if args.upload:
+        try:
+            run_upload("json", args.algolia_url, args.upload_concurrency)
+        except SystemExit as error:
+            # The manifest stays put, so the next cycle's delta still carries these changes
+            print(f"{error} (will retry after the next change)")
+
+    watch = {"processing_seconds": round(processing, 4)}
+    if changes is not None:
+        # Change-to-artifact latency: from the last write of the burst to the swap
+        watch["latency_seconds"] = round(time.time() - changes.last_write, 4)
+        # Polling and debouncing, before processing started
+        watch["wait_seconds"] = round(started - changes.last_write, 4)
+        names = ", ".join(p.name for p in changes.changed)
+        print(
+            f"⚡ {names}: artifacts live {watch['latency_seconds']:.2f}s after the last write "
+            f"({processing:.2f}s processing)"
+        )
+    METRICS.info["watch"] = watch
+    METRICS.print_summary()
+    metrics_path = args.metrics or METRICS_PATH
+    METRICS.write(metrics_path)
+    print(f"\n📝 Metrics written to {metrics_path}")
+
+
+def run_watch(args: argparse.Namespace, jobs: int):
+    """
+    Daemon mode: one full run, then a run for every debounced change to
+    yc.csv or Fails/*.csv. The process keeps a BatchCache, so each run only
+    re-parses the files that changed and only re-scores the YC startups
+    when yc.csv is one of them; the graveyard linking, the delta and the
+    facets are rebuilt every time. With --upload, every run is uploaded once
+    it is live; without it, the delta keeps growing until something uploads.
+    """
+    cache = BatchCache()
+    watcher = DataWatcher(watched_files, args.poll_interval, args.debounce)
+    run_watch_cycle(args, jobs, cache)
+    print(f"\n👀 Watching {DATA_DIR / 'yc.csv'} and {FAILS_DIR} (Ctrl-C to stop)")
+    try:
+        while True:
+            changes = watcher.wait()
+            print(f"\n📝 Changed: {', '.join(p.name for p in changes.changed)}\n")
+            run_watch_cycle(args, jobs, cache, changes)
+            print(f"\n👀 Watching {DATA_DIR / 'yc.csv'} and {FAILS_DIR} (Ctrl-C to stop)")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+
+
+def iter_output_records(index_name: str, mode: str) -> Iterator[Dict]:
+    """Read back the records a run wrote for one index, one at a time where the format allows."""
+    if mode == "shards":
+        with open(SHARDS_DIR / "manifest.json", "r", encoding="utf-8") as f:
+            shards = json.load(f)["indices"][index_name]["shards"]
+        for shard in shards:
+            with gzip.open(SHARDS_DIR / shard["file"], "rt", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+    elif mode == "ndjson":
+        with open(OUTPUT_DIR / f"{index_name}.ndjson", "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+    else:
+        with open(OUTPUT_DIR / f"{index_name}.json", "r", encoding="utf-8") as f:
+            yield from json.load(f)
+
+
+def run_upload(mode: str, base_url: str = None, concurrency: int = DEFAULT_CONCURRENCY):
+    """Final stage: replace the startups and graveyard indices with this run's output."""
+    app_id = os.environ.get("ALGOLIA_APPLICATION_ID") or os.environ.get("ALGOLIA_APP_ID")
+    api_key = os.environ.get("ALGOLIA_ADMIN_API_KEY") or os.environ.get("ALGOLIA_API_KEY")
+    if not (app_id and api_key):
+        if not base_url:
+            raise SystemExit("❌ Missing Algolia credentials! Set ALGOLIA_APPLICATION_ID and ALGOLIA_ADMIN_API_KEY.")
+        # A local mock server accepts any credentials
+        app_id, api_key = app_id or "mock", api_key or "mock"
+
+    print(f"\n📤 Uploading to {base_url or 'Algolia'} ({concurrency} requests in flight)...")
+    with METRICS.stage("upload") as stage:
+        try:
+            result = upload_indices(
+                {name: iter_output_records(name, mode) for name in ("startups", "graveyard")},
+                app_id, api_key, base_url, concurrency,
+            )
+        except AlgoliaError as error:
+            raise SystemExit(f"❌ Upload failed: {error}")
+        stage.rows_out = result["records"]
+        stage.extra.update({k: result[k] for k in ("requests", "retries", "rate_limited", "connections")})
+    commit_manifest()
+    for name, count in result["indices"].items():
+        print(f"✅ {name}: {count} records")
+    print(
+        f"   {result['records_per_sec']:,.0f} records/s, {result['requests']} requests "
+        f"over {result['connections']} connection(s), {result['retries']} retries "
+        f"({result['rate_limited']} rate-limited)"
+    )
+
+
+def run_search_index(mode: str):
+    """Build the offline search index files (local_search.py) from this run's output."""
+    with METRICS.stage("search_index") as stage:
+        stage.rows_out = 0
+        for name in ("startups", "graveyard"):
+            path = OUTPUT_DIR / f"{name}.idx"
+            stats = build_search_index(iter_output_records(name, mode), path, name)
+            stage.rows_out += stats["docs"]
+            stage.extra[name] = stats
+            print(f"🔎 Indexed {stats['docs']} {name} ({stats['terms']:,} terms, {stats['bytes'] / 1e6:.1f} MB) to {path}")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Process Startup Roast datasets for Algolia.")
+    parser.add_argument(
+        "--ndjson",
+        action="store_true",
+        help="stream records to startups.ndjson / graveyard.ndjson instead of JSON arrays",
+    )
+    parser.add_argument(
+        "--shards",
+        action="store_true",
+        help="stream records to gzip NDJSON shards in <output-dir>/shards, one per Algolia batch",
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        help="directory holding yc.csv and Fails/ (default: data/)",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        help="where processed files go (default: <data-dir>/processed)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="re-parse every CSV instead of using the snapshots in data/snapshots",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="hold batch records as compact slotted objects: less memory at large inputs, slower stages",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="parse yc.csv in N worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--saturation",
+        choices=SATURATION_SOURCES,
+        default="category",
+        help="derive market saturation from category size (default) or from near-duplicate competitor clusters",
+    )
+    parser.add_argument(
+        "--similar",
+        type=int,
+        default=0,
+        metavar="K",
+        help="store the K most similar records (TF-IDF cosine) on each record as similar_ids / similar_scores",
+    )
+    parser.add_argument(
+        "--record-budget",
+        type=int,
+        default=0,
+        metavar="BYTES",
+        help="split startups larger than BYTES of JSON into paragraph records sharing a parent_id, "
+             "and write startups.lean.json (default: off)",
+    )
+    parser.add_argument(
+        "--search-index",
+        action="store_true",
+        help="also build <output-dir>/startups.idx and graveyard.idx for local_search.py",
+    )
+    parser.add_argument(
+        "--upload",
+        action="store_true",
+        help="replace the Algolia indices with the output once it is written (with --watch: after every run)",
+    )
+    parser.add_argument(
+        "--algolia-url",
+        metavar="URL",
+        help="upload to this base URL instead of https://<app id>.algolia.net (e.g. mock_algolia.py)",
+    )
+    parser.add_argument(
+        "--upload-concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar="N",
+        help=f"batch requests in flight during --upload (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=Path,
+        metavar="PATH",
+        help="where to write per-stage metrics JSON (default: <output-dir>/metrics.json)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="cProfile the run and report the parsing helpers (implies --no-cache --jobs 1)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running: reprocess yc.csv and Fails/ whenever they change, swapping the JSON output in atomically",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        metavar="SECONDS",
+        help=f"--watch: how often to stat the input files (default: {DEFAULT_INTERVAL})",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        metavar="SECONDS",
+        help=f"--watch: wait until the inputs have been quiet this long before a run (default: {DEFAULT_DEBOUNCE})",
+    )
+    return parser.parse_args(argv)
+
+
+def profile_report(profiler: cProfile.Profile) -> Dict[str, Dict[str, float]]:
+    """Save the full profile to PROFILE_PATH; return and print the hot helpers' rows."""
+    profiler.dump_stats(PROFILE_PATH)
+    stats = pstats.Stats(profiler)
+    helpers: Dict[str, Dict[str, float]] = {}
+    for (filename, _, funcname), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        if funcname in PROFILED_HELPERS and Path(filename).resolve() == Path(field_parsers.__file__).resolve():
+            helpers[funcname] = {"calls": ncalls, "tottime": round(tottime, 4), "cumtime": round(cumtime, 4)}
+
+    print("\n🔬 Parsing helpers (cProfile):")
+    for name, row in sorted(helpers.items(), key=lambda x: x[1]["cumtime"], reverse=True):
+        print(f"   {name:<16} {row['calls']:>9} calls  {row['tottime']:8.3f}s self  {row['cumtime']:8.3f}s cumulative")
+    print(f"   Full profile: {PROFILE_PATH} (python -m pstats)")
+    return helpers
+
+
+def main(argv=None):
+    global USE_SNAPSHOTS, COMPACT_RECORDS
+    args = parse_args(argv)
+    USE_SNAPSHOTS = not (args.no_cache or args.profile)
+    COMPACT_RECORDS = args.compact
+    if args.data_dir or args.output_dir:
+        configure_paths(args.data_dir or DATA_DIR, args.output_dir)
+    jobs = args.jobs
+    if args.profile and jobs > 1:
+        # cProfile only sees this process; worker time would show up as waiting
+        print("⚠️  --profile runs with --jobs 1")
+        jobs = 1
+    print("🔥 Processing Startup Roast datasets...\n")
+
+    if args.watch:
+        if args.ndjson or args.shards or args.profile:
+            raise SystemExit("❌ --watch writes JSON arrays; it can't be combined with --ndjson, --shards or --profile")
+        run_watch(args, jobs)
+        return
+
+    METRICS.reset()
+    METRICS.info.update({
+        "mode": "shards" if args.shards else "ndjson" if args.ndjson else "batch",
+        "jobs": jobs,
+        "similar_k": args.similar,
+        "saturation": args.saturation,
+        "record_budget": args.record_budget,
+        "snapshots": USE_SNAPSHOTS,
+        "compact_records": COMPACT_RECORDS,
+        "data_dir": str(DATA_DIR),
+    })
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+
+    if args.ndjson or args.shards:
+        run_streaming(
+            jobs, sharded=args.shards, similar_k=args.similar, saturation_source=args.saturation,
+            record_budget=args.record_budget,
+        )
+    else:
+        run_batch(jobs, similar_k=args.similar, saturation_source=args.saturation, record_budget=args.record_budget)
+
+    mode = "shards" if args.shards else "ndjson" if args.ndjson else "json"
+    if args.search_index:
+        run_search_index(mode)
+    if args.upload:
+        run_upload(mode, args.algolia_url, args.upload_concurrency)
+
+    if profiler:
+        profiler.disable()
+        METRICS.info["profile"] = profile_report(profiler)
+
+    METRICS.print_summary()
+    metrics_path = args.metrics or METRICS_PATH
+    METRICS.write(metrics_path)
+    print(f"\n📝 Metrics written to {metrics_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+"""
+Per-record byte budget for the startups index.
+
+long_description is searchable and snippeted, so it is uploaded in full, and
+it is most of a startup record's size. With a budget
+(process-data.py --record-budget BYTES), every record whose compact JSON is
+larger than the budget is split at paragraph boundaries:
+
+- the parent keeps all of its fields. Its long_description keeps the leading
+  paragraphs that fit the budget.
+- each further chunk of paragraphs becomes a child record with objectID
+  <parent>_p<n>. A child holds the lean projection of its parent
+  (LEAN_FIELDS), the parent's facet attributes so filters treat it like the
+  parent, and the chunk as its long_description.
+
+Parents that were split and their children carry parent_id, the index's
+attributeForDistinct. A search returns one hit per company whichever
+paragraph matched, and every word of the text stays searchable. Children
+are not companies: FacetCube skips them, so facet counts are unchanged, and
+the app (lib/algolia.ts companyHits) swaps a child hit for its parent before
+showing it.
+
+The same pass writes startups.lean.json, the lean projection of every
+company, for result lists that need no more than that.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from compact_records import json_default
+
+PARENT_FIELD = "parent_id"
+TEXT_FIELD = "long_description"
+# What a result list shows of a startup
+LEAN_FIELDS = ("objectID", "name", "description", "tags", "survival_score")
+
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+PARAGRAPH_SEPARATOR = "\n\n"
+
+
+def record_size(record: Dict[str, Any]) -> int:
+    """Bytes of the record as compact JSON, as an index counts it."""
+    return len(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=json_default).encode("utf-8"))
+
+
+def text_size(text: str) -> int:
+    """Bytes text adds to a record's JSON, escapes included."""
+    return len(json.dumps(text, ensure_ascii=False).encode("utf-8")) - 2
+
+
+def is_child(record: Dict[str, Any]) -> bool:
+    """Whether record is a paragraph record rather than a company."""
+    return record.get(PARENT_FIELD, record["objectID"]) != record["objectID"]
+
+
+def lean_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {field: record[field] for field in LEAN_FIELDS if field in record}
+
+
+def _pieces(text: str, limit: int) -> Iterator[str]:
+    """Paragraphs of text, with any paragraph over limit bytes cut at sentences, then words."""
+    for paragraph in PARAGRAPH_RE.split(text.strip()):
+        if text_size(paragraph) <= limit:
+            yield paragraph
+            continue
+        for sentence in SENTENCE_RE.split(paragraph):
+            if text_size(sentence) <= limit:
+                yield sentence
+                continue
+            words: List[str] = []
+            for word in sentence.split(" "):
+                if words and text_size(" ".join(words + [word])) > limit:
+                    yield " ".join(words)
+                    words = []
+                words.append(word)
+            if words:
+                yield " ".join(words)
+
+
+def chunk_text(text: str, first_limit: int, limit: int) -> List[str]:
+    """
+    Text packed into chunks of whole paragraphs: the first at most
+    first_limit bytes (possibly empty), the rest at most limit bytes each.
+    A single word longer than limit is kept whole.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    for piece in _pieces(text, limit):
+        cap = first_limit if not chunks else limit
+        if current and text_size(PARAGRAPH_SEPARATOR.join(current + [piece])) > cap:
+            chunks.append(PARAGRAPH_SEPARATOR.join(current))
+            current = []
+        elif not current and not chunks and text_size(piece) > first_limit:
+            # Not even the first piece fits next to the parent's other fields
+            chunks.append("")
+        current.append(piece)
+    chunks.append(PARAGRAPH_SEPARATOR.join(current))
+    return chunks
+
+
+class RecordBudget:
+    """Splits oversized startups as they stream past and writes their lean projections."""
+
+    def __init__(self, budget: int, facet_fields: Sequence[str] = (), lean_path: Optional[Path] = None):
+        self.budget = budget
+        # Child fields besides parent_id and the text: the lean projection, then facets
+        self.child_fields = tuple(dict.fromkeys([*LEAN_FIELDS, *facet_fields]))
+        self.lean_path = lean_path
+        self.stats = {
+            "budget": budget, "records": 0, "split": 0, "children": 0,
+            "bytes_in": 0, "bytes_out": 0, "max_bytes_out": 0, "over_budget": 0,
+        }
+
+    def split_record(self, record: Dict[str, Any], size: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        record, then its children; record's long_description is trimmed in
+        place when it is split. size is record_size(record), if known.
+        """
+        if size is None:
+            size = record_size(record)
+        text = record.get(TEXT_FIELD)
+        if size <= self.budget or not isinstance(text, str) or not text.strip():
+            return [record]
+
+        object_id = record["objectID"]
+        child_base = {"objectID": f"{object_id}_p0", PARENT_FIELD: object_id}
+        child_base.update((field, record[field]) for field in self.child_fields[1:] if field in record)
+        child_base[TEXT_FIELD] = ""
+        # Room for the text once parent_id is added / next to the child's fields
+        parent_room = self.budget - (size - text_size(text)) - text_size(object_id) - len(f',"{PARENT_FIELD}":""')
+        # Two bytes spare for suffixes longer than _p0
+        child_room = max(1, self.budget - record_size(child_base) - 2)
+        chunks = chunk_text(text, parent_room, child_room)
+        if len(chunks) == 1:
+            return [record]
+
+        record[TEXT_FIELD] = chunks[0]
+        record[PARENT_FIELD] = object_id
+        children = []
+        for n, chunk in enumerate(chunks[1:], 1):
+            child = dict(child_base)
+            child["objectID"] = f"{object_id}_p{n}"
+            child[TEXT_FIELD] = chunk
+            children.append(child)
+        return [record, *children]
+
+    def split(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Every record followed by its children, if any; lean projections go to lean_path."""
+        stats = self.stats
+        lean = open(self.lean_path, "w", encoding="utf-8") if self.lean_path else None
+        try:
+            if lean:
+                lean.write("[")
+            for record in records:
+                stats["records"] += 1
+                size = record_size(record)
+                stats["bytes_in"] += size
+                if lean:
+                    lean.write(",\n" if stats["records"] > 1 else "\n")
+                    json.dump(lean_record(record), lean, ensure_ascii=False, separators=(",", ":"), default=json_default)
+                out = self.split_record(record, size)
+                if len(out) > 1:
+                    stats["split"] += 1
+                    stats["children"] += len(out) - 1
+                for r in out:
+                    if len(out) > 1:
+                        size = record_size(r)
+                    stats["bytes_out"] += size
+                    stats["max_bytes_out"] = max(stats["max_bytes_out"], size)
+                    stats["over_budget"] += size > self.budget
+                    yield r
+            if lean:
+                lean.write("\n]\n")
+        finally:
+            if lean:
+                lean.close()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Survival scoring outside the pipeline: what-if scores for pitched ideas and
+parameter sweeps, from the same tables process-data.py scores with.
+
+An input is any startup-shaped dict: category, batch, status, is_hiring,
+open_jobs, team_size, and optionally saturation (or competitor_density, when
+the run derived saturation from competitor clusters). It is
+normalized to the scorer's signature (batch era, category, hiring,
+open-jobs and team-size buckets, ...). Every input with the same signature
+gets the same score, so the signature is the key of an LRU cache in front of
+SurvivalScorer.score_signature. Saturation comes from the category counts
+the pipeline saved in category_counts.json, with the run's --saturation
+source. They are never recounted per call, so an idea scores exactly as a
+startup with the same fields would have in the last run.
+
+Usage:
+    python scripts/scoring_engine.py --serve 8788     # POST /score, GET /stats
+    python scripts/scoring_engine.py --stdio          # one JSON input per line in, one result per line out
+    python scripts/scoring_engine.py --bench 100000   # scorings per second, cold and warm
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from survival_scoring import (
+    DEFAULT_SCORER,
+    SATURATION_LEVELS,
+    SurvivalScorer,
+    batch_year,
+    get_category_saturation,
+    get_competitor_saturation,
+    jobs_bucket,
+    team_bucket,
+)
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_SNAPSHOT_PATH = ROOT_DIR / "data" / "processed" / "category_counts.json"
+SNAPSHOT_VERSION = 1
+
+DEFAULT_CACHE_SIZE = 1 << 16
+# Largest request body the server reads
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+# (active, has_batch, year, category, saturation, is_hiring, jobs bucket, team bucket)
+Signature = Tuple[bool, bool, int, str, str, bool, int, int]
+
+
+def write_category_counts(path: Path, category_counts: Dict[str, int], saturation_source: str = "category"):
+    """Save the category counts a run scored saturation with, for ScoringEngine.from_snapshot."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": SNAPSHOT_VERSION,
+            "saturation_source": saturation_source,
+            "category_counts": category_counts,
+        }, f, ensure_ascii=False)
+
+
+def load_category_counts(path: Path) -> Dict[str, Any]:
+    """The snapshot write_category_counts saved."""
+    with open(path, "r", encoding="utf-8") as f:
+        snapshot = json.load(f)
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"{path}: snapshot version {snapshot.get('version')}, expected {SNAPSHOT_VERSION}")
+    return snapshot
+
+
+def _as_int(value: Any) -> int:
+    """value as an int; 0 for anything that is not a finite number."""
+    if isinstance(value, bool):
+        return int(value)
+    try:
+        if isinstance(value, (int, float)):
+            return int(value)
+        return int(str(value).strip().replace(",", "") or 0)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def _as_float(value: Any) -> float:
+    """value as a float; 0.0 for anything that is not a finite number."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return 0.0
+    return number if math.isfinite(number) else 0.0
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+class ScoringEngine:
+    """A SurvivalScorer, the category counts saturation is read from, and an LRU cache of signatures."""
+
+    def __init__(
+        self,
+        scorer: SurvivalScorer = DEFAULT_SCORER,
+        category_counts: Optional[Dict[str, int]] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        saturation_source: str = "category",
+    ):
+        self.scorer = scorer
+        self.category_counts = dict(category_counts or {})
+        # "competitors": an input's competitor_density, when it has one, sets its saturation
+        self.saturation_source = saturation_source
+        # Saturation per category is fixed for the engine's life; both caches
+        # are LRUs, so --serve stays bounded however many categories it sees
+        self._category_saturation = lru_cache(maxsize=cache_size)(self._saturation_of_category)
+        self._score = lru_cache(maxsize=cache_size)(self._score_signature)
+
+    @classmethod
+    def from_snapshot(cls, path: Path = DEFAULT_SNAPSHOT_PATH, **kwargs) -> "ScoringEngine":
+        snapshot = load_category_counts(path)
+        kwargs.setdefault("saturation_source", snapshot.get("saturation_source", "category"))
+        return cls(category_counts=snapshot["category_counts"], **kwargs)
+
+    def _saturation_of_category(self, category: str) -> str:
+        return get_category_saturation(category, self.category_counts)
+
+    def _score_signature(self, signature: Signature) -> Tuple[int, Dict[str, int]]:
+        active, has_batch, year, category, saturation, is_hiring, jobs, team = signature
+        return self.scorer.score_signature(active, has_batch, year, category, saturation, is_hiring, jobs, team)
+
+    def saturation(self, record: Dict[str, Any], category: str) -> str:
+        """
+        The record's own saturation level, else the level its
+        competitor_density gives (with saturation_source "competitors"),
+        else the one from the category counts.
+        """
+        level = record.get("saturation")
+        if level in SATURATION_LEVELS:
+            return level
+        density = record.get("competitor_density")
+        if density is not None and self.saturation_source == "competitors":
+            return get_competitor_saturation(_as_float(density))
+        return self._category_saturation(category)
+
+    def signature(self, record: Dict[str, Any]) -> Signature:
+        """Normalized scoring inputs of record, with the pipeline's defaults for missing fields."""
+        batch = str(record.get("batch") or "").strip()
+        category = str(record.get("category") or "Other").strip() or "Other"
+        return (
+            str(record.get("status") or "Active").strip() == "Active",
+            bool(batch),
+            batch_year(batch),
+            category,
+            self.saturation(record, category),
+            _as_bool(record.get("is_hiring", False)),
+            jobs_bucket(_as_int(record.get("open_jobs", 0))),
+            team_bucket(_as_int(record.get("team_size", 0))),
+        )
+
+    def score(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """survival_score, survival_breakdown and saturation for one input."""
+        signature = self.signature(record)
+        total, breakdown = self._score(signature)
+        return {"survival_score": total, "survival_breakdown": dict(breakdown), "saturation": signature[4]}
+
+    def score_batch(self, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """score() for every input, in order."""
+        score, signature = self._score, self.signature
+        results = []
+        for record in records:
+            key = signature(record)
+            total, breakdown = score(key)
+            results.append({"survival_score": total, "survival_breakdown": dict(breakdown), "saturation": key[4]})
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        info = self._score.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "categories": len(self.category_counts),
+            "saturation_source": self.saturation_source,
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+            "cache_size": info.currsize,
+            "cache_max_size": info.maxsize,
+            "hit_rate": round(info.hits / lookups, 4) if lookups else None,
+        }
+
+
+def handle_request(engine: ScoringEngine, payload: Any) -> Any:
+    """One input -> one result; a list (or {"records": [...]}) -> {"results": [...]}."""
+    if isinstance(payload, dict) and isinstance(payload.get("records"), list):
+        payload = payload["records"]
+    if isinstance(payload, list):
+        if not all(isinstance(record, dict) for record in payload):
+            raise ValueError("every input must be a JSON object")
+        return {"results": engine.score_batch(payload)}
+    if isinstance(payload, dict):
+        return engine.score(payload)
+    raise ValueError("expected a JSON object, a list of objects or {\"records\": [...]}")
+
+
+def make_handler(engine: ScoringEngine) -> type:
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so a client scoring in a loop reuses its connection
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, body: Any):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._reply(200, engine.stats())
+            else:
+                self._reply(404, {"message": "Not found"})
+
+        def do_POST(self):
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                # Without a length the body can't be skipped, so the connection can't be reused
+                self.close_connection = True
+                self._reply(400, {"message": "invalid Content-Length"})
+                return
+            if self.path != "/score":
+                self.rfile.read(length)
+                self._reply(404, {"message": "Not found"})
+                return
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True
+                self._reply(413, {"message": f"body over {MAX_BODY_BYTES} bytes"})
+                return
+            try:
+                self._reply(200, handle_request(engine, json.loads(self.rfile.read(length) or b"null")))
+            except (ValueError, RecursionError) as error:
+                # RecursionError: JSON nested deeper than the parser's stack
+                self._reply(400, {"message": str(error)})
+
+        def log_message(self, format: str, *args):
+            pass
+
+    return Handler
+
+
+def serve(engine: ScoringEngine, host: str, port: int):
+    server = ThreadingHTTPServer((host, port), make_handler(engine))
+    print(f"🎯 Scoring on http://{host}:{server.server_port}/score ({engine.stats()['categories']} categories)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    print(f"\n📊 {engine.stats()}")
+
+
+def run_stdio(engine: ScoringEngine):
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            result = handle_request(engine, json.loads(line))
+        except (ValueError, RecursionError) as error:
+            result = {"error": str(error)}
+        sys.stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+def run_bench(engine: ScoringEngine, n: int, seed: int = 0):
+    """Score n random what-if inputs drawn from the snapshot's categories, cold and then warm."""
+    rng = random.Random(seed)
+    categories = list(engine.category_counts) or ["Other"]
+    inputs = [
+        {
+            "category": rng.choice(categories),
+            "batch": f"{rng.choice('WSFX')}{rng.randint(5, 26):02d}",
+            "status": "Active" if rng.random() < 0.8 else "Inactive",
+            "is_hiring": rng.random() < 0.3,
+            "open_jobs": rng.randint(0, 20),
+            "team_size": rng.randint(1, 40),
+        }
+        for _ in range(n)
+    ]
+    for label in ("cold", "warm"):
+        start = time.perf_counter()
+        engine.score_batch(inputs)
+        seconds = time.perf_counter() - start
+        print(f"🎯 {label}: {n:,} scorings in {seconds:.3f}s ({n / seconds:,.0f}/s)")
+    print(f"   {engine.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score startup ideas with the pipeline's survival formula.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--serve", type=int, metavar="PORT", help="serve POST /score and GET /stats on PORT")
+    mode.add_argument("--stdio", action="store_true", help="read one JSON input per line, write one result per line")
+    mode.add_argument("--bench", type=int, metavar="N", help="time N random scorings")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--snapshot", type=Path, default=DEFAULT_SNAPSHOT_PATH,
+                        help="category counts written by process-data.py (default: data/processed/category_counts.json)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="LRU cache entries")
+    parser.add_argument("--saturation", choices=("category", "competitors"),
+                        help="saturation source (default: the snapshot's run's)")
+    parser.add_argument("input", nargs="?", help="one JSON input to score (default mode)")
+    args = parser.parse_args()
+
+    if not args.snapshot.exists():
+        raise SystemExit(f"❌ {args.snapshot} not found; run process-data.py first")
+    options = {"cache_size": args.cache_size}
+    if args.saturation:
+        options["saturation_source"] = args.saturation
+    engine = ScoringEngine.from_snapshot(args.snapshot, **options)
+    if args.serve is not None:
+        serve(engine, args.host, args.serve)
+    elif args.stdio:
+        run_stdio(engine)
+    elif args.bench:
+        run_bench(engine, args.bench)
+    else:
+        print(json.dumps(handle_request(engine, json.loads(args.input or "{}")), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Precomputed "companies like this one": top-k TF-IDF neighbours per record.
+
+Each record's text fields become one row of a sparse, L2-normalized TF-IDF
+matrix X (sublinear tf, smoothed idf). Cosine similarity is then X · Xᵀ, which
+is computed a block of rows at a time: a row is multiplied against the
+transposed matrix (an inverted index), its scores are accumulated sparsely
+and only the best k survive. The n x n product is never materialized, so
+memory stays at the matrix itself plus n * k results.
+
+With jobs > 1 the matrix is written once to a temporary section file (the
+snapshot format) and every worker process maps it read-only, so the blocks
+are spread over all cores without copying the matrix into each worker.
+
+Terms that occur in a single record can't relate two records, and terms in
+more than MAX_DF_RATIO (or MAX_DF) of them say little and dominate the
+multiply's cost, so both are dropped from the vocabulary, as sklearn's
+min_df/max_df do. Rows keep their terms by descending weight, and a row's
+multiply stops taking terms once MAX_ROW_POSTINGS have been accumulated
+(always after at least one). Rare, high-weight terms come first, so on large
+corpora only the least informative terms are skipped, as in Lucene's
+more-like-this. This bounds the work per row, which keeps
+million-record corpora tractable.
+
+Like FacetCube, the matrix holds one row per objectID: when an objectID
+repeats, the first copy is vectorized, and paragraph records split off an
+oversized startup (record_budget.py) are left out. So no record lists the
+same neighbour twice, and attach gives every copy its objectID's neighbours
+and a paragraph record its parent's.
+"""
+
+import heapq
+import math
+import tempfile
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from csv_snapshot import SectionFile, write_section_file
+from local_search import field_text, tokenize
+from record_budget import PARENT_FIELD, is_child
+
+MAGIC = b"RSTSIM01"
+
+DEFAULT_K = 10
+# Rows per multiply task
+BLOCK_ROWS = 512
+MIN_DF = 2
+MAX_DF_RATIO = 0.1
+MAX_DF = 5000
+MAX_ROW_POSTINGS = 4096
+MIN_TOKEN_LENGTH = 2
+
+# Text that describes what a company does, per index
+SIMILARITY_FIELDS = {
+    "startups": ("description", "long_description", "tags"),
+    "graveyard": ("what_they_did", "why_they_failed"),
+}
+
+
+class TfidfMatrix:
+    """
+    Row-normalized TF-IDF matrix as CSR rows (terms by descending weight)
+    plus its CSC transpose (rows ascending).
+    """
+
+    def __init__(self, num_rows: int, num_terms: int, rows: Tuple[Sequence, ...], cols: Tuple[Sequence, ...]):
+        self.num_rows = num_rows
+        self.num_terms = num_terms
+        # (indptr, indices, data) each
+        self.rows = rows
+        self.cols = cols
+        self._file: Optional[SectionFile] = None
+
+    @property
+    def nnz(self) -> int:
+        return self.rows[0][self.num_rows]
+
+    @classmethod
+    def build(cls, texts: Iterable[str]) -> "TfidfMatrix":
+        term_ids: Dict[str, int] = {}
+        doc_offsets = array("q", [0])
+        doc_terms = array("i")
+        doc_counts = array("i")
+        df = array("i")
+        for text in texts:
+            counts = Counter(t for t in tokenize(text) if len(t) >= MIN_TOKEN_LENGTH)
+            for token, count in counts.items():
+                tid = term_ids.get(token)
+                if tid is None:
+                    tid = term_ids[token] = len(term_ids)
+                    df.append(0)
+                df[tid] += 1
+                doc_terms.append(tid)
+                doc_counts.append(count)
+            doc_offsets.append(len(doc_terms))
+        del term_ids
+
+        num_rows = len(doc_offsets) - 1
+        max_df = max(MIN_DF, min(int(MAX_DF_RATIO * num_rows), MAX_DF))
+        # Kept terms get compact column ids
+        column = array("i", [-1]) * len(df)
+        idf = array("d")
+        for tid, n in enumerate(df):
+            if MIN_DF <= n <= max_df:
+                column[tid] = len(idf)
+                idf.append(math.log((1 + num_rows) / (1 + n)) + 1)
+        num_terms = len(idf)
+
+        indptr = array("q", [0])
+        indices = array("i")
+        data = array("f")
+        col_counts = array("q", [0]) * (num_terms + 1)
+        for r in range(num_rows):
+            entries = []
+            for j in range(doc_offsets[r], doc_offsets[r + 1]):
+                c = column[doc_terms[j]]
+                if c >= 0:
+                    entries.append((c, (1 + math.log(doc_counts[j])) * idf[c]))
+            norm = math.sqrt(sum(w * w for _, w in entries)) or 1.0
+            entries.sort(key=lambda e: (-e[1], e[0]))
+            for c, w in entries:
+                indices.append(c)
+                data.append(w / norm)
+                col_counts[c + 1] += 1
+            indptr.append(len(indices))
+        del doc_offsets, doc_terms, doc_counts
+
+        # Transpose by counting sort; rows come out ascending within each column
+        col_indptr = array("q", [0]) * (num_terms + 1)
+        for c in range(num_terms):
+            col_indptr[c + 1] = col_indptr[c] + col_counts[c + 1]
+        fill = array("q", col_indptr[:num_terms])
+        col_indices = array("i", [0]) * len(indices)
+        col_data = array("f", [0.0]) * len(indices)
+        for r in range(num_rows):
+            for j in range(indptr[r], indptr[r + 1]):
+                c = indices[j]
+                col_indices[fill[c]] = r
+                col_data[fill[c]] = data[j]
+                fill[c] += 1
+        return cls(num_rows, num_terms, (indptr, indices, data), (col_indptr, col_indices, col_data))
+
+    def save(self, path: Path):
+        names = ("indptr", "indices", "data")
+        sections = []
+        for prefix, arrays in (("rows", self.rows), ("cols", self.cols)):
+            for name, values in zip(names, arrays):
+                sections.append((f"{prefix}.{name}", values.tobytes(), values.typecode))
+        write_section_file(path, MAGIC, {"num_rows": self.num_rows, "num_terms": self.num_terms}, sections)
+
+    @classmethod
+    def load(cls, path: Path) -> "TfidfMatrix":
+        f = SectionFile(path, MAGIC)
+        s = f.sections
+        matrix = cls(
+            f.header["num_rows"], f.header["num_terms"],
+            (s["rows.indptr"], s["rows.indices"], s["rows.data"]),
+            (s["cols.indptr"], s["cols.indices"], s["cols.data"]),
+        )
+        matrix._file = f
+        return matrix
+
+    def close(self):
+        if self._file is not None:
+            self.rows = self.cols = None
+            self._file.close()
+            self._file = None
+
+    def top_k(self, start: int, stop: int, k: int) -> Tuple[array, array]:
+        """
+        Best k other rows by cosine for rows [start, stop), flattened and
+        padded with -1 / 0.0. Ties go to the lower row index.
+        """
+        indptr, indices, data = self.rows
+        col_indptr, col_indices, col_data = self.cols
+        ids = array("i")
+        scores = array("f")
+        for r in range(start, stop):
+            acc: Dict[int, float] = {}
+            get = acc.get
+            budget = MAX_ROW_POSTINGS
+            for j in range(indptr[r], indptr[r + 1]):
+                c, w = indices[j], data[j]
+                lo, hi = col_indptr[c], col_indptr[c + 1]
+                if hi - lo > budget and acc:
+                    break
+                budget -= hi - lo
+                for d, v in zip(col_indices[lo:hi], col_data[lo:hi]):
+                    acc[d] = get(d, 0.0) + w * v
+            acc.pop(r, None)
+            best = heapq.nsmallest(k, acc.items(), key=lambda item: (-item[1], item[0]))
+            ids.extend(d for d, _ in best)
+            scores.extend(score for _, score in best)
+            if len(best) < k:
+                ids.extend([-1] * (k - len(best)))
+                scores.extend([0.0] * (k - len(best)))
+        return ids, scores
+
+
+class Neighbours:
+    """Top-k neighbours of every vectorized record, by its row in the matrix."""
+
+    def __init__(self, object_ids: List[str], ids: array, scores: array, k: int):
+        self.object_ids = object_ids
+        self.ids = ids
+        self.scores = scores
+        self.k = k
+        self.positions = {object_id: i for i, object_id in enumerate(object_ids)}
+
+    def __len__(self) -> int:
+        return len(self.object_ids)
+
+    def for_row(self, i: int) -> Tuple[List[str], List[float]]:
+        lo, hi = i * self.k, (i + 1) * self.k
+        pairs = [(self.object_ids[d], round(s, 4)) for d, s in zip(self.ids[lo:hi], self.scores[lo:hi]) if d >= 0]
+        return [d for d, _ in pairs], [s for _, s in pairs]
+
+    def attach(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Add the similar_ids / similar_scores of each record's objectID (its parent's, for a paragraph record)."""
+        for record in records:
+            object_id = record[PARENT_FIELD] if is_child(record) else record.get("objectID")
+            i = self.positions.get(str(object_id))
+            if i is None:
+                raise ValueError(f"record {record.get('objectID')!r} was not vectorized")
+            record["similar_ids"], record["similar_scores"] = self.for_row(i)
+            yield record
+
+
+_WORKER_MATRIX: Optional[TfidfMatrix] = None
+
+
+def _init_worker(path: str):
+    global _WORKER_MATRIX
+    _WORKER_MATRIX = TfidfMatrix.load(Path(path))
+
+
+def _top_k_block(job: Tuple[int, int, int]) -> Tuple[bytes, bytes]:
+    """Process-pool worker: one block of rows against the shared mapped matrix."""
+    ids, scores = _WORKER_MATRIX.top_k(*job)
+    return ids.tobytes(), scores.tobytes()
+
+
+def compute_neighbours(
+    records: Iterable[Dict[str, Any]],
+    fields: Sequence[str],
+    k: int = DEFAULT_K,
+    jobs: int = 1,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Neighbours:
+    """Vectorize fields of records (one pass, one row per objectID) and find every record's k nearest others."""
+    object_ids: List[str] = []
+    seen = set()
+
+    def texts() -> Iterator[str]:
+        for record in records:
+            object_id = str(record.get("objectID", len(object_ids)))
+            if object_id in seen or is_child(record):
+                continue
+            seen.add(object_id)
+            object_ids.append(object_id)
+            yield " ".join(field_text(record.get(field)) for field in fields)
+
+    matrix = TfidfMatrix.build(texts())
+    n = matrix.num_rows
+    if stats is not None:
+        stats.update({"terms": matrix.num_terms, "nnz": matrix.nnz})
+    blocks = [(start, min(start + BLOCK_ROWS, n), k) for start in range(0, n, BLOCK_ROWS)]
+
+    if jobs <= 1 or len(blocks) <= 1:
+        ids, scores = matrix.top_k(0, n, k)
+        return Neighbours(object_ids, ids, scores, k)
+
+    ids = array("i")
+    scores = array("f")
+    with tempfile.TemporaryDirectory(prefix="similarity-") as tmp:
+        path = Path(tmp) / "tfidf.mat"
+        matrix.save(path)
+        del matrix
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(str(path),)) as pool:
+            for block_ids, block_scores in pool.map(_top_k_block, blocks):
+                ids.frombytes(block_ids)
+                scores.frombytes(block_scores)
+    return Neighbours(object_ids, ids, scores, k)
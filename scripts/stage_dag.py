@@ -0,0 +1,86 @@
+"""
+A small stage DAG for the batch pipeline.
+
+Each node names the nodes whose results it takes as arguments. Nodes added
+with pool=True are independent, CPU-heavy parses. They are submitted to a
+process pool as soon as their inputs are ready, so yc.csv and every
+graveyard file parse at the same time. The other nodes run in the calling
+process, in the order they were added, as their inputs become ready. They
+keep running while pool nodes are in flight, and wait only when nothing else
+is runnable.
+
+Without a pool every node runs inline in the order it was added, which is
+the plain serial pipeline.
+"""
+
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class Node:
+    def __init__(self, name: str, fn: Callable[..., Any], args: Sequence[Any], deps: Sequence[str], pool: bool):
+        self.name = name
+        self.fn = fn
+        self.args = tuple(args)
+        self.deps = tuple(deps)
+        self.pool = pool
+
+
+class StageDAG:
+    """Nodes in insertion order; run() returns every node's result by name."""
+
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+        # name -> {"seconds", "pool"}; a pool node's time runs from submission to its result
+        self.timings: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], *args: Any, deps: Sequence[str] = (), pool: bool = False):
+        """
+        Add node name computing fn(*args, *results of deps). Dependencies must
+        already be added, so insertion order is a topological order. A pool
+        node's fn, args and dependency results must be picklable.
+        """
+        if name in self.nodes:
+            raise ValueError(f"duplicate stage {name!r}")
+        missing = [dep for dep in deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"stage {name!r} depends on unknown stages {missing}")
+        self.nodes[name] = Node(name, fn, args, deps, pool)
+
+    def run(self, executor: Optional[Executor] = None) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        pending: List[Node] = list(self.nodes.values())
+        running: Dict[Future, Node] = {}
+        started: Dict[str, float] = {}
+
+        def ready(node: Node) -> bool:
+            return all(dep in results for dep in node.deps)
+
+        def finish(node: Node, result: Any):
+            results[node.name] = result
+            self.timings[node.name] = {
+                "seconds": round(time.perf_counter() - started[node.name], 4),
+                "pool": node.pool and executor is not None,
+            }
+
+        while pending or running:
+            if executor is not None:
+                for node in [n for n in pending if n.pool and ready(n)]:
+                    pending.remove(node)
+                    started[node.name] = time.perf_counter()
+                    running[executor.submit(node.fn, *node.args, *(results[d] for d in node.deps))] = node
+
+            node = next((n for n in pending if (executor is None or not n.pool) and ready(n)), None)
+            if node is not None:
+                pending.remove(node)
+                started[node.name] = time.perf_counter()
+                finish(node, node.fn(*node.args, *(results[d] for d in node.deps)))
+                continue
+
+            if not running:
+                raise RuntimeError(f"stages {[n.name for n in pending]} can never run")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finish(running.pop(future), future.result())
+        return results
@@ -0,0 +1,447 @@
+"""
+Survival scoring for YC startup records.
+
+The formula is applied to whole columns at once: every startup is reduced to a
+small signature (batch era, category, hiring, open-jobs bucket, team-size
+bucket, status, has-batch) and each distinct signature is scored exactly once.
+A corpus of thousands of startups only has a few hundred signatures, so
+re-scoring after tweaking a multiplier takes milliseconds.
+
+Columns are stdlib arrays rather than NumPy so the pipeline keeps running on
+a bare Python install.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from keyword_matcher import KeywordMatcher
+
+# Realistic base success rates by batch era (from YC historical data)
+# Format: (start_year, end_year): base_success_rate
+BATCH_SUCCESS_RATES = {
+    (2005, 2009): 0.25,  # Early batches (W01-W09): proven winners, 25%
+    (2010, 2013): 0.30,  # Golden era (W10-W13): 30%
+    (2014, 2017): 0.22,  # Growth phase (W14-W17): 22%
+    (2018, 2020): 0.18,  # Late cycle (W18-W20): 18%
+    (2021, 2024): 0.12,  # COVID era (W21-W24): too early to tell, 12%
+}
+
+DEFAULT_BASE_RATE = 0.15  # Default 15%
+DEFAULT_BATCH_YEAR = 2020  # Default to recent
+
+# Category multipliers based on market conditions
+CATEGORY_MULTIPLIERS = {
+    # Hot categories
+    "AI/ML": 1.25,
+    "Artificial Intelligence": 1.25,
+    "Fintech": 1.15,
+    "Climate Tech": 1.20,
+    "Biotech": 1.10,
+    "Defense": 1.15,
+
+    # Solid categories
+    "SaaS": 1.10,
+    "B2B": 1.10,
+    "Developer Tools": 1.12,
+    "Infrastructure": 1.10,
+    "Healthcare": 1.05,
+
+    # Challenging categories
+    "Consumer": 0.90,
+    "E-commerce": 0.85,
+    "Marketplace": 0.80,
+    "Social Media": 0.75,
+    "Food Delivery": 0.80,
+    "Transportation": 0.85,
+
+    # Default
+    "Other": 1.0,
+}
+
+# Category trend scores (5 = emerging, 1 = saturated)
+CATEGORY_TRENDS = {
+    "AI": 5, "Artificial Intelligence": 5, "Machine Learning": 5, "ML": 5,
+    "Generative AI": 5, "LLM": 5,
+    "Climate Tech": 4, "Climate": 4, "Biotech": 4, "Biology": 4,
+    "Web3": 3, "Crypto": 2, "Blockchain": 2,
+    "SaaS": 3, "B2B": 3, "Developer Tools": 4, "Infrastructure": 3,
+    "Fintech": 3, "Finance": 3, "Payments": 3,
+    "E-commerce": 2, "Healthcare": 3, "Health": 3, "Medical": 3,
+    "Social": 1, "Social Media": 1, "Marketplace": 1, "Marketplaces": 1,
+    "Consumer": 2, "Food": 1, "Food Delivery": 1, "Transportation": 1,
+    "Mobility": 1, "Gig": 1, "On-demand": 1,
+}
+
+BATCH_YEAR_RE = re.compile(r"W(\d+)", re.IGNORECASE)
+
+# Bucket boundaries used by the growth / funding signals
+# open_jobs: 0 = <=3, 1 = 4-10, 2 = >10
+# team_size: 0 = solo, 1 = <=5, 2 = 6-10, 3 = 11-20, 4 = >20
+JOBS_BUCKETS = 3
+TEAM_BUCKETS = 5
+
+SATURATION_LEVELS = ("Low", "Medium", "High")
+
+# Competitor-based saturation thresholds, in near-duplicate competitors per
+# 1,000 startups (competitor_clusters.py). On the ~2.5k-startup dataset one
+# competitor is ~0.4 and three are ~1.2.
+COMPETITOR_DENSITY_MEDIUM = 0.3
+COMPETITOR_DENSITY_HIGH = 1.0
+
+
+def get_category_saturation(category: str, category_counts: Dict[str, int]) -> str:
+    """
+    Determine market saturation level based on category count.
+    More startups in category = higher saturation.
+    """
+    count = category_counts.get(category, 0)
+
+    # Saturation thresholds based on our dataset
+    if count >= 300:
+        return "High"  # Saturated markets
+    elif count >= 100:
+        return "Medium"  # Moderate competition
+    else:
+        return "Low"  # Emerging markets
+
+
+def get_competitor_saturation(competitor_density: float) -> str:
+    """
+    Determine market saturation from how many startups pitch nearly the same
+    product, rather than from the size of the whole category.
+    """
+    if competitor_density >= COMPETITOR_DENSITY_HIGH:
+        return "High"
+    elif competitor_density >= COMPETITOR_DENSITY_MEDIUM:
+        return "Medium"
+    return "Low"
+
+
+def batch_year(batch: str) -> int:
+    """
+    Cohort year of a batch code as the scorer has always read it: W<n> ->
+    2005 + n, anything else -> 2020. Not a calendar year; that is
+    field_parsers.batch_calendar_year.
+    """
+    if batch:
+        match = BATCH_YEAR_RE.search(batch)
+        if match:
+            return 2005 + int(match.group(1))
+    return DEFAULT_BATCH_YEAR
+
+
+def jobs_bucket(open_jobs: int) -> int:
+    if open_jobs > 10:
+        return 2
+    elif open_jobs > 3:
+        return 1
+    return 0
+
+
+def team_bucket(team_size: int) -> int:
+    if team_size == 1:
+        return 0
+    elif team_size > 20:
+        return 4
+    elif team_size > 10:
+        return 3
+    elif team_size > 5:
+        return 2
+    return 1
+
+
+class ScoringColumns:
+    """Column-oriented view of the scoring inputs of a list of startups."""
+
+    def __init__(self, records: Iterable[Dict[str, Any]]):
+        self.categories: List[str] = []
+        category_index: Dict[str, int] = {}
+
+        self.category_codes = array("i")
+        self.batch_years = array("h")
+        self.has_batch = array("b")
+        self.active = array("b")
+        self.is_hiring = array("b")
+        self.open_jobs = array("l")
+        self.team_size = array("l")
+
+        for record in records:
+            category = record.get("category", "Other")
+            code = category_index.get(category)
+            if code is None:
+                code = category_index[category] = len(self.categories)
+                self.categories.append(category)
+            batch = record.get("batch", "")
+
+            self.category_codes.append(code)
+            self.batch_years.append(batch_year(batch))
+            self.has_batch.append(1 if batch else 0)
+            self.active.append(1 if record.get("status", "Active") == "Active" else 0)
+            self.is_hiring.append(1 if record.get("is_hiring", False) else 0)
+            self.open_jobs.append(record.get("open_jobs", 0))
+            self.team_size.append(record.get("team_size", 0))
+
+    def __len__(self) -> int:
+        return len(self.category_codes)
+
+    def category_counts(self) -> Dict[str, int]:
+        """Startups per category, in first-seen order."""
+        counts = [0] * len(self.categories)
+        for code in self.category_codes:
+            counts[code] += 1
+        return dict(zip(self.categories, counts))
+
+
+class ScoreColumns:
+    """Scoring output, one entry per input row."""
+
+    def __init__(self, survival_scores: array, breakdowns: List[Dict[str, int]], saturations: List[str]):
+        self.survival_scores = survival_scores
+        self.breakdowns = breakdowns
+        self.saturations = saturations
+
+    def apply(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write survival_score / survival_breakdown / saturation onto the records."""
+        for record, score, breakdown, saturation in zip(
+            records, self.survival_scores, self.breakdowns, self.saturations
+        ):
+            record["survival_score"] = score
+            record["survival_breakdown"] = dict(breakdown)
+            record["saturation"] = saturation
+        return records
+
+
+class SurvivalScorer:
+    """
+    Survival score formula with its lookup tables compiled once.
+
+    Based on:
+    - Real YC historical success rates (~10-20% IPO/acquisition)
+    - Category performance trends
+    - Growth signals (hiring, team size, open jobs)
+    - Batch era (older batches have more proven track record)
+    - Market saturation analysis
+    """
+
+    def __init__(
+        self,
+        batch_success_rates: Optional[Dict[Tuple[int, int], float]] = None,
+        category_multipliers: Optional[Dict[str, float]] = None,
+        category_trends: Optional[Dict[str, int]] = None,
+    ):
+        self.batch_success_rates = batch_success_rates or BATCH_SUCCESS_RATES
+        self.category_multipliers = category_multipliers or CATEGORY_MULTIPLIERS
+        self.category_trends = category_trends or CATEGORY_TRENDS
+        self.trend_matcher = KeywordMatcher(self.category_trends)
+        self.multiplier_matcher = KeywordMatcher(self.category_multipliers)
+
+        # Eras don't overlap, so sorting by start year allows a bisect lookup
+        eras = sorted(self.batch_success_rates.items())
+        self._era_starts = [start for (start, _), _ in eras]
+        self._era_bounds = [(end, rate) for (_, end), rate in eras]
+
+    def era_rate(self, year: int) -> float:
+        """Base success rate of the era containing year."""
+        i = bisect_right(self._era_starts, year) - 1
+        if i >= 0:
+            end, rate = self._era_bounds[i]
+            if year <= end:
+                return rate
+        return DEFAULT_BASE_RATE
+
+    def category_multiplier(self, category: str) -> float:
+        return self.multiplier_matcher.exact(category, self.category_multipliers.get("Other", 1.0))
+
+    def trend_score(self, category: str) -> int:
+        """Category trend score (5 = emerging, 1 = saturated), first matching key wins."""
+        return self.trend_matcher.first_match(category, 2)
+
+    def score_signature(
+        self,
+        active: bool,
+        has_batch: bool,
+        year: int,
+        category: str,
+        saturation: str,
+        is_hiring: bool,
+        jobs: int,
+        team: int,
+    ) -> Tuple[int, Dict[str, int]]:
+        """Score one signature. Returns (survival_score, survival_breakdown)."""
+        # Get base success rate from batch era
+        base_rate = self.era_rate(year)
+
+        # Get category multiplier
+        category_mult = self.category_multiplier(category)
+
+        # Growth signals boost (actively growing companies are healthier)
+        growth_boost = 0
+        if is_hiring:
+            growth_boost += 0.05  # +5% for hiring
+        if jobs == 2:
+            growth_boost += 0.04  # +4% for lots of open jobs
+        elif jobs == 1:
+            growth_boost += 0.02  # +2% for some open jobs
+
+        if team == 4:
+            growth_boost += 0.03  # +3% for larger team
+        elif team >= 2:
+            growth_boost += 0.015  # +1.5% for moderate team
+
+        # Solo founder penalty (statistically harder)
+        if team == 0:
+            base_rate *= 0.85  # -15% for solo founders
+
+        # Calculate final score
+        if active:
+            # Base rate * category multiplier + growth boost
+            raw_score = (base_rate * category_mult) + growth_boost
+
+            # Convert to percentage and clamp
+            score = int(raw_score * 100)
+            base_survival = min(85, max(5, score))
+
+        else:
+            # Inactive/exited companies
+            # Give them moderate score (may have exited successfully)
+            base_survival = 40
+
+        # ===== MULTI-FACTOR SURVIVAL BREAKDOWN =====
+        # Growth Score (35%): Based on calculated survival_score
+        growth_score = int(base_survival * 0.35)
+
+        # Market Score (25%): Saturation penalty + trend bonus
+        saturation_penalty = {"High": -15, "Medium": -5, "Low": 0}.get(saturation, -2)
+
+        trend_score_raw = self.trend_score(category)
+        trend_bonus = (trend_score_raw - 2.5) * 4  # -10 to +10
+        market_score = int(max(0, min(25, 25 + saturation_penalty + trend_bonus)))
+
+        # Team Score (20%): YC batch = proven team
+        team_score = 20 if has_batch else 5
+
+        # Funding Score (15%): Hiring status and YC participation
+        if is_hiring:
+            funding_score = int(15 * 0.85)  # 13
+        elif has_batch:
+            funding_score = int(15 * 0.60)  # 9
+        elif team >= 3:
+            funding_score = int(15 * 0.50)  # 8
+        else:
+            funding_score = int(15 * 0.25)  # 4
+
+        # Trend Score (5%): Category hype cycle
+        trend_score = int((trend_score_raw / 5) * 100)
+
+        # Total survival score (clamped to 0-100)
+        total_survival = max(0, min(100,
+            growth_score + market_score + team_score + funding_score + (trend_score_raw / 5 * 5)
+        ))
+
+        return int(total_survival), {
+            "total": int(total_survival),
+            "growth": int((growth_score / 0.35) if growth_score > 0 else base_survival),
+            "market": int((market_score / 25) * 100),
+            "team": 100 if has_batch else 25,
+            "funding": int((funding_score / 15) * 100),
+            "trend": trend_score,
+            "penalty": 0
+        }
+
+    def score_record(
+        self, startup: Dict[str, Any], category_counts: Dict[str, int], saturation: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Add survival_score, survival_breakdown and saturation to one startup.
+        saturation overrides the category-count level when given.
+        """
+        batch = startup.get("batch", "")
+        category = startup.get("category", "Other")
+        if saturation is None:
+            saturation = get_category_saturation(category, category_counts)
+        total, breakdown = self.score_signature(
+            active=startup.get("status", "Active") == "Active",
+            has_batch=bool(batch),
+            year=batch_year(batch),
+            category=category,
+            saturation=saturation,
+            is_hiring=bool(startup.get("is_hiring", False)),
+            jobs=jobs_bucket(startup.get("open_jobs", 0)),
+            team=team_bucket(startup.get("team_size", 0)),
+        )
+
+        # Store survival score and breakdown
+        startup["survival_score"] = total
+        startup["survival_breakdown"] = breakdown
+
+        # Add market saturation field
+        startup["saturation"] = saturation
+        return startup
+
+    def score_columns(
+        self,
+        columns: ScoringColumns,
+        category_counts: Optional[Dict[str, int]] = None,
+        saturations: Optional[Sequence[str]] = None,
+    ) -> ScoreColumns:
+        """
+        Score every row of columns. Rows are packed into integer signatures,
+        each distinct signature is scored once and the results are gathered
+        back per row. saturations, one level per row, overrides the
+        category-count levels.
+        """
+        categories = columns.categories
+        if saturations is None:
+            if category_counts is None:
+                category_counts = columns.category_counts()
+            category_saturations = [get_category_saturation(c, category_counts) for c in categories]
+            saturations = [category_saturations[c] for c in columns.category_codes]
+        saturation_code = {level: i for i, level in enumerate(SATURATION_LEVELS)}
+
+        years = sorted(set(columns.batch_years))
+        year_code = {year: i for i, year in enumerate(years)}
+
+        # signature = (((((((year * C + category) * S + saturation) * 2 + active)
+        #               * 2 + has_batch) * 2 + hiring) * JOBS + jobs) * TEAM + team)
+        num_categories = max(1, len(categories))
+        num_levels = len(SATURATION_LEVELS)
+        signatures = [
+            ((((((year_code[y] * num_categories + c) * num_levels + saturation_code[s]) * 2 + a) * 2 + b)
+              * 2 + h) * JOBS_BUCKETS + jobs_bucket(j)) * TEAM_BUCKETS + team_bucket(t)
+            for y, c, s, a, b, h, j, t in zip(
+                columns.batch_years, columns.category_codes, saturations, columns.active,
+                columns.has_batch, columns.is_hiring, columns.open_jobs, columns.team_size,
+            )
+        ]
+
+        table: Dict[int, Tuple[int, Dict[str, int]]] = {}
+        for signature in set(signatures):
+            rest, team = divmod(signature, TEAM_BUCKETS)
+            rest, jobs = divmod(rest, JOBS_BUCKETS)
+            rest, hiring = divmod(rest, 2)
+            rest, has_batch = divmod(rest, 2)
+            rest, active = divmod(rest, 2)
+            rest, s = divmod(rest, num_levels)
+            y, c = divmod(rest, num_categories)
+            table[signature] = self.score_signature(
+                active=bool(active),
+                has_batch=bool(has_batch),
+                year=years[y],
+                category=categories[c],
+                saturation=SATURATION_LEVELS[s],
+                is_hiring=bool(hiring),
+                jobs=jobs,
+                team=team,
+            )
+
+        scored = [table[signature] for signature in signatures]
+        return ScoreColumns(
+            survival_scores=array("b", [total for total, _ in scored]),
+            breakdowns=[breakdown for _, breakdown in scored],
+            saturations=list(saturations),
+        )
+
+
+DEFAULT_SCORER = SurvivalScorer()
@@ -0,0 +1,233 @@
+"""
+Tag markets: what every tag of a startup says about its market, not just the
+first one (the category).
+
+One pass over the startups interns their tags and counts, per tag, the
+startups carrying it in each batch year, and per tag pair the startups
+carrying both. Pairs are counted from packed integer keys (one C-level
+Counter update per record), then frozen into a sparse upper-triangular
+co-occurrence matrix in CSR form (indptr / indices / data arrays). The stage
+is linear in the number of records; a record with k tags adds k(k-1)/2
+pairs, and YC lists at most five.
+
+Each startup gets:
+    tag_density         startups sharing each of its tags per 1,000 startups,
+                        itself excluded, averaged over its tags: saturation
+                        across all its markets
+    tag_combo_density   startups sharing its rarest tag pair per 1,000 (its
+                        only tag, for one tag): how crowded its combination
+                        of markets is
+    tag_growth          relative yearly growth of its tags' share of each
+                        batch year (least-squares slope over mean share),
+                        averaged over its tags
+
+The matrix, per-tag counts by batch year and growth rates are also written to
+tag_matrix.json.
+
+Like FacetCube, the matrix counts one startup per objectID: when an objectID
+repeats, the first copy is counted, and paragraph records split off an
+oversized startup (record_budget.py) are not counted at all. attach gives
+every copy its objectID's metrics, and a paragraph record its parent's.
+"""
+
+import json
+from array import array
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from field_parsers import batch_calendar_year
+from record_budget import PARENT_FIELD, is_child
+
+# Pair key: (lower tag id << PAIR_SHIFT) | higher tag id
+PAIR_SHIFT = 20
+
+
+def growth_rate(years: List[int], shares: List[float]) -> float:
+    """Least-squares slope of shares over years, relative to their mean."""
+    if len(years) < 2:
+        return 0.0
+    mean_year = sum(years) / len(years)
+    mean_share = sum(shares) / len(shares)
+    if not mean_share:
+        return 0.0
+    variance = sum((y - mean_year) ** 2 for y in years)
+    slope = sum((y - mean_year) * (s - mean_share) for y, s in zip(years, shares)) / variance
+    return round(slope / mean_share, 3)
+
+
+class TagMatrix:
+    """Tag counts, the co-occurrence matrix and per-record tag metrics, by position among the counted records."""
+
+    def __init__(
+        self,
+        object_ids: List[str],
+        tags: List[str],
+        counts: array,
+        years: List[int],
+        year_counts: List[array],
+        indptr: array,
+        indices: array,
+        data: array,
+        record_offsets: array,
+        record_tags: array,
+    ):
+        self.object_ids = object_ids
+        self.tags = tags
+        self.counts = counts
+        self.years = years
+        # year_counts[t][y]: startups with tag t in batch year years[y]
+        self.year_counts = year_counts
+        # Row t holds the tags u > t seen with t: indices[indptr[t]:indptr[t + 1]], counts in data
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        # Tag ids of record i: record_tags[record_offsets[i]:record_offsets[i + 1]], ascending
+        self.record_offsets = record_offsets
+        self.record_tags = record_tags
+        self.positions = {object_id: i for i, object_id in enumerate(object_ids)}
+
+        n = max(1, len(object_ids))
+        self.densities = array("d", (round(1000 * (c - 1) / n, 3) for c in counts))
+        year_totals = [sum(column) for column in zip(*year_counts)] if year_counts else []
+        live = [y for y, total in enumerate(year_totals) if total]
+        self.growth = array("d", (
+            growth_rate([years[y] for y in live], [row[y] / year_totals[y] for y in live]) for row in year_counts
+        ))
+
+    def __len__(self) -> int:
+        return len(self.object_ids)
+
+    @property
+    def num_pairs(self) -> int:
+        return len(self.data)
+
+    def cooccurrence(self, a: int, b: int) -> int:
+        """Startups carrying both tag ids a and b."""
+        if a > b:
+            a, b = b, a
+        row = self.indices[self.indptr[a]:self.indptr[a + 1]]
+        lo, hi = 0, len(row)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if row[mid] < b:
+                lo = mid + 1
+            else:
+                hi = mid
+        return self.data[self.indptr[a] + lo] if lo < len(row) and row[lo] == b else 0
+
+    def metrics(self, i: int) -> Dict[str, float]:
+        ids = self.record_tags[self.record_offsets[i]:self.record_offsets[i + 1]]
+        if not ids:
+            return {"tag_density": 0.0, "tag_combo_density": 0.0, "tag_growth": 0.0}
+        if len(ids) == 1:
+            combo = self.densities[ids[0]]
+        else:
+            rarest = min(self.cooccurrence(a, b) for a, b in combinations(ids, 2))
+            combo = round(1000 * (rarest - 1) / max(1, len(self)), 3)
+        return {
+            "tag_density": round(sum(self.densities[t] for t in ids) / len(ids), 3),
+            "tag_combo_density": combo,
+            "tag_growth": round(sum(self.growth[t] for t in ids) / len(ids), 3),
+        }
+
+    def attach(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Add the tag metrics of each record's objectID (its parent's, for a paragraph record), in any order."""
+        for record in records:
+            object_id = record[PARENT_FIELD] if is_child(record) else record.get("objectID")
+            i = self.positions.get(str(object_id))
+            if i is None:
+                raise ValueError(f"record {record.get('objectID')!r} was not counted")
+            for field, value in self.metrics(i).items():
+                record[field] = value
+            yield record
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "startups": len(self),
+            "tags": self.tags,
+            "counts": self.counts.tolist(),
+            "growth": self.growth.tolist(),
+            "years": self.years,
+            "year_counts": [row.tolist() for row in self.year_counts],
+            "cooccurrence": {
+                "indptr": self.indptr.tolist(),
+                "indices": self.indices.tolist(),
+                "data": self.data.tolist(),
+            },
+        }
+
+    def write(self, path: Path) -> int:
+        """Write the matrix artifact. Returns its size in bytes."""
+        payload = json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        return len(payload.encode("utf-8"))
+
+
+def build_tag_matrix(records: Iterable[Dict[str, Any]], stats: Optional[Dict[str, Any]] = None) -> TagMatrix:
+    """Count tags, tag pairs and tags per batch year in one pass over records."""
+    object_ids: List[str] = []
+    seen = set()
+    tag_ids: Dict[str, int] = {}
+    record_offsets = array("q", [0])
+    record_tags = array("i")
+    record_years: List[Optional[int]] = []
+    pairs: Counter = Counter()
+
+    for i, record in enumerate(records):
+        object_id = str(record.get("objectID", i))
+        if object_id in seen or is_child(record):
+            continue
+        seen.add(object_id)
+        object_ids.append(object_id)
+        ids = sorted({tag_ids.setdefault(tag, len(tag_ids)) for tag in record.get("tags") or ()})
+        record_tags.extend(ids)
+        record_offsets.append(len(record_tags))
+        record_years.append(batch_calendar_year(str(record.get("batch") or "")))
+        if len(ids) > 1:
+            pairs.update((a << PAIR_SHIFT) | b for a, b in combinations(ids, 2))
+
+    # Renumber tags by descending count, then name, so the artifact does not
+    # depend on record order
+    first_seen = list(tag_ids)
+    seen_counts = array("i", [0]) * len(first_seen)
+    for t in record_tags:
+        seen_counts[t] += 1
+    order = sorted(range(len(first_seen)), key=lambda t: (-seen_counts[t], first_seen[t]))
+    new_id = array("i", [0]) * len(order)
+    for rank, t in enumerate(order):
+        new_id[t] = rank
+    tags = [first_seen[t] for t in order]
+    counts = array("i", (seen_counts[t] for t in order))
+
+    for i in range(len(object_ids)):
+        start, end = record_offsets[i], record_offsets[i + 1]
+        record_tags[start:end] = array("i", sorted(new_id[t] for t in record_tags[start:end]))
+
+    years = sorted({year for year in record_years if year is not None})
+    year_index = {year: y for y, year in enumerate(years)}
+    year_counts = [array("i", [0]) * len(years) for _ in tags]
+    for i, year in enumerate(record_years):
+        if year is not None:
+            y = year_index[year]
+            for t in record_tags[record_offsets[i]:record_offsets[i + 1]]:
+                year_counts[t][y] += 1
+
+    mask = (1 << PAIR_SHIFT) - 1
+    entries = sorted(
+        (min(new_id[key >> PAIR_SHIFT], new_id[key & mask]), max(new_id[key >> PAIR_SHIFT], new_id[key & mask]), count)
+        for key, count in pairs.items()
+    )
+    indptr = array("q", [0]) * (len(tags) + 1)
+    for a, _, _ in entries:
+        indptr[a + 1] += 1
+    for t in range(len(tags)):
+        indptr[t + 1] += indptr[t]
+    indices = array("i", (b for _, b, _ in entries))
+    data = array("i", (count for _, _, count in entries))
+
+    if stats is not None:
+        stats.update({"tags": len(tags), "pairs": len(data), "years": len(years)})
+    return TagMatrix(object_ids, tags, counts, years, year_counts, indptr, indices, data, record_offsets, record_tags)
@@ -0,0 +1,48 @@
+"""
+Checks of algolia_uploader.py against mock_algolia.py.
+
+Usage:
+    python -m unittest discover -s scripts -p "test_*.py"
+"""
+
+import unittest
+
+from algolia_uploader import upload_indices
+from mock_algolia import MockAlgoliaServer, MockIndex
+
+
+class ReplaceIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.server = MockAlgoliaServer()
+        self.url = self.server.start_in_thread()
+
+    def upload(self, records):
+        return upload_indices({"startups": iter(records)}, "app", "key", self.url, concurrency=2)
+
+    def test_stale_temp_records_never_go_live(self):
+        # What a failed earlier run leaves behind, with no live index yet
+        stale = self.server.indices["startups_upload_tmp"] = MockIndex()
+        stale.object_ids = {"stale"}
+        self.upload([{"objectID": "a"}, {"objectID": "b"}])
+        self.assertEqual(self.server.indices["startups"].object_ids, {"a", "b"})
+        self.assertNotIn("startups_upload_tmp", self.server.indices)
+
+    def test_stale_temp_records_dropped_when_live_index_exists(self):
+        live = self.server.indices["startups"] = MockIndex()
+        live.object_ids = {"old"}
+        stale = self.server.indices["startups_upload_tmp"] = MockIndex()
+        stale.object_ids = {"stale"}
+        self.upload([{"objectID": "a"}])
+        self.assertEqual(self.server.indices["startups"].object_ids, {"a"})
+
+    def test_settings_file_applied_over_live_settings(self):
+        live = self.server.indices["startups"] = MockIndex()
+        live.settings = {"attributeForDistinct": "old", "dashboardOnly": True}
+        self.upload([{"objectID": "a"}])
+        settings = self.server.indices["startups"].settings
+        self.assertEqual(settings["attributeForDistinct"], "parent_id")
+        self.assertTrue(settings["dashboardOnly"])
+
+
+if __name__ == "__main__":
+    unittest.main()
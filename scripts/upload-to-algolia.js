@@ -3,22 +3,40 @@
  * Upload processed startup data to Algolia indices
  * Algolia JavaScript API Client v5 (latest: 5.46.2)
  * Usage: node scripts/upload-to-algolia.js
+ *        node scripts/upload-to-algolia.js --delta   (partial update from data/processed/delta)
+ *        node scripts/upload-to-algolia.js --shards [--concurrency N]
+ *                                                    (gzip shards from process-data.py --shards)
  *
  * REST API Documentation:
  * - Batch operations: https://www.algolia.com/doc/rest-api/search/batch
- * - Replace all records: https://www.algolia.com/doc/libraries/sdk/methods/search/replace-all-objects
+ * - Copy/move index: https://www.algolia.com/doc/rest-api/search/operation-index
  * - Index settings: https://www.algolia.com/doc/rest-api/search/set-settings
  */
 
 import { algoliasearch } from "algoliasearch";
-import { readFileSync } from "fs";
+import { createHash } from "crypto";
+import { existsSync, readFileSync, renameSync, writeFileSync } from "fs";
+import { readFile } from "fs/promises";
 import { join, dirname } from "path";
 import { fileURLToPath } from "url";
+import { gunzipSync } from "zlib";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = dirname(__filename);
 const ROOT_DIR = join(__dirname, "..");
 const DATA_DIR = join(ROOT_DIR, "data", "processed");
+const DELTA_DIR = join(DATA_DIR, "delta");
+const SHARDS_DIR = join(DATA_DIR, "shards");
+// process-data.py diffs each run against MANIFEST_PATH (what the indices hold)
+// and leaves the run's own hashes in PENDING_MANIFEST_PATH for us to commit
+const MANIFEST_PATH = join(DATA_DIR, "manifest.json");
+const PENDING_MANIFEST_PATH = join(DATA_DIR, "manifest.pending.json");
+
+// Shard upload: shards in flight at once, and attempts per shard
+const concurrencyArg = process.argv.indexOf("--concurrency");
+const SHARD_CONCURRENCY =
+	concurrencyArg !== -1 ? Number(process.argv[concurrencyArg + 1]) || 4 : 4;
+const SHARD_ATTEMPTS = 3;
 
 // Algolia credentials from environment
 const ALGOLIA_APP_ID =
@@ -38,114 +56,87 @@ if (!ALGOLIA_APP_ID || !ALGOLIA_API_KEY) {
 // Initialize Algolia client (v5)
 const client = algoliasearch(ALGOLIA_APP_ID, ALGOLIA_API_KEY);
 
-// Settings for startups index (v5 syntax)
+// Index settings (v5 syntax), shared with the Python uploader in process-data.py
 // Based on: https://www.algolia.com/doc/rest-api/search/set-settings
-const STARTUPS_SETTINGS = {
-	searchableAttributes: [
-		"name",
-		"description",
-		"long_description",
-		"tags",
-		"category",
-		"sector",
-	],
-	attributesForFaceting: [
-		"category",
-		"status",
-		"saturation",
-		"batch",
-		"is_hiring",
-		"year_founded",
-	],
-	ranking: [
-		"desc(status:Active)",
-		"desc(survival_score)",
-		"typo",
-		"geo",
-		"words",
-		"proximity",
-		"attribute",
-		"exact",
-		"custom",
-	],
-	customRanking: ["desc(survival_score)"],
-	attributesToHighlight: ["name", "description"],
-	attributesToSnippet: ["description:50", "long_description:100"],
-	highlightPreTag: "<mark>",
-	highlightPostTag: "</mark>",
-	snippetEllipsisText: "…",
-};
-
-// Settings for graveyard index (v5 syntax)
-const GRAVEYARD_SETTINGS = {
-	searchableAttributes: [
-		"name",
-		"why_they_failed",
-		"what_they_did",
-		"takeaway",
-		"category",
-		"sector",
-	],
-	attributesForFaceting: [
-		"category",
-		"sector",
-		"why_they_failed",
-		// Boolean flags for faceting
-		"lost_to_giants",
-		"competition",
-		"poor_market_fit",
-		"monetization_failure",
-		"execution_flaws",
-	],
-	ranking: [
-		"typo",
-		"geo",
-		"words",
-		"proximity",
-		"attribute",
-		"exact",
-		"custom",
-	],
-	customRanking: ["desc(raised_amount)"],
-	attributesToHighlight: ["name", "why_they_failed", "what_they_did"],
-	attributesToSnippet: ["why_they_failed:80", "what_they_did:50"],
-	highlightPreTag: "<mark>",
-	highlightPostTag: "</mark>",
-};
+const { startups: STARTUPS_SETTINGS, graveyard: GRAVEYARD_SETTINGS } = JSON.parse(
+	readFileSync(join(__dirname, "index-settings.json"), "utf8"),
+);
 
 /**
- * Replace all records in an index using replaceAllObjects
- * This is the recommended method for full index replacement:
- * 1. Creates a temporary index
- * 2. Copies settings, synonyms, rules to temp index
- * 3. Adds all records to temp index
- * 4. Replaces original index with temp index
- * 5. Zero downtime for searches!
+ * Start a temporary index from scratch: delete what a failed run left in it,
+ * give it the live index's settings, synonyms and rules (when it exists),
+ * then apply index-settings.json on top, so a settings change always
+ * reaches the index the temporary one is moved over
  *
- * Required ACL: addObject
- * Docs: https://www.algolia.com/doc/libraries/sdk/methods/search/replace-all-objects
+ * REST API endpoints used:
+ * - DELETE /1/indexes/{tmpIndexName}
+ * - POST /1/indexes/{indexName}/operation (copy settings, synonyms, rules)
+ * - PUT /1/indexes/{tmpIndexName}/settings
+ */
+async function prepareTmpIndex(indexName, tmpIndexName, settings, exists) {
+	// A scoped copy keeps the destination's records, so stale ones must go first
+	await client.waitForTask({
+		indexName: tmpIndexName,
+		taskID: await deleteIndex(tmpIndexName),
+	});
+	if (exists) {
+		const copy = await client.operationIndex({
+			indexName,
+			operationIndexParams: {
+				operation: "copy",
+				destination: tmpIndexName,
+				scope: ["settings", "synonyms", "rules"],
+			},
+		});
+		// The copy replaces the temporary index's settings, so it has to land first
+		await client.waitForTask({ indexName, taskID: copy.taskID });
+	}
+	const response = await client.setSettings({
+		indexName: tmpIndexName,
+		indexSettings: settings,
+	});
+	await client.waitForTask({ indexName: tmpIndexName, taskID: response.taskID });
+}
+
+/**
+ * Replace all records in an index through a temporary index:
+ * 1. Creates a temporary index with the live synonyms/rules and our settings
+ * 2. Adds all records to temp index
+ * 3. Moves temp index over the original
+ * 4. Zero downtime for searches!
+ *
+ * Required ACL: addObject, settings
+ * REST API endpoints used:
+ * - POST /1/indexes/{indexName}/batch (addObject)
+ * - POST /1/indexes/{indexName}/operation (move)
  */
-async function replaceAllRecords(indexName, records, settings) {
+async function replaceAllRecords(indexName, records, settings, exists) {
+	const tmpIndexName = `${indexName}_upload_tmp`;
 	console.log(`\n📤 Replacing all records in: ${indexName}`);
 	console.log(`   Records: ${records.length}`);
 
-	// Use replaceAllObjects for atomic replacement (no search interruption)
-	// This automatically handles batching internally (default 1000 per batch)
-	const response = await client.replaceAllObjects({
-		indexName,
+	await prepareTmpIndex(indexName, tmpIndexName, settings, exists);
+	const responses = await client.saveObjects({
+		indexName: tmpIndexName,
 		objects: records,
 		batchSize: 1000, // Algolia default, safe for most data sizes
-		// Scopes to copy from original index (settings, synonyms, rules)
-		scopes: ["settings", "synonyms", "rules"],
 	});
+	for (const response of responses) {
+		await client.waitForTask({ indexName: tmpIndexName, taskID: response.taskID });
+	}
+	const move = await client.operationIndex({
+		indexName: tmpIndexName,
+		operationIndexParams: { operation: "move", destination: indexName },
+	});
+	await client.waitForTask({ indexName: tmpIndexName, taskID: move.taskID });
 
-	console.log(`   Task IDs: ${response.taskIDs?.length || 1} batch(es)`);
-	return response;
+	console.log(`   Task IDs: ${responses.length} batch(es)`);
+	return { indexName, count: records.length };
 }
 
 /**
  * Legacy method: Clear + Configure + Batch Upload
- * Use this if replaceAllObjects fails or for incremental updates
+ * Use this if replaceAllRecords fails or for incremental updates
  *
  * REST API endpoints used:
  * - POST /1/indexes/{indexName}/clear (clear all records)
@@ -285,6 +276,163 @@ async function moveIndex(sourceIndexName, destinationIndexName) {
 	return response.taskID;
 }
 
+/**
+ * Read the pending manifest before any records, so a run that lands while we
+ * upload can only make us commit an older manifest (and re-send a few
+ * records next time), never a newer one whose changes we did not send
+ */
+function readPendingManifest() {
+	return existsSync(PENDING_MANIFEST_PATH)
+		? readFileSync(PENDING_MANIFEST_PATH, "utf8")
+		: null;
+}
+
+/**
+ * After a successful upload, the pending manifest describes the indices
+ */
+function commitManifest(pending) {
+	if (pending === null) return;
+	writeFileSync(`${MANIFEST_PATH}.tmp`, pending);
+	renameSync(`${MANIFEST_PATH}.tmp`, MANIFEST_PATH);
+	console.log("📌 Manifest updated to the uploaded state");
+}
+
+/**
+ * Apply the delta files written by process-data.py to one index
+ * Only added/updated records are sent and deleted objectIDs removed,
+ * instead of replacing every record in the index.
+ *
+ * REST API endpoints used:
+ * - POST /1/indexes/{indexName}/batch (addObject / deleteObject)
+ */
+async function uploadDelta(indexName) {
+	const readDelta = (kind) => {
+		const path = join(DELTA_DIR, `${indexName}.${kind}.json`);
+		return existsSync(path) ? JSON.parse(readFileSync(path, "utf8")) : [];
+	};
+	const changed = [...readDelta("added"), ...readDelta("updated")];
+	const deleted = readDelta("deleted");
+
+	console.log(`\n🔁 Applying delta to ${indexName}`);
+	console.log(`   Upserts: ${changed.length}, deletes: ${deleted.length}`);
+
+	const responses = [];
+	if (changed.length > 0) {
+		responses.push(
+			...(await client.saveObjects({ indexName, objects: changed, batchSize: 1000 })),
+		);
+	}
+	if (deleted.length > 0) {
+		responses.push(
+			...(await client.deleteObjects({ indexName, objectIDs: deleted, batchSize: 1000 })),
+		);
+	}
+	for (const response of responses) {
+		await client.waitForTask({ indexName, taskID: response.taskID });
+	}
+
+	console.log(`✅ ${indexName} delta applied`);
+	return { indexName, upserts: changed.length, deletes: deleted.length };
+}
+
+/**
+ * Read one shard, check it against the manifest checksum and decode its records
+ */
+async function readShard(shard) {
+	const data = await readFile(join(SHARDS_DIR, shard.file));
+	const digest = createHash("sha256").update(data).digest("hex");
+	if (digest !== shard.sha256) {
+		throw new Error(`${shard.file}: checksum mismatch, re-run process-data.py --shards`);
+	}
+	return gunzipSync(data)
+		.toString("utf8")
+		.split("\n")
+		.filter(Boolean)
+		.map((line) => JSON.parse(line));
+}
+
+/**
+ * Send one shard as a single batch request, retrying only that shard
+ * REST: POST /1/indexes/{indexName}/batch
+ */
+async function uploadShard(indexName, shard) {
+	const records = await readShard(shard);
+	const requests = records.map((body) => ({ action: "addObject", body }));
+	for (let attempt = 1; ; attempt++) {
+		try {
+			const response = await client.batch({
+				indexName,
+				batchWriteParams: { requests },
+			});
+			return response.taskID;
+		} catch (error) {
+			if (attempt >= SHARD_ATTEMPTS) {
+				throw new Error(`${shard.file}: ${error.message} (after ${attempt} attempts)`);
+			}
+			const delay = 500 * 2 ** (attempt - 1);
+			console.warn(`   ⚠️  ${shard.file}: ${error.message}, retrying in ${delay}ms`);
+			await new Promise((resolve) => setTimeout(resolve, delay));
+		}
+	}
+}
+
+/**
+ * Replace an index from its shards with bounded memory and concurrency
+ * Shards are loaded into a temporary index that is moved over the live one
+ * only once every shard has been indexed, so a failed shard never leaves
+ * the live index half-replaced.
+ *
+ * REST API endpoints used:
+ * - POST /1/indexes/{indexName}/operation (copy settings, then move)
+ * - PUT /1/indexes/{indexName}/settings (index-settings.json, on the temp index)
+ * - POST /1/indexes/{indexName}/batch (one request per shard)
+ */
+async function uploadShards(indexName, entry, settings, exists) {
+	const tmpIndexName = `${indexName}_shards_tmp`;
+	const shards = entry.shards;
+	console.log(`\n📦 Uploading ${indexName} from ${shards.length} shard(s)`);
+	console.log(`   Records: ${entry.records}, concurrency: ${SHARD_CONCURRENCY}`);
+
+	await prepareTmpIndex(indexName, tmpIndexName, settings, exists);
+
+	const taskIDs = [];
+	const failures = [];
+	let next = 0;
+	let done = 0;
+	const worker = async () => {
+		while (next < shards.length) {
+			const shard = shards[next++];
+			try {
+				taskIDs.push(await uploadShard(tmpIndexName, shard));
+				done++;
+				console.log(`   ${shard.file} (${shard.records} records) ${done}/${shards.length}`);
+			} catch (error) {
+				failures.push(error.message);
+			}
+		}
+	};
+	await Promise.all(
+		Array.from({ length: Math.min(SHARD_CONCURRENCY, shards.length) }, worker),
+	);
+	if (failures.length > 0) {
+		throw new Error(
+			`${failures.length} shard(s) failed, ${indexName} left unchanged:\n   ${failures.join("\n   ")}`,
+		);
+	}
+
+	for (const taskID of taskIDs) {
+		await client.waitForTask({ indexName: tmpIndexName, taskID });
+	}
+	const move = await client.operationIndex({
+		indexName: tmpIndexName,
+		operationIndexParams: { operation: "move", destination: indexName },
+	});
+	await client.waitForTask({ indexName: tmpIndexName, taskID: move.taskID });
+
+	console.log(`✅ ${indexName}: ${entry.records} records from ${shards.length} shard(s)`);
+	return { indexName, count: entry.records };
+}
+
 /**
  * Main upload function
  */
@@ -299,6 +447,43 @@ async function main() {
 		process.exit(1);
 	}
 	console.log("✅ Connection successful!");
+	const pendingManifest = readPendingManifest();
+
+	if (process.argv.includes("--delta")) {
+		try {
+			for (const indexName of ["startups", "graveyard"]) {
+				await uploadDelta(indexName);
+			}
+			commitManifest(pendingManifest);
+			console.log("\n🎉 Delta upload done!");
+		} catch (error) {
+			console.error("\n❌ Delta upload failed:", error.message);
+			process.exit(1);
+		}
+		return;
+	}
+
+	if (process.argv.includes("--shards")) {
+		try {
+			const manifest = JSON.parse(
+				readFileSync(join(SHARDS_DIR, "manifest.json"), "utf8"),
+			);
+			const existingIndices = await listAllIndices();
+			for (const [indexName, settings] of [
+				["startups", STARTUPS_SETTINGS],
+				["graveyard", GRAVEYARD_SETTINGS],
+			]) {
+				const exists = existingIndices.some((idx) => idx.name === indexName);
+				await uploadShards(indexName, manifest.indices[indexName], settings, exists);
+			}
+			commitManifest(pendingManifest);
+			console.log("\n🎉 Shard upload done!");
+		} catch (error) {
+			console.error("\n❌ Shard upload failed:", error.message);
+			process.exit(1);
+		}
+		return;
+	}
 
 	try {
 		// List existing indices
@@ -324,45 +509,16 @@ async function main() {
 		console.log(`   Startups: ${startups.length}`);
 		console.log(`   Graveyard: ${graveyard.length}`);
 
-		// First, configure settings for new indices (if they don't exist)
-		const needsConfig = [];
-		for (const [indexName, settings] of [
-			["startups", STARTUPS_SETTINGS],
-			["graveyard", GRAVEYARD_SETTINGS],
-		]) {
-			const exists = existingIndices.some((idx) => idx.name === indexName);
-			if (!exists) {
-				console.log(`\n⚙️ First-time setup for ${indexName}...`);
-				const taskID = await configureIndex(indexName, settings);
-				await client.waitForTask({ indexName, taskID });
-				console.log(`   ✅ ${indexName} configured`);
-			}
-		}
-
-		// Replace all records using replaceAllRecords (recommended)
+		// Replace all records through temporary indices carrying our settings
 		console.log("\n🔄 Replacing all records (zero-downtime method)...");
-		const results = await Promise.all([
-			replaceAllRecords("startups", startups, STARTUPS_SETTINGS),
-			replaceAllRecords("graveyard", graveyard, GRAVEYARD_SETTINGS),
+		const exists = (indexName) =>
+			existingIndices.some((idx) => idx.name === indexName);
+		await Promise.all([
+			replaceAllRecords("startups", startups, STARTUPS_SETTINGS, exists("startups")),
+			replaceAllRecords("graveyard", graveyard, GRAVEYARD_SETTINGS, exists("graveyard")),
 		]);
 
-		// Wait for all tasks to complete
-		console.log("\n⏳ Waiting for indexing to complete...");
-		for (const [indexName, records] of [
-			["startups", startups],
-			["graveyard", graveyard],
-		]) {
-			const result = results.find((r) =>
-				r.updatedObjectName === indexName || r.objectID === indexName
-			);
-			if (result?.taskIDs) {
-				// Wait for the last task (temp index replacement)
-				const lastTaskID = result.taskIDs[result.taskIDs.length - 1];
-				// Note: taskIDs are for the temp index, but we wait on the main index
-				// The actual replacement happens after all batches complete
-				await new Promise((resolve) => setTimeout(resolve, 2000));
-			}
-		}
+		commitManifest(pendingManifest);
 
 		// Summary
 		console.log("\n✅ Upload complete!");